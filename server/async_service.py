@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import queue
+
+import grpc
+
+# Import generated gRPC code
+from plot import plot_service_pb2, plot_service_pb2_grpc
+
+from plotter import NOT_INITIALIZED
+
+# RPC methods that only read or update state held in memory, run on the event loop
+INLINE_METHODS = (
+    'StartJob', 'PauseJob', 'ResumeJob', 'CancelJob', 'GetJobStatus', 'GetLayers', 'GetPowerHistory', 'GetMetrics',
+    'ListDevices', 'EnrollDevice', 'WithdrawDevice', 'CancelScheduledJob', 'GetSchedule',
+)
+# RPC methods that wait on the NextDraw, the file system or a long computation, run on the blocking executor
+BLOCKING_METHODS = (
+    'InitializePlot', 'Disconnect', 'HasPower', 'PlotAlignmentSVG', 'WalkHome', 'ResetHomePosition',
+    'RestoreInteractiveContext', 'EndInteractiveContext', 'OptimizePlot', 'EstimatePlot', 'RenderPreview',
+    'LoadPlotFile', 'SubmitJob',
+)
+
+
+def inline(name):
+    async def handler(self, request, context):
+        return getattr(self.service, name)(request, context)
+    handler.__name__ = name
+    handler.__doc__ = f"RPC method delegating {name} to PlotService on the event loop."
+    return handler
+
+
+def blocking(name):
+    async def handler(self, request, context):
+        return await self.run_blocking(getattr(self.service, name), request, context)
+    handler.__name__ = name
+    handler.__doc__ = f"RPC method delegating {name} to PlotService on the blocking executor."
+    return handler
+
+
+class AsyncPlotService(plot_service_pb2_grpc.PlotServiceServicer):
+    """PlotService for a grpc.aio server, serving the same proto service from an asyncio event loop.
+
+    Commands and progress are handled on the event loop, waiting on the hardware
+    thread's futures without holding a thread, so command streams and progress
+    watchers take no thread per client. RPCs that block, such as PlotAlignmentSVG
+    waiting for plot_run to finish, run on a dedicated executor so they never hold
+    up the loop.
+    """
+
+    def __init__(self, service, executor):
+        """
+        Args:
+            service (PlotService): Service holding the plotters, whose methods the RPCs delegate to
+            executor (Executor): Runs the blocking RPCs
+        """
+        self.service = service
+        self.executor = executor
+
+    async def run_blocking(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def submit_command(self, plotter, command_line):
+        """Parse and queue a command on a plotter's hardware thread, waiting on the executor if its queue is full.
+
+        Returns:
+            asyncio.Future: Resolves to (success, message) describing the outcome of the command
+        """
+        try:
+            outcome = self.service.submit_command(plotter, command_line, block=False)
+        except queue.Full:
+            outcome = await self.run_blocking(self.service.submit_command, plotter, command_line)
+        return asyncio.wrap_future(outcome)
+
+    async def ProcessCommand(self, request, context):
+        try:
+            plotter = self.service.initialized_plotter(request.device_id)
+            if plotter is None:
+                return plot_service_pb2.CommandResponse(
+                    success=False,
+                    message=NOT_INITIALIZED
+                )
+
+            success, message = await (await self.submit_command(plotter, request.command))
+            return plot_service_pb2.CommandResponse(success=success, message=message)
+        except Exception as e:
+            return plot_service_pb2.CommandResponse(
+                success=False,
+                message=f"Error processing command: {str(e)}"
+            )
+
+    async def StreamCommands(self, request_iterator, context):
+        """RPC method to process a stream of commands, acknowledging each one by sequence number.
+
+        Reads up to `stream_window` commands ahead of the one being executed, as PlotService does.
+        """
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue()
+        window = asyncio.Semaphore(self.service.stream_window)
+
+        async def read_ahead():
+            try:
+                async for request in request_iterator:
+                    await window.acquire()
+                    plotter = self.service.initialized_plotter(request.device_id)
+                    outcome = loop.create_future()
+                    if plotter is None:
+                        outcome.set_result((False, NOT_INITIALIZED))
+                    else:
+                        try:
+                            outcome = await self.submit_command(plotter, request.command)
+                        except Exception as e:
+                            outcome.set_exception(e)
+                    pending.put_nowait((request.sequence, outcome))
+            except Exception as e:
+                logging.error(f"Error reading command stream: {str(e)}")
+            finally:
+                pending.put_nowait(None)
+
+        reader = asyncio.create_task(read_ahead())
+        try:
+            while True:
+                item = await pending.get()
+                if item is None:
+                    break
+                sequence, outcome = item
+                try:
+                    success, message = await outcome
+                except Exception as e:
+                    success, message = False, f"Error processing command: {str(e)}"
+                window.release()
+                yield plot_service_pb2.CommandAck(
+                    sequence=sequence,
+                    success=success,
+                    message=message
+                )
+        finally:
+            reader.cancel()
+
+    async def UploadPlot(self, request_iterator, context):
+        """RPC method to upload a plot file, receiving it on the event loop and preparing it on the blocking executor."""
+        chunks = [chunk async for chunk in request_iterator]
+        return await self.run_blocking(self.service.UploadPlot, iter(chunks), context)
+
+    async def WatchProgress(self, request, context):
+        """RPC method to stream the plot job's progress and state changes until the client cancels."""
+        loop = asyncio.get_running_loop()
+        offered = asyncio.Event()
+
+        def wake():
+            # called on the job thread as events are published
+            try:
+                loop.call_soon_threadsafe(offered.set)
+            except RuntimeError:
+                pass  # the loop has closed
+
+        plotter = self.service.find_plotter(request.device_id)
+        if plotter is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Device {request.device_id or '(default)'} is not registered")
+            return
+        progress = plotter.progress
+        subscription = progress.subscribe(wake)
+        try:
+            while True:
+                event = subscription.get(timeout=0)
+                if event is None:
+                    await offered.wait()
+                    offered.clear()
+                    continue
+                yield plot_service_pb2.ProgressEvent(
+                    state=plot_service_pb2.JobState.Value(event.state),
+                    command_index=event.command_index,
+                    command_total=event.command_total,
+                    layer=event.layer,
+                    pen_down_distance=event.pen_down_distance,
+                    eta_seconds=event.eta_seconds,
+                    message=event.message
+                )
+        finally:
+            progress.unsubscribe(subscription)
+
+
+for method in INLINE_METHODS:
+    setattr(AsyncPlotService, method, inline(method))
+for method in BLOCKING_METHODS:
+    setattr(AsyncPlotService, method, blocking(method))
@@ -0,0 +1,151 @@
+"""Microbenchmarks for the code run once per plot line.
+
+Inputs are the plots in command_examples, repeated to make up --scale lines.
+Dispatch is measured against a simulated NextDraw.
+
+Run from the server directory:
+    python -m benchmarks.hot_paths [--scale N] [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import time
+from datetime import datetime, timezone
+
+from path_parser import parse_path
+from plot_commands import (API_OPTION_CASTS, breakdown_into_statements, cast_api_params, extract_definitions,
+                           extract_options, parse_command, parse_plot_file, split_command, statement_casts)
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), '..', 'command_examples')
+# Ratio of a result to its baseline reported as a regression
+REGRESSION_THRESHOLD = 1.1
+
+
+def example_sections():
+    """Options, definitions and commands of every example plot, concatenated."""
+    options, definitions, commands = [], [], []
+    for path in sorted(glob.glob(os.path.join(EXAMPLES, '*.txt'))):
+        with open(path) as plot_file:
+            plot_options, plot_definitions, plot_commands = parse_plot_file(plot_file)
+        options.extend(plot_options)
+        definitions.extend(plot_definitions)
+        commands.extend(plot_commands)
+    return options, definitions, commands
+
+
+def scaled(items, count):
+    return (items * (count // max(len(items), 1) + 1))[:count]
+
+
+def measure(function, repeat):
+    """Best wall clock seconds of repeat calls of function."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def parsing_benchmarks(scale):
+    """Yield (name, operation count, function) for the parsing hot paths."""
+    options, definitions, commands = example_sections()
+    definitions = scaled(definitions, scale)
+    commands = [line for line in commands if not line.startswith('#')]
+    bodies = [line.split()[1:] for line in definitions]
+    split = [split_command(line) for line in scaled(commands, scale)]
+    cast_inputs = scaled([(name, params) for name, params in split if name != 'draw_path'], scale)
+    paths = scaled([params[0] for name, params in split if name == 'draw_path'], scale)
+    command_lines = scaled(commands, scale)
+    option_lines = scaled(options, scale)
+
+    yield 'breakdown_into_statements', len(bodies), lambda: [breakdown_into_statements(body) for body in bodies]
+    yield 'extract_definitions', len(definitions), lambda: extract_definitions(definitions)
+    yield 'extract_options', len(option_lines), lambda: extract_options(option_lines)
+    yield 'split_command', len(command_lines), lambda: [split_command(line) for line in command_lines]
+    yield 'cast_api_params', len(cast_inputs), lambda: [
+        cast_api_params(statement_casts(name), name, params) for name, params in cast_inputs
+    ]
+    yield 'parse_command', len(command_lines), lambda: [parse_command(line) for line in command_lines]
+    yield 'parse_path', len(paths), lambda: [parse_path(text) for text in paths]
+
+
+def dispatch_benchmarks(scale):
+    """Yield (name, operation count, function) for command dispatch on a simulated NextDraw."""
+    from plot import plot_service_pb2
+    from server import PlotService
+    from simulator import SimulatedNextDraw
+
+    options, definitions, commands = example_sections()
+    service = PlotService(journal_dir='', nextdraw_factory=SimulatedNextDraw)
+    plotter = service.plotter()
+    plotter.hardware.call(plotter.initialize_plot, options, definitions)
+
+    option_statements = [(name, cast_api_params(API_OPTION_CASTS, name, ['30'])) for name in
+                         ('speed_pendown', 'speed_penup', 'pen_pos_down')] * (scale // 3)
+    function_statements = [('moveto', [float(i % 100), float(i % 50)]) for i in range(scale)]
+    definition_statements = [(name, []) for name in plotter.compiled_definitions] * (
+        scale // max(len(plotter.compiled_definitions), 1))
+    requests = [plot_service_pb2.CommandRequest(command=line) for line in scaled(
+        [line for line in commands if not line.startswith('#')], scale)]
+
+    def execute_all(statements):
+        return lambda: [plotter.execute_statement(name, params) for name, params in statements]
+
+    yield 'execute_statement option', len(option_statements), execute_all(option_statements)
+    yield 'execute_statement function', len(function_statements), execute_all(function_statements)
+    yield 'execute_statement definition', len(definition_statements), execute_all(definition_statements)
+    yield 'ProcessCommand', len(requests), lambda: [service.ProcessCommand(request, None) for request in requests]
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    print(f"\n{'benchmark':<32}{'baseline ns':>14}{'ns/op':>12}{'ratio':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['ns_per_op'] / baseline[name]['ns_per_op']
+        flag = "  regression" if ratio > REGRESSION_THRESHOLD else ""
+        print(f"{name:<32}{baseline[name]['ns_per_op']:>14.0f}{result['ns_per_op']:>12.0f}{ratio:>8.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-line hot paths of the server")
+    parser.add_argument('--scale', type=int, default=20000, help="lines of input for each benchmark")
+    parser.add_argument('--repeat', type=int, default=5, help="runs of each benchmark, the best is kept")
+    parser.add_argument('--output', default='hot_paths.json', help="file to write the results to as JSON")
+    parser.add_argument('--compare', help="earlier results file to compare against")
+    parser.add_argument('--skip-dispatch', action='store_true', help="only benchmark parsing")
+    args = parser.parse_args()
+
+    benchmarks = list(parsing_benchmarks(args.scale))
+    if not args.skip_dispatch:
+        benchmarks.extend(dispatch_benchmarks(args.scale))
+
+    results = {}
+    print(f"{'benchmark':<32}{'operations':>12}{'seconds':>10}{'ns/op':>12}")
+    for name, count, function in benchmarks:
+        seconds = measure(function, args.repeat)
+        results[name] = {'operations': count, 'seconds': seconds, 'ns_per_op': seconds / max(count, 1) * 1e9}
+        print(f"{name:<32}{count:>12}{seconds:>10.3f}{results[name]['ns_per_op']:>12.0f}")
+
+    with open(args.output, 'w') as output_file:
+        json.dump({
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'repeat': args.repeat,
+            'results': results,
+        }, output_file, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
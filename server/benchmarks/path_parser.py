@@ -0,0 +1,65 @@
+"""Compare draw_path parsing with parse_path against ast.literal_eval.
+
+Run from the server directory:
+    python -m benchmarks.path_parser [--paths N]
+"""
+import argparse
+import ast
+import os
+import time
+import tracemalloc
+
+from optimize import format_draw_path
+from path_parser import parse_path
+from plot_commands import parse_plot_file
+
+EXAMPLE_PLOT = os.path.join(os.path.dirname(__file__), '..', 'command_examples', 'bigger_plot.txt')
+
+
+def example_paths(count):
+    """Vertex list strings from the example plot, repeated to make up count paths."""
+    with open(EXAMPLE_PLOT) as plot_file:
+        _, _, commands = parse_plot_file(plot_file)
+    paths = [line.split(None, 1)[1] for line in commands if line.startswith('draw_path')]
+    return (paths * (count // len(paths) + 1))[:count]
+
+
+def long_path(vertices):
+    """A single vertex list string with the given number of vertices."""
+    return format_draw_path([(i * 0.01, (i * 7 % 1000) * 0.1) for i in range(vertices)]).split(None, 1)[1]
+
+
+def measure(parse, texts):
+    """Return (seconds, peak bytes) to parse all texts, keeping the results alive."""
+    start = time.perf_counter()
+    results = [parse(text) for text in texts]
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    results = [parse(text) for text in texts]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark draw_path parsing")
+    parser.add_argument('--paths', type=int, default=100000, help="number of example paths to parse")
+    parser.add_argument('--vertices', type=int, default=100000, help="vertices in the long path case")
+    args = parser.parse_args()
+
+    cases = [
+        (f"{args.paths} example paths", example_paths(args.paths)),
+        (f"1 path of {args.vertices} vertices", [long_path(args.vertices)]),
+    ]
+    print(f"{'case':<32}{'parser':<14}{'seconds':>10}{'peak MB':>10}{'speedup':>10}")
+    for name, texts in cases:
+        baseline, baseline_peak = measure(ast.literal_eval, texts)
+        elapsed, peak = measure(parse_path, texts)
+        print(f"{name:<32}{'literal_eval':<14}{baseline:>10.3f}{baseline_peak / 1e6:>10.1f}{1:>10.1f}")
+        print(f"{'':<32}{'parse_path':<14}{elapsed:>10.3f}{peak / 1e6:>10.1f}{baseline / elapsed:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
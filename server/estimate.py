@@ -0,0 +1,321 @@
+import argparse
+import logging
+from datetime import timedelta
+
+import numpy as np
+
+from plot_binary import BinaryPlot, is_binary_plot
+from plot_commands import extract_definitions, extract_options, parse_commands, parse_plot_file
+from plot_svg import is_svg_plot, iter_svg_commands
+
+# Motion model, approximating the NextDraw's limits
+MAX_SPEED = 220.9  # mm/s at 100% speed_pendown or speed_penup
+MAX_ACCEL = 1016.0  # mm/s^2 at 100% accel
+FULL_RANGE_PEN_TIME = 0.25  # seconds for the pen to travel 100% of its range at 100% pen rate
+
+# NextDraw defaults for the options the estimate depends on
+DEFAULT_OPTIONS = {
+    'speed_pendown': 25,
+    'speed_penup': 75,
+    'accel': 75,
+    'pen_pos_down': 30,
+    'pen_pos_up': 60,
+    'pen_rate_lower': 50,
+    'pen_rate_raise': 75,
+}
+MOTION_OPTIONS = ('speed_pendown', 'speed_penup', 'accel')
+
+
+def trapezoid_times(lengths, entry_speeds, exit_speeds, max_speeds, accels):
+    """Time to travel each segment accelerating at a constant rate between its entry, peak and exit speeds.
+
+    All arguments are arrays with one element per segment.
+    """
+    accelerating = (max_speeds ** 2 - entry_speeds ** 2) / (2 * accels)
+    decelerating = (max_speeds ** 2 - exit_speeds ** 2) / (2 * accels)
+    cruise = lengths - accelerating - decelerating
+    trapezoid = ((max_speeds - entry_speeds) + (max_speeds - exit_speeds)) / accels + np.maximum(cruise, 0) / max_speeds
+
+    # segments too short to reach full speed peak part way along
+    peak = np.sqrt((2 * accels * lengths + entry_speeds ** 2 + exit_speeds ** 2) / 2)
+    triangle = ((peak - entry_speeds) + (peak - exit_speeds)) / accels
+
+    # segments too short to change from their entry to their exit speed are taken at the mean speed
+    ramp = lengths / np.maximum((entry_speeds + exit_speeds) / 2, 1e-9)
+    return np.where(cruise >= 0, trapezoid,
+                    np.where(peak >= np.maximum(entry_speeds, exit_speeds), triangle, ramp))
+
+
+def pen_move_time(pen_pos_up, pen_pos_down, rate):
+    """Seconds to raise or lower the pen between its up and down positions at a pen rate percentage."""
+    return abs(pen_pos_up - pen_pos_down) * FULL_RANGE_PEN_TIME / max(rate, 1)
+
+
+def polyline_motion(polylines, max_speeds, accels, stops=None):
+    """Return (distance, seconds) to draw polylines that each start and end at rest.
+
+    Motion slows at each vertex in proportion to how sharply the path turns.
+
+    Args:
+        polylines (list): (n, 2) vertex arrays with at least two vertices each
+        max_speeds (ndarray): Speed limit in mm/s for each polyline
+        accels (ndarray): Acceleration in mm/s^2 for each polyline
+        stops (ndarray, optional): True for each polyline that comes to rest at every vertex
+    """
+    points = np.concatenate(polylines)
+    counts = np.array([len(polyline) for polyline in polylines])
+    # drop the segments joining the last vertex of one polyline to the first of the next
+    joins = np.cumsum(counts)[:-1] - 1
+    deltas = np.delete(np.diff(points, axis=0), joins, axis=0)
+    polyline_ids = np.repeat(np.arange(len(counts)), counts - 1)
+    lengths = np.hypot(deltas[:, 0], deltas[:, 1])
+    max_speeds, accels = max_speeds[polyline_ids], accels[polyline_ids]
+
+    # speed through the vertex between consecutive segments of a polyline, full speed when
+    # the path runs straight on and zero when it turns through a right angle or more
+    same_polyline = polyline_ids[1:] == polyline_ids[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cosines = np.einsum('ij,ij->i', deltas[1:], deltas[:-1]) / (lengths[1:] * lengths[:-1])
+    cosines = np.nan_to_num(cosines, nan=1.0)
+    reachable = np.sqrt(2 * accels[1:] * np.minimum(lengths[1:], lengths[:-1]))
+    if stops is not None:
+        same_polyline &= ~stops[polyline_ids[1:]]
+    junctions = np.where(same_polyline, np.minimum(max_speeds[1:] * np.clip(cosines, 0, 1), reachable), 0)
+
+    entry_speeds = np.concatenate(([0.0], junctions))
+    exit_speeds = np.concatenate((junctions, [0.0]))
+    times = trapezoid_times(lengths, entry_speeds, exit_speeds, max_speeds, accels)
+    return float(lengths.sum()), float(times.sum())
+
+
+class PlotEstimator:
+    """Collects the moves of a plot so its distances and duration can be estimated in one vectorized pass.
+
+    Pen-down polylines come to rest at their ends and slow at each vertex in
+    proportion to how sharply the path turns. Pen-up moves start and end at rest.
+    Consecutive pen-down moves are collected into one polyline that comes to rest
+    at every vertex, as the NextDraw does at the end of each interactive move.
+    """
+
+    def __init__(self, options, definitions):
+        """
+        Args:
+            options (dict): Options as returned by extract_options
+            definitions (dict): Definitions as returned by extract_definitions
+        """
+        self.options = dict(DEFAULT_OPTIONS)
+        for name, params in options.items():
+            if name in DEFAULT_OPTIONS and params:
+                self.options[name] = params[0]
+        self.definitions = definitions
+        self.expanding = set()
+        self.x = self.y = 0.0
+        self.pen_up = True
+        self.pen_lifts = 0
+        self.pen_lowers = 0
+        self.pen_time = 0.0
+        self.delay_time = 0.0
+        self.motion_settings = []
+        self.settings_index = self.add_motion_settings()
+        self.polylines = []
+        self.polyline_settings = []
+        self.polyline_stops = []
+        self.line_run = []
+        self.travel = []
+        self.travel_settings = []
+
+    def add_motion_settings(self):
+        """Record the current motion options, returning their index in motion_settings.
+
+        Raises:
+            ValueError: If a speed or the acceleration is not positive, as no time could be estimated
+        """
+        for name in MOTION_OPTIONS:
+            if not self.options[name] > 0:
+                raise ValueError(f"Option {name} must be positive to estimate a plot, not {self.options[name]}")
+        self.motion_settings.append(tuple(self.options[name] for name in MOTION_OPTIONS))
+        return len(self.motion_settings) - 1
+
+    def pen_move_time(self, rate_option):
+        return pen_move_time(self.options['pen_pos_up'], self.options['pen_pos_down'], self.options[rate_option])
+
+    def add_polyline(self, vertices, stops):
+        self.polylines.append(vertices)
+        self.polyline_settings.append(self.settings_index)
+        self.polyline_stops.append(stops)
+
+    def end_line_run(self):
+        """Add the pen-down moves collected since the pen was lowered or the motion options changed."""
+        if self.line_run:
+            self.add_polyline(np.array(self.line_run, dtype=float), True)
+            self.line_run = []
+
+    def raise_pen(self):
+        if not self.pen_up:
+            self.end_line_run()
+            self.pen_up = True
+            self.pen_lifts += 1
+            self.pen_time += self.pen_move_time('pen_rate_raise')
+
+    def lower_pen(self):
+        if self.pen_up:
+            self.pen_up = False
+            self.pen_lowers += 1
+            self.pen_time += self.pen_move_time('pen_rate_lower')
+
+    def move(self, x, y):
+        if self.pen_up:
+            self.travel.append((self.x, self.y, x, y))
+            self.travel_settings.append(self.settings_index)
+        else:
+            if not self.line_run:
+                self.line_run.append((self.x, self.y))
+            self.line_run.append((x, y))
+        self.x, self.y = x, y
+
+    def add(self, name, params):
+        """Add the moves of a parsed (name, params) statement."""
+        if name in self.definitions:
+            if name in self.expanding:
+                raise ValueError(f"Recursive definition {name}")
+            self.expanding.add(name)
+            for statement in self.definitions[name]:
+                self.add(*statement)
+            self.expanding.discard(name)
+        elif name in DEFAULT_OPTIONS and params:
+            self.options[name] = params[0]
+            if name in MOTION_OPTIONS:
+                self.end_line_run()
+                self.settings_index = self.add_motion_settings()
+        elif name == 'draw_path':
+            vertices = np.asarray(params[0], dtype=float)
+            if len(vertices) < 2:
+                return
+            self.raise_pen()
+            self.move(*vertices[0])
+            self.lower_pen()
+            self.add_polyline(vertices, False)
+            self.raise_pen()
+            self.x, self.y = vertices[-1]
+        elif name in ('moveto', 'lineto', 'goto', 'move', 'line', 'go'):
+            x, y = params[0], params[1]
+            if name in ('move', 'line', 'go'):
+                x, y = self.x + x, self.y + y
+            if name in ('moveto', 'move'):
+                self.raise_pen()
+            elif name in ('lineto', 'line'):
+                self.lower_pen()
+            self.move(x, y)
+        elif name == 'penup':
+            self.raise_pen()
+        elif name == 'pendown':
+            self.lower_pen()
+        elif name == 'delay' and params:
+            self.delay_time += params[0] / 1000
+
+    def settings_arrays(self, indexes):
+        settings = np.array(self.motion_settings, dtype=float)[indexes]
+        return settings[:, 0] * MAX_SPEED / 100, settings[:, 1] * MAX_SPEED / 100, settings[:, 2] * MAX_ACCEL / 100
+
+    def pen_down_motion(self):
+        """Return (distance, seconds) for all pen-down polylines."""
+        self.end_line_run()
+        if not self.polylines:
+            return 0.0, 0.0
+        max_speeds, _, accels = self.settings_arrays(np.array(self.polyline_settings))
+        return polyline_motion(self.polylines, max_speeds, accels, np.array(self.polyline_stops))
+
+    def pen_up_motion(self):
+        """Return (distance, seconds) for all pen-up moves."""
+        if not self.travel:
+            return 0.0, 0.0
+        moves = np.array(self.travel)
+        lengths = np.hypot(moves[:, 2] - moves[:, 0], moves[:, 3] - moves[:, 1])
+        _, max_speeds, accels = self.settings_arrays(np.array(self.travel_settings))
+        at_rest = np.zeros(len(lengths))
+        times = trapezoid_times(lengths, at_rest, at_rest, max_speeds, accels)
+        return float(lengths.sum()), float(times.sum())
+
+    def bounds(self):
+        """Return (min_x, min_y, max_x, max_y) of everything drawn with the pen down, or None if nothing is."""
+        self.end_line_run()
+        if not self.polylines:
+            return None
+        vertices = np.concatenate(self.polylines)
+        (min_x, min_y), (max_x, max_y) = vertices.min(axis=0), vertices.max(axis=0)
+        return float(min_x), float(min_y), float(max_x), float(max_y)
+
+    def estimate(self):
+        """Estimate the plot's distances and duration.
+
+        Returns:
+            dict: pen_down_distance and pen_up_distance in mm, pen_lifts and duration in seconds
+        """
+        pen_down_distance, pen_down_time = self.pen_down_motion()
+        pen_up_distance, pen_up_time = self.pen_up_motion()
+        return {
+            'pen_down_distance': pen_down_distance,
+            'pen_up_distance': pen_up_distance,
+            'pen_lifts': self.pen_lifts,
+            'duration': pen_down_time + pen_up_time + self.pen_time + self.delay_time,
+        }
+
+
+def estimate_plot(raw_options, raw_definitions, statements):
+    """Estimate the distances and duration of a plot.
+
+    Args:
+        raw_options (list[str]): Option lines of the plot
+        raw_definitions (list[str]): Definition lines of the plot
+        statements (iterable): Parsed (name, params) statements of the plot's commands
+
+    Returns:
+        dict: Estimate as returned by PlotEstimator.estimate
+    """
+    return trace_plot(raw_options, raw_definitions, statements).estimate()
+
+
+def trace_plot(raw_options, raw_definitions, statements):
+    """Collect the moves of a plot, returning a PlotEstimator holding its pen-down polylines and pen-up travel."""
+    estimator = PlotEstimator(extract_options(raw_options), extract_definitions(raw_definitions))
+    for name, params in statements:
+        estimator.add(name, params)
+    estimator.end_line_run()
+    return estimator
+
+
+def trace_plot_file(path):
+    """Collect the moves of a text, binary or SVG plot file with trace_plot."""
+    if is_binary_plot(path):
+        plot = BinaryPlot(path)
+        try:
+            return trace_plot(plot.options, plot.definitions, plot)
+        finally:
+            plot.close()
+    if is_svg_plot(path):
+        return trace_plot([], [], parse_commands(iter_svg_commands(path)))
+    with open(path) as plot_file:
+        options, definitions, commands = parse_plot_file(plot_file)
+    return trace_plot(options, definitions, parse_commands(commands))
+
+
+def estimate_plot_file(path):
+    """Estimate the distances and duration of a text, binary or SVG plot file."""
+    return trace_plot_file(path).estimate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate the distances and duration of a plot")
+    parser.add_argument('plot', help="text or binary plot file")
+    args = parser.parse_args()
+
+    estimate = estimate_plot_file(args.plot)
+    logging.info(f"Pen-down distance: {estimate['pen_down_distance'] / 1000:.2f}m")
+    logging.info(f"Pen-up distance: {estimate['pen_up_distance'] / 1000:.2f}m")
+    logging.info(f"Pen lifts: {estimate['pen_lifts']}")
+    logging.info(f"Duration: {timedelta(seconds=round(estimate['duration']))}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,95 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Calls waiting for the hardware thread before submitting blocks
+HARDWARE_QUEUE_SIZE = 64
+
+
+class HardwareWorker:
+    """Runs every call that touches the NextDraw on one dedicated thread, in submission order.
+
+    Callers parse and validate commands on their own threads and submit only the
+    NextDraw calls, so the next command is ready as soon as the current motion ends.
+    The queue is bounded so a fast producer is held back rather than buffering a
+    whole plot.
+
+    With metrics, records how long calls wait in the queue, how long the hardware
+    thread sits idle between calls and the queue depth.
+    """
+
+    def __init__(self, queue_size=HARDWARE_QUEUE_SIZE, metrics=None, name="nextdraw", labels=None):
+        """
+        Args:
+            queue_size (int): Calls waiting before submitting blocks
+            metrics (Metrics, optional): Registry to record queue latencies in
+            name (str): Name of the hardware thread
+            labels (dict, optional): Labels of the recorded metrics, such as the device they are for
+        """
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.metrics = metrics
+        self.labels = labels or {}
+        self.finished = None
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, function, *args, block=True):
+        """Queue a call for the hardware thread.
+
+        Args:
+            block (bool): Wait for room in a full queue, otherwise raise queue.Full
+
+        Returns:
+            Future: Resolves to the call's return value or exception
+        """
+        future = Future()
+        if threading.current_thread() is self.thread:
+            # already on the hardware thread, queueing would deadlock
+            self.execute(future, function, args)
+        else:
+            self.queue.put((future, function, args, time.perf_counter()), block=block)
+            if self.metrics is not None:
+                self.metrics.set_gauge('hardware_queue_depth', self.queue.qsize(), **self.labels)
+        return future
+
+    def call(self, function, *args):
+        """Run a call on the hardware thread and wait for its result."""
+        return self.submit(function, *args).result()
+
+    @property
+    def depth(self):
+        return self.queue.qsize()
+
+    def execute(self, future, function, args):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            future, function, args, queued = item
+            if self.metrics is not None:
+                self.record_start(queued)
+            self.execute(future, function, args)
+            self.finished = time.perf_counter()
+        logging.info(f"Hardware thread {self.thread.name} stopped")
+
+    def record_start(self, queued):
+        started = time.perf_counter()
+        self.metrics.observe('hardware_queue_wait_seconds', started - queued, **self.labels)
+        if self.finished is not None:
+            # time the NextDraw sat waiting since the previous call finished
+            self.metrics.observe('hardware_idle_seconds', started - self.finished, **self.labels)
+        self.metrics.set_gauge('hardware_queue_depth', self.queue.qsize(), **self.labels)
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
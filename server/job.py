@@ -0,0 +1,274 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+from optimize import PlotTracker
+from plot_commands import COMMENT_PREFIX
+from progress import ProgressEvent
+
+# Job states, named as in the JobState enum of plot_service.proto
+JOB_READY = 'JOB_READY'
+JOB_PLOTTING = 'JOB_PLOTTING'
+JOB_PAUSED = 'JOB_PAUSED'
+JOB_FINISHED = 'JOB_FINISHED'
+JOB_CANCELLED = 'JOB_CANCELLED'
+JOB_FAILED = 'JOB_FAILED'
+
+PAUSE_COMMAND = 'pause'
+# Comments starting a new layer of the plot, followed by the layer name
+LAYER_PREFIX = '# Layer:'
+# Statements queued on the hardware thread ahead of the one being plotted
+JOB_READ_AHEAD = 16
+# Minimum seconds between progress events while plotting, state changes are always published
+PROGRESS_INTERVAL = 0.25
+
+
+class PlotJob:
+    """Plots the parsed commands of an uploaded plot file on a background thread.
+
+    `pause` commands in the plot and pause requests move the pen to its pause
+    position and hold the job until it is resumed, mirroring the Plot Director
+    Client. Statements are queued on the hardware thread up to JOB_READ_AHEAD
+    ahead of the one being plotted, so pause and cancel requests take effect once
+    the queued statements have been plotted.
+
+    With a journal, completed statements are recorded as they finish so a job
+    interrupted by a crash or power loss can be continued with recover. With a
+    progress broadcaster, state changes and progress are published as they happen.
+    """
+
+    def __init__(self, statements, execute, move_to_pause_position, submit, read_ahead=JOB_READ_AHEAD,
+                 journal=None, definitions=None, progress=None):
+        """
+        Args:
+            statements: Sized iterable of (name, params) pairs of the plot's commands, params already cast
+            execute (callable): Executes a (name, params) statement, returning (success, message)
+            move_to_pause_position (callable): Moves the pen out of the way while paused
+            submit (callable): Queues a call on the hardware thread, returning a Future of its result
+            read_ahead (int): Maximum statements queued ahead of the one being plotted
+            journal (JobJournal, optional): Journal recording the job's progress
+            definitions (dict, optional): Definitions of the plot, followed when tracking the pen
+            progress (ProgressBroadcaster, optional): Receives the job's progress events
+        """
+        self.statements = statements
+        self.execute = execute
+        self.move_to_pause_position = move_to_pause_position
+        self.submit = submit
+        self.read_ahead = max(1, read_ahead)
+        self.journal = journal
+        self.progress = progress
+        self.tracker = PlotTracker(definitions or {})
+        # statements plotted so far, and when this run started
+        self.index = 0
+        self.start_index = 0
+        self.layer = ""
+        self.state = JOB_READY
+        self.message = ""
+        self.condition = threading.Condition()
+        self.pause_requested = False
+        self.cancel_requested = False
+        self.thread = None
+        self.plotting_time = 0.0
+        self.plotting_since = None
+        self.published = 0.0
+        self.publish(state_change=True)
+
+    @property
+    def active(self):
+        return self.state in (JOB_PLOTTING, JOB_PAUSED)
+
+    def elapsed(self):
+        """Seconds this run of the job has spent plotting, not counting pauses."""
+        if self.plotting_since is None:
+            return self.plotting_time
+        return self.plotting_time + time.monotonic() - self.plotting_since
+
+    def eta(self):
+        """Seconds to finish at the rate statements have been plotted so far, 0 until one has."""
+        done = self.index - self.start_index
+        if done <= 0:
+            return 0.0
+        return self.elapsed() / done * max(len(self.statements) - self.index, 0)
+
+    def publish(self, state_change=False):
+        if self.progress is None:
+            return
+        self.published = time.monotonic()
+        self.progress.publish(ProgressEvent(
+            self.state, self.index, len(self.statements), self.layer, self.tracker.pen_down_distance,
+            self.eta(), self.message
+        ), state_change)
+
+    def set_state(self, state, message=""):
+        """Change state, timing the plot while it is plotting, and publish the change."""
+        now = time.monotonic()
+        if self.plotting_since is not None:
+            self.plotting_time += now - self.plotting_since
+        self.plotting_since = now if state == JOB_PLOTTING else None
+        self.state = state
+        self.message = message
+        self.publish(state_change=True)
+
+    @property
+    def recovered(self):
+        """Progress of an earlier, interrupted run of this plot, or None."""
+        return self.journal.recovered if self.journal is not None else None
+
+    def start(self):
+        with self.condition:
+            if self.state != JOB_READY:
+                raise RuntimeError(f"Job cannot be started while {self.state}")
+            if self.journal is not None:
+                self.journal.open(resume=False)
+            self.launch(recovering=False)
+
+    def recover(self):
+        """Start the job after the last statement its journal records as completed."""
+        with self.condition:
+            if self.state != JOB_READY:
+                raise RuntimeError(f"Job cannot be recovered while {self.state}")
+            if self.recovered is None:
+                raise RuntimeError("Job has no interrupted progress to resume")
+            self.journal.open(resume=True)
+            self.index = self.start_index = self.recovered.index
+            self.tracker.x, self.tracker.y = self.recovered.x, self.recovered.y
+            self.tracker.pen_up = self.recovered.pen_up
+            self.launch(recovering=True)
+
+    def launch(self, recovering):
+        self.set_state(JOB_PLOTTING)
+        self.thread = threading.Thread(target=self.run, args=(recovering,), name="plot-job", daemon=True)
+        self.thread.start()
+
+    def pause(self):
+        with self.condition:
+            if self.state != JOB_PLOTTING:
+                raise RuntimeError(f"Job cannot be paused while {self.state}")
+            self.pause_requested = True
+
+    def resume(self):
+        with self.condition:
+            if self.state != JOB_PAUSED:
+                raise RuntimeError(f"Job cannot be resumed while {self.state}")
+            self.set_state(JOB_PLOTTING)
+            self.condition.notify_all()
+
+    def cancel(self):
+        with self.condition:
+            if not self.active and self.state != JOB_READY:
+                raise RuntimeError(f"Job cannot be cancelled while {self.state}")
+            if self.state == JOB_READY:
+                self.set_state(JOB_CANCELLED, "Plot cancelled before it started")
+                return
+            self.cancel_requested = True
+            self.condition.notify_all()
+
+    def wait(self, timeout=None):
+        """Wait for the job thread to finish, returns True if it has."""
+        if self.thread is None:
+            return True
+        self.thread.join(timeout)
+        return not self.thread.is_alive()
+
+    def enter_pause(self, message):
+        self.submit(self.move_to_pause_position).result()
+        if self.journal is not None:
+            self.journal.sync()
+        with self.condition:
+            self.set_state(JOB_PAUSED, message)
+            logging.info(f"Plot paused at command {self.index}: {message}")
+            while self.state == JOB_PAUSED and not self.cancel_requested:
+                self.condition.wait()
+
+    def log_comment(self, name, params):
+        logging.info(' '.join([name] + params))
+        return True, ""
+
+    def restore(self, state):
+        """Re-home, replay the option state and return the pen to where the interrupted run left it."""
+        self.execute('penup', [])
+        self.move_to_pause_position()
+        for name, params in state.options.items():
+            self.execute(name, params)
+        self.execute('moveto', [state.x, state.y])
+        if not state.pen_up:
+            self.execute('pendown', [])
+        logging.info(f"Plot resumed from journal after command {state.index}")
+
+    def remaining(self):
+        """Statements not yet plotted, skipped without decoding where the statements allow it."""
+        if self.index and hasattr(self.statements, 'iter_from'):
+            return self.statements.iter_from(self.index)
+        return itertools.islice(self.statements, self.index, None)
+
+    def advance(self, name, params):
+        self.index += 1
+        options = self.tracker.follow(name, params)
+        if name.startswith(COMMENT_PREFIX):
+            comment = ' '.join([name] + params)
+            if comment.startswith(LAYER_PREFIX):
+                self.layer = comment[len(LAYER_PREFIX):].strip()
+        if self.journal is not None:
+            self.journal.record(self.index, options, self.tracker)
+        if time.monotonic() - self.published >= PROGRESS_INTERVAL:
+            self.publish()
+
+    def complete(self, pending):
+        """Wait for the oldest queued statement to be plotted."""
+        future, name, params = pending.popleft()
+        success, message = future.result()
+        self.advance(name, params)
+        if not success:
+            logging.error(f"Command {self.index}: {message}")
+
+    def drain(self, pending):
+        while pending:
+            self.complete(pending)
+
+    def run(self, recovering=False):
+        pending = deque()
+        try:
+            if recovering:
+                self.submit(self.restore, self.recovered).result()
+            for name, params in self.remaining():
+                if self.pause_requested or self.cancel_requested:
+                    self.drain(pending)
+                if self.pause_requested:
+                    self.pause_requested = False
+                    self.enter_pause("Plot manually paused")
+                if self.cancel_requested:
+                    break
+
+                if name == PAUSE_COMMAND:
+                    self.drain(pending)
+                    self.advance(name, params)
+                    self.enter_pause(' '.join(params) or "Plot paused")
+                    continue
+                # comments are queued too so they are logged as the plot reaches them
+                action = self.log_comment if name.startswith(COMMENT_PREFIX) else self.execute
+                pending.append((self.submit(action, name, params), name, params))
+                while len(pending) > self.read_ahead or (pending and pending[0][0].done()):
+                    self.complete(pending)
+            self.drain(pending)
+
+            if self.cancel_requested:
+                self.submit(self.move_to_pause_position).result()
+                self.finish(JOB_CANCELLED, f"Plot cancelled at command {self.index}")
+            else:
+                self.finish(JOB_FINISHED, "Plot finished")
+        except Exception as e:
+            for future, _, _ in pending:
+                future.cancel()
+            logging.exception("Plot job failed")
+            self.finish(JOB_FAILED, f"Plot failed at command {self.index}: {str(e)}")
+
+    def finish(self, state, message):
+        if self.journal is not None:
+            # a failed job gets no end record so it can be recovered
+            self.journal.close(state if state != JOB_FAILED else None)
+        with self.condition:
+            self.set_state(state, message)
+            self.condition.notify_all()
+        logging.info(message)
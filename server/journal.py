@@ -0,0 +1,136 @@
+import hashlib
+import logging
+import os
+import time
+from collections import namedtuple
+
+from plot_commands import API_OPTION_CASTS, cast_api_params
+
+JOURNAL_SUFFIX = '.journal'
+# Seconds between fsyncs of the journal while plotting
+JOURNAL_SYNC_INTERVAL = 1.0
+
+# Journal records, one per line:
+#   O <name> <params>       option set by the statement recorded next
+#   D <index> <pen> <x> <y> statements completed, pen up (1) or down (0) and pen position afterwards
+#   E <state>               job finished or was cancelled, nothing to resume
+OPTION_RECORD = 'O'
+DONE_RECORD = 'D'
+END_RECORD = 'E'
+
+# Progress of an interrupted job as recovered from its journal
+JournalState = namedtuple('JournalState', ['index', 'options', 'pen_up', 'x', 'y'])
+
+
+def plot_identity(chunks):
+    """Identify a plot by the SHA-256 of its content, so a reloaded plot finds its journal.
+
+    Args:
+        chunks (iterable): bytes of the plot and of any settings that change what is plotted
+    """
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_identity(path, chunk_size=1024 * 1024):
+    with open(path, 'rb') as plot_file:
+        return plot_identity(iter(lambda: plot_file.read(chunk_size), b''))
+
+
+def read_journal(path):
+    """Recover the progress of an interrupted job.
+
+    A final line without a newline was torn by the crash and is ignored.
+
+    Returns:
+        JournalState: Progress after the last completed statement, or None if there is
+        no journal, nothing was completed or the job ended
+    """
+    try:
+        with open(path) as journal_file:
+            lines = journal_file.read().split('\n')[:-1]
+    except FileNotFoundError:
+        return None
+
+    state, options = None, {}
+    for line in lines:
+        record, _, fields = line.partition(' ')
+        if record == OPTION_RECORD:
+            name, _, params = fields.partition(' ')
+            options[name] = cast_api_params(API_OPTION_CASTS, name, params.split())
+        elif record == DONE_RECORD:
+            index, pen, x, y = fields.split()
+            state = JournalState(int(index), dict(options), pen == '1', float(x), float(y))
+        elif record == END_RECORD:
+            return None
+    return state
+
+
+class JobJournal:
+    """Append-only on-disk record of a plot job's progress for resuming it after a crash or power loss.
+
+    Records are flushed to the operating system as statements complete, so they
+    survive the server process dying, but are only fsynced every sync_interval
+    seconds so the disk does not hold up the plot.
+    """
+
+    def __init__(self, path, sync_interval=JOURNAL_SYNC_INTERVAL):
+        """
+        Args:
+            path (str): Journal file
+            sync_interval (float): Seconds between fsyncs
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self.recovered = read_journal(path)
+        self.file = None
+        self.synced = 0.0
+
+    def open(self, resume):
+        """Open the journal, continuing from the recovered state if resume is set, otherwise starting afresh."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if resume and self.recovered is not None:
+            self.file = open(self.path, 'a')
+        else:
+            self.file = open(self.path, 'w')
+        self.synced = time.monotonic()
+
+    def record(self, index, options, tracker):
+        """Record that the statement at index, counting from 1, has been completed.
+
+        Args:
+            index (int): Statements completed
+            options (list): (name, params) of the options the statement set
+            tracker (MotionTracker): Pen state and position after the statement
+        """
+        if self.file is None:
+            return
+        lines = [f"{OPTION_RECORD} {option} {' '.join(map(str, values))}" for option, values in options]
+        lines.append(f"{DONE_RECORD} {index} {int(tracker.pen_up)} {tracker.x!r} {tracker.y!r}")
+        self.file.write('\n'.join(lines) + '\n')
+        self.file.flush()
+        if time.monotonic() - self.synced >= self.sync_interval:
+            self.sync()
+
+    def sync(self):
+        if self.file is None:
+            return
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.synced = time.monotonic()
+
+    def close(self, state=None):
+        """Close the journal, marking the job as ended if given its final state."""
+        if self.file is None:
+            return
+        try:
+            if state is not None:
+                self.file.write(f"{END_RECORD} {state}\n")
+            self.sync()
+        except OSError as e:
+            logging.error(f"Failed to close job journal {self.path}: {str(e)}")
+        finally:
+            self.file.close()
+            self.file = None
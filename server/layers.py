@@ -0,0 +1,166 @@
+import logging
+from collections import namedtuple
+from concurrent.futures import Future
+
+from estimate import PlotEstimator
+from job import LAYER_PREFIX
+from optimize import optimize_commands
+from plot_commands import extract_definitions, extract_options, parse_commands
+
+# What preparing a layer found: its strokes, the bounding box of what it draws and its estimate
+LayerSummary = namedtuple('LayerSummary', [
+    'stroke_count', 'bounds', 'pen_down_distance', 'pen_up_distance', 'pen_lifts', 'duration'
+])
+# A prepared layer in a plot's layer index, first_command counting from 0 over the whole plot's statements
+LayerInfo = namedtuple('LayerInfo', ['name', 'first_command', 'command_count', 'summary'])
+
+
+def split_layers(commands):
+    """Split plot command lines into layers at each "# Layer:" comment.
+
+    Commands before the first layer comment form a layer with no name.
+
+    Returns:
+        list: (name, command lines) of each layer, each layer's lines starting with its layer comment
+    """
+    layers = []
+    name, lines = "", []
+    for command_line in commands:
+        if command_line.startswith(LAYER_PREFIX):
+            if lines:
+                layers.append((name, lines))
+            name, lines = command_line[len(LAYER_PREFIX):].strip(), []
+        lines.append(command_line)
+    if lines:
+        layers.append((name, lines))
+    return layers
+
+
+def prepare_layer(raw_options, raw_definitions, name, lines, reorder, merge_tolerance, simplify_tolerance,
+                  remove_redundant=False, fuse=False):
+    """Optimize, parse and estimate one layer, run in a worker process.
+
+    The layer is prepared on its own, as if plotting started with it. Option changes
+    made by earlier layers are not seen by its estimate, and the first stroke run is
+    reordered from the home position rather than from where the previous layer ends,
+    and redundant commands are only found once the layer has set the pen state.
+
+    Returns:
+        tuple: (statements, LayerSummary) of the layer
+
+    Raises:
+        ValueError: If a command's parameters cannot be cast, naming the layer
+    """
+    definitions = extract_definitions(raw_definitions)
+    if reorder or merge_tolerance or simplify_tolerance or remove_redundant or fuse:
+        lines, _ = optimize_commands(lines, reorder=reorder, merge_tolerance=merge_tolerance,
+                                     simplify_tolerance=simplify_tolerance, remove_redundant=remove_redundant,
+                                     definitions=definitions, fuse=fuse)
+    try:
+        statements = parse_commands(lines)
+    except ValueError as e:
+        raise ValueError(f"Layer {name or '(unnamed)'}: {str(e)}")
+    estimator = PlotEstimator(extract_options(raw_options), definitions)
+    for statement in statements:
+        estimator.add(*statement)
+    estimate = estimator.estimate()
+    return statements, LayerSummary(
+        estimator.pen_lowers, estimator.bounds(), estimate['pen_down_distance'], estimate['pen_up_distance'],
+        estimate['pen_lifts'], estimate['duration']
+    )
+
+
+class LayeredPlot:
+    """The statements of a text plot, prepared a layer at a time in a process pool.
+
+    Every layer is submitted to the pool at once, so layers are prepared in
+    parallel across cores. Iterating waits only for the layer being reached, so a
+    job can start plotting the first layer while later ones are still being
+    prepared. Until a layer is prepared its length is taken to be its number of
+    command lines, which merging strokes may reduce. A layer that fails to prepare
+    fails the job when it is reached.
+    """
+
+    def __init__(self, options, definitions, commands, executor=None, reorder=False, merge_tolerance=0.0,
+                 simplify_tolerance=0.0, remove_redundant=False, fuse=False):
+        """
+        Args:
+            options (list[str]): Option lines of the plot
+            definitions (list[str]): Definition lines of the plot
+            commands (list[str]): Command lines of the plot
+            executor (Executor, optional): Pool preparing the layers, prepared on the calling thread if None
+            reorder (bool): Reorder strokes to reduce pen-up travel
+            merge_tolerance (float): Merge strokes with endpoints this close in mm, 0 disables merging
+            simplify_tolerance (float): Remove vertices within this distance in mm, 0 disables simplification
+            remove_redundant (bool): Remove commands that have no effect and fold runs of pen-up moves
+            fuse (bool): Fuse runs of lineto and line commands into draw_path strokes
+        """
+        layers = split_layers(commands)
+        self.names = [name for name, _ in layers]
+        self.line_counts = [len(lines) for _, lines in layers]
+        self.futures = []
+        for name, lines in layers:
+            arguments = (options, definitions, name, lines, reorder, merge_tolerance, simplify_tolerance,
+                         remove_redundant, fuse)
+            if executor is not None and len(layers) > 1:
+                self.futures.append(executor.submit(prepare_layer, *arguments))
+            else:
+                # a plot prepared here reports errors when it is loaded rather than when they are reached
+                self.futures.append(completed(prepare_layer(*arguments)))
+
+    def __len__(self):
+        return sum(line_count if statements is None else len(statements)
+                   for statements, line_count in zip(map(prepared_statements, self.futures), self.line_counts))
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    @property
+    def command_count(self):
+        """Number of statements the job runs, as len() counts them."""
+        return len(self)
+
+    def iter_from(self, start):
+        """Iterate the statements from index start, waiting for each layer to be prepared as it is reached."""
+        for future in self.futures:
+            statements = future.result()[0]
+            if start >= len(statements):
+                start -= len(statements)
+                continue
+            yield from statements[start:]
+            start = 0
+
+    @property
+    def complete(self):
+        return all(future.done() for future in self.futures)
+
+    def index(self):
+        """Return the LayerInfo of each prepared layer up to the first one still being prepared."""
+        layers, first_command = [], 0
+        for name, future in zip(self.names, self.futures):
+            if prepared_statements(future) is None:
+                break
+            statements, summary = future.result()
+            layers.append(LayerInfo(name, first_command, len(statements), summary))
+            first_command += len(statements)
+        return layers
+
+    def close(self):
+        """Stop preparing layers that have not started."""
+        cancelled = sum(future.cancel() for future in self.futures)
+        if cancelled:
+            logging.info(f"Cancelled preparing {cancelled} layers")
+
+
+def prepared_statements(future):
+    """Return the statements of a prepared layer, None if it is still being prepared or failed."""
+    if not future.done() or future.cancelled() or future.exception() is not None:
+        return None
+    return future.result()[0]
+
+
+def completed(result):
+    """Return a Future already resolved to a result, standing in for one from an executor."""
+    future = Future()
+    future.set_result(result)
+    return future
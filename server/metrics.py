@@ -0,0 +1,216 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+import grpc
+
+# Upper bounds in seconds of the latency histogram buckets, a final bucket takes anything slower
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Prefix of metric names in the Prometheus text format
+PROMETHEUS_PREFIX = "plot_director_"
+# Seconds between writes of the Prometheus text file
+DEFAULT_METRICS_INTERVAL = 15.0
+
+
+class Histogram:
+    """Counts of observations falling in each bucket, with their total and number."""
+
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def copy(self):
+        histogram = Histogram(self.bounds)
+        histogram.counts = list(self.counts)
+        histogram.count = self.count
+        histogram.sum = self.sum
+        return histogram
+
+
+class Metrics:
+    """Thread-safe registry of latency histograms and gauges keyed by metric name and labels."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.gauges = {}
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def set_gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        """Copy the current metrics.
+
+        Returns:
+            tuple: ([(name, labels, Histogram)], [(name, labels, value)]) sorted by name and labels
+        """
+        with self.lock:
+            histograms = [(name, dict(labels), histogram.copy())
+                          for (name, labels), histogram in sorted(self.histograms.items())]
+            gauges = [(name, dict(labels), value) for (name, labels), value in sorted(self.gauges.items())]
+        return histograms, gauges
+
+    def prometheus_text(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        histograms, gauges = self.snapshot()
+        lines, typed = [], set()
+        for name, labels, histogram in histograms:
+            metric = PROMETHEUS_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.bounds + (float('inf'),), histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{metric}_bucket{format_labels(labels, le=le)} {cumulative}")
+            lines.append(f"{metric}_sum{format_labels(labels)} {histogram.sum!r}")
+            lines.append(f"{metric}_count{format_labels(labels)} {histogram.count}")
+        for name, labels, value in gauges:
+            metric = PROMETHEUS_PREFIX + name
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{format_labels(labels)} {value!r}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write the Prometheus text to a file, replacing it atomically so readers never see a partial file."""
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'w') as metrics_file:
+            metrics_file.write(self.prometheus_text())
+        os.replace(temporary_path, path)
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in labels.items()) + '}'
+
+
+def start_metrics_file(metrics, path, interval=DEFAULT_METRICS_INTERVAL):
+    """Write the metrics to a Prometheus text file every interval seconds on a background thread."""
+
+    def write_periodically():
+        while True:
+            try:
+                metrics.write_prometheus(path)
+            except OSError as e:
+                logging.error(f"Failed to write metrics to {path}: {str(e)}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=write_periodically, name="metrics-file", daemon=True)
+    thread.start()
+    return thread
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Records the latency of every RPC by method name.
+
+    Streamed responses are timed until the stream is exhausted.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+
+        def timed(behavior):
+            def wrapper(request, context):
+                with self.metrics.timer('rpc_seconds', method=method):
+                    return behavior(request, context)
+            return wrapper
+
+        def timed_stream(behavior):
+            def wrapper(request, context):
+                with self.metrics.timer('rpc_seconds', method=method):
+                    yield from behavior(request, context)
+            return wrapper
+
+        serializers = dict(request_deserializer=handler.request_deserializer,
+                           response_serializer=handler.response_serializer)
+        if handler.unary_unary:
+            return grpc.unary_unary_rpc_method_handler(timed(handler.unary_unary), **serializers)
+        if handler.unary_stream:
+            return grpc.unary_stream_rpc_method_handler(timed_stream(handler.unary_stream), **serializers)
+        if handler.stream_unary:
+            return grpc.stream_unary_rpc_method_handler(timed(handler.stream_unary), **serializers)
+        return grpc.stream_stream_rpc_method_handler(timed_stream(handler.stream_stream), **serializers)
+
+
+class AsyncMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """Records the latency of every RPC by method name on a grpc.aio server.
+
+    Streamed responses are timed until the stream is exhausted.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+
+        def timed(behavior):
+            async def wrapper(request, context):
+                with self.metrics.timer('rpc_seconds', method=method):
+                    return await behavior(request, context)
+            return wrapper
+
+        def timed_stream(behavior):
+            async def wrapper(request, context):
+                with self.metrics.timer('rpc_seconds', method=method):
+                    async for response in behavior(request, context):
+                        yield response
+            return wrapper
+
+        serializers = dict(request_deserializer=handler.request_deserializer,
+                           response_serializer=handler.response_serializer)
+        if handler.unary_unary:
+            return grpc.unary_unary_rpc_method_handler(timed(handler.unary_unary), **serializers)
+        if handler.unary_stream:
+            return grpc.unary_stream_rpc_method_handler(timed_stream(handler.unary_stream), **serializers)
+        if handler.stream_unary:
+            return grpc.stream_unary_rpc_method_handler(timed(handler.stream_unary), **serializers)
+        return grpc.stream_stream_rpc_method_handler(timed_stream(handler.stream_stream), **serializers)
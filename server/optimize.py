@@ -0,0 +1,693 @@
+import argparse
+import logging
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from peephole import Peephole, remove_redundant_commands
+from plot_commands import (API_FUNC_CASTS, API_OPTION_CASTS, COMMENT_PREFIX, extract_definitions, parse_command,
+                           parse_plot_file, split_command, write_plot_file)
+
+DRAW_PATH = 'draw_path'
+
+ABSOLUTE_MOVES = {'goto', 'moveto', 'lineto'}
+RELATIVE_MOVES = {'go', 'move', 'line'}
+PEN_UP_MOVES = {'moveto', 'move'}
+PEN_DOWN_MOVES = {'lineto', 'line'}
+# Commands that raise the pen before moving on, ending a run of lines fused into a draw_path
+PEN_RAISING = {'penup', 'moveto', 'move', DRAW_PATH}
+# Commands that neither move nor lower the pen, looked past to find where the pen travels after a run of strokes
+STATIONARY = {'penup', 'delay'}
+
+
+def parse_draw_path(command_line):
+    """Return the vertices of a draw_path command line.
+
+    Args:
+        command_line (str): Command line as it appears in a plot file
+
+    Returns:
+        list: Vertices of the path, or None if the line is not a draw_path command
+    """
+    parts = command_line.split(None, 1)
+    if len(parts) != 2 or parts[0] != DRAW_PATH:
+        return None
+    return API_FUNC_CASTS[DRAW_PATH][0](parts[1])
+
+
+def format_draw_path(points):
+    """Format vertices as a draw_path command line."""
+    return format_coordinates([value for point in points for value in point])
+
+
+def format_coordinates(coordinates):
+    """Format a flat list of x, y coordinates as a draw_path command line."""
+    vertices = ','.join(('[%.10g,%.10g]',) * (len(coordinates) // 2)) % tuple(coordinates)
+    return f'{DRAW_PATH} [{vertices}]'
+
+
+class MotionTracker:
+    """Follows the pen position and pen state through a sequence of commands.
+
+    Defined commands are opaque to the tracker and leave the tracked state unchanged.
+    """
+
+    def __init__(self, x=0.0, y=0.0):
+        self.x = x
+        self.y = y
+        self.pen_up = True
+        self.pen_up_distance = 0.0
+        self.pen_down_distance = 0.0
+
+    def move(self, x, y):
+        distance = math.hypot(x - self.x, y - self.y)
+        if self.pen_up:
+            self.pen_up_distance += distance
+        else:
+            self.pen_down_distance += distance
+        self.x, self.y = x, y
+
+    def track_path(self, points):
+        if not points:
+            return
+        self.pen_up = True
+        self.move(*points[0])
+        self.pen_up = False
+        for x, y in points[1:]:
+            self.move(x, y)
+        self.pen_up = True
+
+    def track(self, command_line):
+        """Update the tracked state with the effect of a command line."""
+        name, params = split_command(command_line)
+        if name == DRAW_PATH:
+            params = [parse_draw_path(command_line)]
+        self.track_statement(name, params)
+
+    def track_statement(self, name, params):
+        """Update the tracked state with the effect of a (name, params) statement."""
+        if name == DRAW_PATH:
+            self.track_path(params[0])
+        elif name in ABSOLUTE_MOVES or name in RELATIVE_MOVES:
+            x, y = float(params[0]), float(params[1])
+            if name in RELATIVE_MOVES:
+                x, y = self.x + x, self.y + y
+            if name in PEN_UP_MOVES:
+                self.pen_up = True
+            elif name in PEN_DOWN_MOVES:
+                self.pen_up = False
+            self.move(x, y)
+        elif name == 'penup':
+            self.pen_up = True
+        elif name == 'pendown':
+            self.pen_up = False
+
+
+class PlotTracker(MotionTracker):
+    """MotionTracker that follows defined commands through their definitions."""
+
+    def __init__(self, definitions, x=0.0, y=0.0):
+        """
+        Args:
+            definitions (dict): Definitions as returned by extract_definitions
+        """
+        super().__init__(x, y)
+        self.definitions = definitions
+
+    def follow(self, name, params, expanding=()):
+        """Update the tracked state with the effect of a parsed statement.
+
+        Returns:
+            list: (name, params) of the options the statement sets, in order
+        """
+        if name in self.definitions:
+            if name in expanding:
+                return []
+            options = []
+            for statement in self.definitions[name]:
+                options.extend(self.follow(*statement, expanding=expanding + (name,)))
+            return options
+        if name in API_OPTION_CASTS:
+            return [(name, params)]
+        self.track_statement(name, params)
+        return []
+
+
+def pen_up_distance(commands):
+    """Total distance travelled with the pen up by a sequence of command lines."""
+    tracker = MotionTracker()
+    for command_line in commands:
+        tracker.track(command_line)
+    return tracker.pen_up_distance
+
+
+class EndpointGrid:
+    """Uniform grid over the endpoints of strokes for nearest unvisited endpoint queries.
+
+    The cell size is chosen so cells hold about one stroke each, so a query only
+    inspects the few rings of cells around the query point.
+    """
+
+    def __init__(self, strokes):
+        endpoints = [point for points in strokes for point in (points[0], points[-1])]
+        min_x = min(x for x, _ in endpoints)
+        min_y = min(y for _, y in endpoints)
+        max_x = max(x for x, _ in endpoints)
+        max_y = max(y for _, y in endpoints)
+        # strokes along a line would otherwise get cells of no area, searched one empty ring at a time
+        area = max((max_x - min_x) * (max_y - min_y), max(max_x - min_x, max_y - min_y) ** 2 / len(strokes), 1e-6)
+        self.cell_size = max(math.sqrt(area / len(strokes)), 1e-3)
+        self.origin = (min_x, min_y)
+        self.max_cell = self.cell_of(max_x, max_y)
+
+        self.cells = defaultdict(list)
+        for index, points in enumerate(strokes):
+            for reverse, (x, y) in ((False, points[0]), (True, points[-1])):
+                self.cells[self.cell_of(x, y)].append((x, y, index, reverse))
+        self.visited = [False] * len(strokes)
+        self.remaining = len(strokes)
+
+    def __len__(self):
+        return self.remaining
+
+    def cell_of(self, x, y):
+        return (int((x - self.origin[0]) // self.cell_size),
+                int((y - self.origin[1]) // self.cell_size))
+
+    def ring(self, cx, cy, radius):
+        if radius == 0:
+            yield cx, cy
+            return
+        for x in range(cx - radius, cx + radius + 1):
+            yield x, cy - radius
+            yield x, cy + radius
+        for y in range(cy - radius + 1, cy + radius):
+            yield cx - radius, y
+            yield cx + radius, y
+
+    def pop_nearest(self, x, y):
+        """Remove and return the unvisited stroke with an endpoint nearest to (x, y).
+
+        Returns:
+            tuple: (index, reverse) where reverse is True if the stroke's end point was nearest
+        """
+        # searching out from the grid cell nearest a point outside the grid keeps the ring bound
+        # below valid, as no endpoint is nearer the point than the nearest point of the grid
+        cx, cy = self.cell_of(x, y)
+        cx, cy = min(max(cx, 0), self.max_cell[0]), min(max(cy, 0), self.max_cell[1])
+        max_radius = max(cx, self.max_cell[0] - cx, cy, self.max_cell[1] - cy, 0)
+        best, best_distance = None, math.inf
+        radius = 0
+        while radius <= max_radius:
+            for cell in self.ring(cx, cy, radius):
+                entries = self.cells.get(cell)
+                if not entries:
+                    continue
+                live = [entry for entry in entries if not self.visited[entry[2]]]
+                if len(live) != len(entries):
+                    if live:
+                        self.cells[cell] = live
+                    else:
+                        del self.cells[cell]
+                for px, py, index, reverse in live:
+                    distance = (px - x) ** 2 + (py - y) ** 2
+                    if distance < best_distance:
+                        best, best_distance = (index, reverse), distance
+            # any endpoint in the next ring is at least radius cells away
+            if best is not None and best_distance <= (radius * self.cell_size) ** 2:
+                break
+            radius += 1
+        self.visited[best[0]] = True
+        self.remaining -= 1
+        return best
+
+
+def order_strokes(strokes, start):
+    """Order strokes greedily by nearest endpoint to reduce pen-up travel.
+
+    Args:
+        strokes (list): Vertex lists of the strokes
+        start (tuple): (x, y) pen position before the first stroke
+
+    Returns:
+        list: (index, reverse) pairs in drawing order
+    """
+    if not strokes:
+        return []
+    grid = EndpointGrid(strokes)
+    x, y = start
+    order = []
+    while grid:
+        index, reverse = grid.pop_nearest(x, y)
+        order.append((index, reverse))
+        x, y = strokes[index][0] if reverse else strokes[index][-1]
+    return order
+
+
+def run_pen_up_distance(run, start, end=None):
+    """Pen-up distance to draw a run of (command_line, points) strokes from a start position.
+
+    Args:
+        run (list): (command_line, points) strokes
+        start (tuple): (x, y) pen position before the run
+        end (tuple, optional): (x, y) position the pen travels to after the run
+    """
+    (x, y), distance = start, 0.0
+    for _, points in run:
+        distance += math.hypot(points[0][0] - x, points[0][1] - y)
+        x, y = points[-1]
+    if end is not None:
+        distance += math.hypot(end[0] - x, end[1] - y)
+    return distance
+
+
+def expand_statements(statements, definitions, expanding=()):
+    """Yield (name, params) statements with defined commands replaced by their bodies."""
+    for name, params in statements:
+        if name in definitions:
+            if name not in expanding:
+                yield from expand_statements(definitions[name], definitions, expanding + (name,))
+        else:
+            yield name, params
+
+
+def travel_after_run(statements):
+    """Find where the pen travels to after a run of strokes.
+
+    Args:
+        statements (iterable): (name, params) statements following the run, with defined commands expanded
+
+    Returns:
+        tuple: (pinned, end) where pinned is True if a later statement draws or moves relative to where
+            the run ends, so the run must keep ending there, and end is the (x, y) position the pen
+            next travels to with the pen up, or None if it does not travel again
+    """
+    for name, params in statements:
+        if name == DRAW_PATH:
+            # the NextDraw does not move for a path of fewer than 2 vertices
+            if len(params[0]) >= 2:
+                return False, tuple(params[0][0])
+        elif name in ('moveto', 'goto'):
+            return False, (float(params[0]), float(params[1]))
+        elif name not in STATIONARY and name not in API_OPTION_CASTS and not name.startswith(COMMENT_PREFIX):
+            return True, None
+    return False, None
+
+
+def rewrite_stroke_runs(commands, rewrite_run, definitions=None, keeps_ends=True):
+    """Replace each run of consecutive draw_path commands with a rewritten run.
+
+    Any other command, including comments such as layer markers, ends a run so
+    strokes never move across layers, option changes or defined commands.
+
+    Args:
+        commands (list): Plot command lines
+        rewrite_run (callable): Called with a list of (command_line, points) strokes, the (x, y) pen
+            position before the run and the (x, y) position the pen travels to after it, or None if
+            it does not travel again, returns the replacement strokes
+        definitions (dict, optional): Definitions as returned by extract_definitions, followed to find
+            where the pen is before and travels to after a run
+        keeps_ends (bool): Set if rewrite_run keeps a run starting and ending where it did, otherwise
+            a run followed by a statement that draws or moves relative to where it ends has its last
+            stroke left in place
+
+    Returns:
+        list: Command lines with every run of strokes rewritten
+    """
+    result = []
+    run = []
+    definitions = definitions or {}
+    tracker = PlotTracker(definitions)
+
+    def flush(following):
+        pinned, end = False, None
+        if not keeps_ends:
+            statements = (parse_command(commands[index]) for index in range(following, len(commands)))
+            pinned, end = travel_after_run(expand_statements(statements, definitions))
+        if pinned:
+            rewritten = rewrite_run(run[:-1], (tracker.x, tracker.y), run[-1][1][0]) + run[-1:]
+        else:
+            rewritten = rewrite_run(run, (tracker.x, tracker.y), end)
+        for command_line, points in rewritten:
+            result.append(command_line)
+            tracker.track_path(points)
+        run.clear()
+
+    for index, command_line in enumerate(commands):
+        points = parse_draw_path(command_line)
+        if points:
+            run.append((command_line, points))
+            continue
+        if run:
+            flush(index)
+        result.append(command_line)
+        tracker.follow(*parse_command(command_line))
+    if run:
+        flush(len(commands))
+    return result
+
+
+def reorder_run(run, start, end=None):
+    """Reorder a run of strokes to reduce pen-up travel from a start position to an end position."""
+    ordered = []
+    for index, reverse in order_strokes([points for _, points in run], start):
+        command_line, points = run[index]
+        if reverse:
+            points = points[::-1]
+            command_line = format_draw_path(points)
+        ordered.append((command_line, points))
+    # greedy ordering is not guaranteed to beat an already well ordered run
+    if run_pen_up_distance(ordered, start, end) >= run_pen_up_distance(run, start, end):
+        return run[:]
+    return ordered
+
+
+def reorder_strokes(commands, definitions=None):
+    """Reorder each run of consecutive draw_path commands to reduce pen-up travel.
+
+    Args:
+        commands (list): Plot command lines
+        definitions (dict, optional): Definitions as returned by extract_definitions, followed to find
+            where the pen is before and travels to after each run
+
+    Returns:
+        list: Command lines with the strokes of each run reordered
+    """
+    return rewrite_stroke_runs(commands, reorder_run, definitions, keeps_ends=False)
+
+
+def same_point(a, b):
+    return a[0] == b[0] and a[1] == b[1]
+
+
+def merge_run(run, tolerance):
+    """Join strokes of a run whose endpoints lie within tolerance of each other.
+
+    Endpoints are hashed into cells the size of the tolerance so the strokes that
+    can join an endpoint are found in the 3x3 block of cells around it. Each
+    chain starts from the earliest unused stroke and is extended at both ends,
+    preferring the earliest stroke that fits, reversing strokes where needed.
+
+    Args:
+        run (list): (command_line, points) strokes
+        tolerance (float): Maximum gap in mm between joined endpoints
+
+    Returns:
+        list: (command_line, points) strokes after merging
+    """
+    strokes = [points for _, points in run]
+    limit = tolerance ** 2
+    cells = defaultdict(list)
+
+    def cell_of(x, y):
+        return math.floor(x / tolerance), math.floor(y / tolerance)
+
+    for index, points in enumerate(strokes):
+        cells[cell_of(*points[0])].append((index, False))
+        cells[cell_of(*points[-1])].append((index, True))
+    used = [False] * len(strokes)
+
+    def take(point, at_end):
+        """Claim the earliest unused stroke with its end (or start) within tolerance of point."""
+        x, y = point
+        cx, cy = cell_of(x, y)
+        best = None
+        for cell in ((cx + i, cy + j) for i in (-1, 0, 1) for j in (-1, 0, 1)):
+            entries = cells.get(cell)
+            if not entries:
+                continue
+            live = [entry for entry in entries if not used[entry[0]]]
+            if len(live) != len(entries):
+                cells[cell] = live
+            for index, end in live:
+                if end != at_end or (best is not None and index > best):
+                    continue
+                px, py = strokes[index][-1 if end else 0]
+                if (px - x) ** 2 + (py - y) ** 2 <= limit:
+                    best = index
+        if best is not None:
+            used[best] = True
+        return best
+
+    merged = []
+    for first in range(len(strokes)):
+        if used[first]:
+            continue
+        used[first] = True
+        chain = list(strokes[first])
+        joined = 1
+        # extend the tail with strokes starting, or reversed strokes ending, at the tail
+        while True:
+            index = take(chain[-1], at_end=False)
+            points = strokes[index] if index is not None else None
+            if index is None:
+                index = take(chain[-1], at_end=True)
+                if index is None:
+                    break
+                points = strokes[index][::-1]
+            chain.extend(points[1:] if same_point(points[0], chain[-1]) else points)
+            joined += 1
+        # extend the head with strokes ending, or reversed strokes starting, at the head
+        prefix = []
+        head = chain[0]
+        while True:
+            index = take(head, at_end=True)
+            points = strokes[index] if index is not None else None
+            if index is None:
+                index = take(head, at_end=False)
+                if index is None:
+                    break
+                points = strokes[index][::-1]
+            prefix.extend(reversed(points[:-1] if same_point(points[-1], head) else points))
+            head = points[0]
+            joined += 1
+        if joined == 1:
+            merged.append(run[first])
+        else:
+            chain = prefix[::-1] + chain
+            merged.append((format_draw_path(chain), chain))
+    return merged
+
+
+def merge_strokes(commands, tolerance, definitions=None):
+    """Merge draw_path strokes whose endpoints lie within tolerance into single strokes.
+
+    Args:
+        commands (list): Plot command lines
+        tolerance (float): Maximum gap in mm between joined endpoints
+        definitions (dict, optional): Definitions as returned by extract_definitions, followed to find
+            the runs later commands draw or move on from the end of
+
+    Returns:
+        list: Command lines with the strokes of each run merged
+    """
+    return rewrite_stroke_runs(commands, lambda run, start, end: merge_run(run, tolerance), definitions,
+                               keeps_ends=False)
+
+
+def simplify_path(points, tolerance):
+    """Simplify a polyline with the Ramer-Douglas-Peucker algorithm.
+
+    Distances from each span's chord are computed for all of the span's vertices
+    at once, so the Python loop only runs once per kept vertex.
+
+    Args:
+        points: Sequence of (x, y) vertices
+        tolerance (float): Maximum distance in mm of a removed vertex from the simplified line
+
+    Returns:
+        list: Kept vertices as [x, y] lists, always including the first and last vertex
+    """
+    coords = np.asarray(points, dtype=float)
+    keep = np.zeros(len(coords), dtype=bool)
+    keep[0] = keep[-1] = True
+    spans = [(0, len(coords) - 1)]
+    while spans:
+        first, last = spans.pop()
+        if last - first < 2:
+            continue
+        start = coords[first]
+        offsets = coords[first + 1:last] - start
+        chord = coords[last] - start
+        length = chord @ chord
+        if length == 0:
+            # closed span, measure from the shared end point
+            nearest = offsets
+        else:
+            # measure from the chord itself, not the line through it, so vertices doubling back
+            # beyond either end of the chord are kept
+            along = np.clip(offsets @ chord / length, 0.0, 1.0)
+            nearest = offsets - along[:, None] * chord
+        distances = np.hypot(nearest[:, 0], nearest[:, 1])
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            farthest += first + 1
+            keep[farthest] = True
+            spans.append((first, farthest))
+            spans.append((farthest, last))
+    return coords[keep].tolist()
+
+
+def simplify_strokes(commands, tolerance):
+    """Simplify the vertices of every draw_path stroke to within a tolerance.
+
+    Args:
+        commands (list): Plot command lines
+        tolerance (float): Maximum distance in mm of a removed vertex from the simplified stroke
+
+    Returns:
+        tuple: (commands, vertices_removed) the simplified command lines and the number of vertices removed
+    """
+    removed = 0
+
+    def simplify_run(run, start, end):
+        nonlocal removed
+        simplified = []
+        for command_line, points in run:
+            if len(points) > 2:
+                kept = simplify_path(points, tolerance)
+                if len(kept) < len(points):
+                    removed += len(points) - len(kept)
+                    command_line, points = format_draw_path(kept), kept
+            simplified.append((command_line, points))
+        return simplified
+
+    commands = rewrite_stroke_runs(commands, simplify_run)
+    return commands, removed
+
+
+def line_run(statements, start):
+    """Find a run of lines fusable into a draw_path from index start of parsed statements.
+
+    The run is an optional pendown, then lineto and line commands, ended by a command
+    that raises the pen so the draw_path leaving the pen up changes nothing.
+
+    Returns:
+        int: Index of the command ending the run, or None if there is no such run
+    """
+    end = start + 1 if statements[start][0] == 'pendown' else start
+    while end < len(statements) and statements[end][0] in PEN_DOWN_MOVES:
+        end += 1
+    if end == start or statements[end - 1][0] not in PEN_DOWN_MOVES:
+        return None
+    if end == len(statements) or statements[end][0] not in PEN_RAISING:
+        return None
+    return end
+
+
+def fuse_lines(commands, definitions=None):
+    """Fuse runs of lineto and line commands drawn from a pendown into single draw_path commands.
+
+    A run is only fused when the pen is known to be up at a known position before it,
+    so the draw_path starts where the lines do, and the run ends with the pen being
+    raised, so the draw_path leaving the pen up changes nothing. A penup ending the
+    run is dropped with it. The NextDraw then plans acceleration through the whole
+    polyline in one call instead of stopping at every vertex.
+
+    Args:
+        commands (list): Plot command lines
+        definitions (dict, optional): Definitions as returned by extract_definitions, followed to keep
+            track of the pen through defined commands
+
+    Returns:
+        tuple: (commands, lines_fused) the rewritten command lines and the number of line commands fused
+    """
+    statements = [parse_command(command_line) for command_line in commands]
+    state = Peephole(definitions)
+    result = []
+    fused = 0
+    index = 0
+    while index < len(statements):
+        name = statements[index][0]
+        end = None
+        if (name == 'pendown' or name in PEN_DOWN_MOVES) and state.pen_up and state.position is not None:
+            end = line_run(statements, index)
+        if end is None:
+            state.redundant(*statements[index])
+            result.append(commands[index])
+            index += 1
+            continue
+        points = [list(state.position)]
+        for statement in statements[index:end]:
+            state.redundant(*statement)
+            if statement[0] != 'pendown':
+                points.append([state.x, state.y])
+                fused += 1
+        result.append(format_draw_path(points))
+        if statements[end][0] == 'penup':
+            state.redundant(*statements[end])
+            end += 1
+        index = end
+    return result, fused
+
+
+def count_strokes(commands):
+    return sum(1 for command_line in commands if command_line.startswith(DRAW_PATH))
+
+
+def optimize_commands(commands, reorder=False, merge_tolerance=0.0, simplify_tolerance=0.0, remove_redundant=False,
+                      definitions=None, fuse=False):
+    """Apply the requested preprocessing stages to plot command lines.
+
+    Args:
+        commands (list): Plot command lines
+        reorder (bool): Reorder strokes to reduce pen-up travel
+        merge_tolerance (float): Merge strokes with endpoints this close in mm, 0 disables merging
+        simplify_tolerance (float): Remove vertices within this distance in mm of the simplified
+            strokes, 0 disables simplification
+        remove_redundant (bool): Remove commands that have no effect and fold runs of pen-up moves
+        definitions (dict, optional): Definitions as returned by extract_definitions, so defined
+            commands with no effect are removed too
+        fuse (bool): Fuse runs of lineto and line commands into draw_path strokes, before the other
+            stages so the fused strokes are simplified, merged and reordered too
+
+    Returns:
+        tuple: (commands, stats) the processed command lines and a dictionary of statistics
+    """
+    stats = {'pen_up_distance_before': pen_up_distance(commands)}
+    if fuse:
+        commands, stats['lines_fused'] = fuse_lines(commands, definitions)
+    if simplify_tolerance > 0:
+        commands, stats['vertices_removed'] = simplify_strokes(commands, simplify_tolerance)
+    if merge_tolerance > 0:
+        strokes_before = count_strokes(commands)
+        commands = merge_strokes(commands, merge_tolerance, definitions)
+        stats['strokes_merged'] = strokes_before - count_strokes(commands)
+    if reorder:
+        commands = reorder_strokes(commands, definitions)
+    if remove_redundant:
+        commands, stats['commands_removed'] = remove_redundant_commands(commands, definitions)
+    stats['pen_up_distance_after'] = pen_up_distance(commands)
+    return commands, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize a plot file for plotting")
+    parser.add_argument('input', help="plot file to optimize")
+    parser.add_argument('output', help="file to write the optimized plot to")
+    parser.add_argument('--reorder', action='store_true', help="reorder strokes to reduce pen-up travel")
+    parser.add_argument('--merge', type=float, default=0.0, metavar='TOLERANCE',
+                        help="merge strokes with endpoints within TOLERANCE mm of each other")
+    parser.add_argument('--simplify', type=float, default=0.0, metavar='TOLERANCE',
+                        help="remove vertices within TOLERANCE mm of the simplified strokes")
+    parser.add_argument('--fuse', action='store_true',
+                        help="fuse runs of lineto and line commands into draw_path strokes")
+    parser.add_argument('--remove-redundant', action='store_true',
+                        help="remove commands that have no effect and fold runs of pen-up moves")
+    args = parser.parse_args()
+
+    with open(args.input) as plot_file:
+        options, definitions, commands = parse_plot_file(plot_file)
+    commands, stats = optimize_commands(commands, reorder=args.reorder, merge_tolerance=args.merge,
+                                        simplify_tolerance=args.simplify, remove_redundant=args.remove_redundant,
+                                        definitions=extract_definitions(definitions), fuse=args.fuse)
+    with open(args.output, 'w') as plot_file:
+        write_plot_file(plot_file, options, definitions, commands)
+    for name, value in stats.items():
+        logging.info(f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
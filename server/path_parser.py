@@ -0,0 +1,105 @@
+import math
+import re
+from array import array
+from collections.abc import Sequence
+
+import numpy as np
+
+NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+VERTEX = rf'\[\s*{NUMBER}\s*,\s*{NUMBER}\s*\]'
+PATH_PATTERN = re.compile(rf'\s*\[\s*(?:{VERTEX}\s*(?:,\s*{VERTEX}\s*)*)?\]\s*')
+TOKEN_PATTERN = re.compile(rf'\s*({NUMBER}|\[|\]|,)')
+
+# Brackets and commas become whitespace so the numbers can be split out in one pass
+SEPARATORS = str.maketrans('[],', '   ')
+
+
+class Path(Sequence):
+    """Vertices of a path stored as a flat array of x, y coordinates.
+
+    Indexing returns (x, y) tuples, so a Path can be used wherever a list of
+    [x, y] vertices is expected, while holding 16 bytes per vertex.
+    """
+    __slots__ = ('coords',)
+
+    def __init__(self, coords):
+        self.coords = coords
+
+    def __len__(self):
+        return len(self.coords) // 2
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('path index out of range')
+        return self.coords[2 * index], self.coords[2 * index + 1]
+
+    def __array__(self, dtype=None, copy=None):
+        vertices = np.frombuffer(self.coords, dtype=float).reshape(-1, 2)
+        return vertices if dtype is None else vertices.astype(dtype, copy=False)
+
+    def __repr__(self):
+        return f'Path({list(self)})'
+
+
+def describe_error(text):
+    """Describe the first syntax error in a path string that failed to parse."""
+    # states: 0 outer '[', 1 '[' or ']', 2 x, 3 ',', 4 y, 5 ']', 6 ',' or ']', 7 end, 8 '['
+    expected = ["'['", "'[' or ']'", "a number", "','", "a number", "']'", "',' or ']'", "end of path", "'['"]
+    state, position = 0, 0
+    while state != 7:
+        match = TOKEN_PATTERN.match(text, position)
+        token = match.group(1) if match else None
+        if state == 0 and token == '[':
+            state = 1
+        elif state == 1 and token in ('[', ']'):
+            state = 2 if token == '[' else 7
+        elif state in (2, 4) and token not in (None, '[', ']', ','):
+            state += 1
+        elif state == 3 and token == ',':
+            state = 4
+        elif state == 5 and token == ']':
+            state = 6
+        elif state == 6 and token in (',', ']'):
+            state = 8 if token == ',' else 7
+        elif state == 8 and token == '[':
+            state = 2
+        else:
+            break
+        position = match.end()
+    rest = text[position:].lstrip()
+    # report the column of the offending token rather than of the whitespace before it
+    column = len(text) - len(rest) + 1
+    found = rest.rstrip()[:20]
+    return f"expected {expected[state]} at column {column}, found {repr(found) if found else 'end of path'}"
+
+
+def describe_overflow(text):
+    """Describe the first number in a path string too large to be a coordinate."""
+    for match in re.finditer(NUMBER, text):
+        if not math.isfinite(float(match.group())):
+            return f"coordinate {match.group()[:20]} at column {match.start() + 1} is out of range"
+
+
+def parse_path(text):
+    """Parse a draw_path vertex list of the form [[x,y],[x,y],...].
+
+    Args:
+        text (str): Vertex list as it appears in a plot file
+
+    Returns:
+        Path: Vertices of the path
+
+    Raises:
+        ValueError: If the text is not a well formed vertex list or a coordinate overflows
+    """
+    if not PATH_PATTERN.fullmatch(text):
+        raise ValueError(f"Invalid path: {describe_error(text)}")
+    coords = array('d', map(float, text.translate(SEPARATORS).split()))
+    # numbers beyond the range of a float parse as infinite
+    if coords and (max(coords) == math.inf or min(coords) == -math.inf):
+        raise ValueError(f"Invalid path: {describe_overflow(text)}")
+    return Path(coords)
@@ -0,0 +1,166 @@
+from plot_commands import API_OPTION_CASTS, parse_command
+
+# Move commands mapped to (pen state after the move, True for up and None if unchanged, whether the move is relative)
+MOVES = {
+    'moveto': (True, False),
+    'move': (True, True),
+    'lineto': (False, False),
+    'line': (False, True),
+    'goto': (None, False),
+    'go': (None, True),
+}
+# API functions that leave the position and pen state as they are
+STATE_PRESERVING = {'delay', 'block', 'usb_query'}
+# API functions that apply option changes, which may move the pen to a new pen up or down height
+OPTION_APPLYING = {'update', 'load_config'}
+
+
+class Peephole:
+    """Follows the pen position and pen state through statements to find commands that have no effect.
+
+    Unlike MotionTracker the state may be unknown: the position after a relative move
+    from an unknown position, the pen after an option change that may move it to a new
+    height, and everything after a raw USB command. A command is only found to have no
+    effect when the state it would leave is known to hold already, so removing every
+    such command leaves the machine in the same state.
+    """
+
+    def __init__(self, definitions=None):
+        """
+        Args:
+            definitions (dict, optional): Definitions as returned by extract_definitions, followed
+                through so a defined command can be found to have no effect
+        """
+        self.definitions = definitions or {}
+        self.x = self.y = None
+        self.pen_up = None
+
+    def forget(self):
+        """Forget the position and pen state, as when the NextDraw is driven outside the statements."""
+        self.x = self.y = None
+        self.pen_up = None
+
+    def home(self):
+        """Set the state to the pen up at the home position, as after connecting."""
+        self.x, self.y = 0.0, 0.0
+        self.pen_up = True
+
+    @property
+    def position(self):
+        return (self.x, self.y) if self.x is not None else None
+
+    def redundant(self, name, params, expanding=()):
+        """Follow a parsed statement and return whether it leaves the state as it was.
+
+        Args:
+            name (str): Option, API function or defined command name
+            params (list): Parameters cast by parse_command
+
+        Returns:
+            bool: True if executing the statement would have no effect
+        """
+        if name in self.definitions:
+            if name in expanding:
+                self.forget()
+                return False
+            # follow every statement of the definition so the state is right whatever the outcome
+            results = [self.redundant(*statement, expanding=expanding + (name,))
+                       for statement in self.definitions[name]]
+            return all(results)
+        if name in MOVES:
+            return self.move(params, *MOVES[name])
+        if name == 'penup' or name == 'pendown':
+            pen_up = name == 'penup'
+            if self.pen_up == pen_up:
+                return True
+            self.pen_up = pen_up
+            return False
+        if name == 'draw_path':
+            points = params[0]
+            # the NextDraw does not move for a path of fewer than 2 vertices
+            if len(points) >= 2:
+                self.x, self.y = float(points[-1][0]), float(points[-1][1])
+                self.pen_up = True
+            return False
+        if name in API_OPTION_CASTS or name in OPTION_APPLYING:
+            self.pen_up = None
+            if name == 'units':
+                # positions after this are in other units
+                self.x = self.y = None
+            return False
+        if name in STATE_PRESERVING or name.startswith('#'):
+            return False
+        # a raw USB command or anything unknown may have done anything
+        self.forget()
+        return False
+
+    def move(self, params, pen_up, relative):
+        x, y = float(params[0]), float(params[1])
+        if relative:
+            unmoved = x == 0 and y == 0
+            x, y = (self.x + x, self.y + y) if self.x is not None else (None, None)
+        else:
+            unmoved = (x, y) == self.position
+        if pen_up is None:
+            pen_up = self.pen_up
+        elif pen_up != self.pen_up:
+            unmoved = False
+        self.x, self.y, self.pen_up = x, y, pen_up
+        return unmoved
+
+
+def format_move(name, x, y):
+    return f"{name} {x:.10g} {y:.10g}"
+
+
+def remove_redundant_commands(commands, definitions=None):
+    """Remove commands that have no effect and fold runs of pen-up moves into one move.
+
+    Removes penup when the pen is already up and pendown when it is down, moves to
+    the current position and defined commands, such as a go_home straight after a
+    move home, whose statements all have no effect. A pen-up move straight after
+    another is folded into it, as the pen is up the path between them draws nothing,
+    and one straight before a draw_path of 2 or more vertices is removed, as draw_path
+    makes its own pen-up move to its first vertex.
+    A command straight after an option change is kept, as the server applies option
+    changes with the next command. The machine is left in the same state as by the
+    original commands.
+
+    Args:
+        commands (list): Plot command lines
+        definitions (dict, optional): Definitions as returned by extract_definitions
+
+    Returns:
+        tuple: (commands, commands_removed) the remaining command lines and the number removed
+    """
+    peephole = Peephole(definitions)
+    result = []
+    removed = 0
+    # index in result of a pen-up move that a following pen-up move can replace
+    foldable = None
+    options_pending = False
+    for command_line in commands:
+        name, params = parse_command(command_line)
+        if peephole.redundant(name, params) and not options_pending:
+            removed += 1
+            continue
+        if name in API_OPTION_CASTS:
+            options_pending = True
+        elif not name.startswith('#'):
+            options_pending = False
+        if name == 'moveto' or name == 'move':
+            position = peephole.position
+            if foldable is not None and position is not None:
+                # the earlier move only carried the raised pen on to where this one ends
+                result[foldable] = command_line if name == 'moveto' else format_move('moveto', *position)
+                removed += 1
+                continue
+            foldable = len(result)
+        elif name == 'draw_path' and foldable is not None and len(params[0]) >= 2:
+            del result[foldable]
+            removed += 1
+            foldable = None
+        else:
+            foldable = None
+        result.append(command_line)
+    return result, removed
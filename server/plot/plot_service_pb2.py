@@ -24,35 +24,129 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12plot_service.proto\x12\x04plot\"\x13\n\x11\x44isconnectRequest\"\x11\n\x0fHasPowerRequest\"%\n\x10HasPowerResponse\x12\x11\n\thas_power\x18\x01 \x01(\x08\"!\n\x0e\x43ommandRequest\x12\x0f\n\x07\x63ommand\x18\x01 \x01(\t\"3\n\x0f\x43ommandResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"=\n\x15InitializePlotRequest\x12\x0f\n\x07options\x18\x01 \x03(\t\x12\x13\n\x0b\x64\x65\x66initions\x18\x02 \x03(\t\"\x19\n\x17PlotAlignmentSVGRequest\"1\n\x0fWalkHomeRequest\x12\x0c\n\x04\x61xis\x18\x01 \x01(\t\x12\x10\n\x08\x64istance\x18\x02 \x01(\x02\"\x1a\n\x18ResetHomePositionRequest\"\"\n RestoreInteractiveContextRequest\"\x1e\n\x1c\x45ndInteractiveContextRequest2\x9d\x05\n\x0bPlotService\x12\x46\n\x0eInitializePlot\x12\x1b.plot.InitializePlotRequest\x1a\x15.plot.CommandResponse\"\x00\x12?\n\x0eProcessCommand\x12\x14.plot.CommandRequest\x1a\x15.plot.CommandResponse\"\x00\x12>\n\nDisconnect\x12\x17.plot.DisconnectRequest\x1a\x15.plot.CommandResponse\"\x00\x12;\n\x08HasPower\x12\x15.plot.HasPowerRequest\x1a\x16.plot.HasPowerResponse\"\x00\x12J\n\x10PlotAlignmentSVG\x12\x1d.plot.PlotAlignmentSVGRequest\x1a\x15.plot.CommandResponse\"\x00\x12:\n\x08WalkHome\x12\x15.plot.WalkHomeRequest\x1a\x15.plot.CommandResponse\"\x00\x12L\n\x11ResetHomePosition\x12\x1e.plot.ResetHomePositionRequest\x1a\x15.plot.CommandResponse\"\x00\x12\\\n\x19RestoreInteractiveContext\x12&.plot.RestoreInteractiveContextRequest\x1a\x15.plot.CommandResponse\"\x00\x12T\n\x15\x45ndInteractiveContext\x12\".plot.EndInteractiveContextRequest\x1a\x15.plot.CommandResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12plot_service.proto\x12\x04plot\"&\n\x11\x44isconnectRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"$\n\x0fHasPowerRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"%\n\x10HasPowerResponse\x12\x11\n\thas_power\x18\x01 \x01(\x08\"4\n\x0e\x43ommandRequest\x12\x0f\n\x07\x63ommand\x18\x01 \x01(\t\x12\x11\n\tdevice_id\x18\x02 \x01(\t\"3\n\x0f\x43ommandResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"L\n\x14StreamCommandRequest\x12\x10\n\x08sequence\x18\x01 \x01(\x04\x12\x0f\n\x07\x63ommand\x18\x02 \x01(\t\x12\x11\n\tdevice_id\x18\x03 \x01(\t\"@\n\nCommandAck\x12\x10\n\x08sequence\x18\x01 \x01(\x04\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0f\n\x07message\x18\x03 \x01(\t\"P\n\x15InitializePlotRequest\x12\x0f\n\x07options\x18\x01 \x03(\t\x12\x13\n\x0b\x64\x65\x66initions\x18\x02 \x03(\t\x12\x11\n\tdevice_id\x18\x03 \x01(\t\",\n\x17PlotAlignmentSVGRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"D\n\x0fWalkHomeRequest\x12\x0c\n\x04\x61xis\x18\x01 \x01(\t\x12\x10\n\x08\x64istance\x18\x02 \x01(\x02\x12\x11\n\tdevice_id\x18\x03 \x01(\t\"-\n\x18ResetHomePositionRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"5\n RestoreInteractiveContextRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"1\n\x1c\x45ndInteractiveContextRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"\xb8\x01\n\x13OptimizePlotRequest\x12\x10\n\x08\x63ommands\x18\x01 \x03(\t\x12\x17\n\x0freorder_strokes\x18\x02 \x01(\x08\x12\x17\n\x0fmerge_tolerance\x18\x03 \x01(\x01\x12\x1a\n\x12simplify_tolerance\x18\x04 \x01(\x01\x12\x18\n\x10remove_redundant\x18\x05 \x01(\x08\x12\x13\n\x0b\x64\x65\x66initions\x18\x06 \x03(\t\x12\x12\n\nfuse_lines\x18\x07 \x01(\x08\"\xea\x01\n\x14OptimizePlotResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x10\n\x08\x63ommands\x18\x03 \x03(\t\x12\x1e\n\x16pen_up_distance_before\x18\x04 \x01(\x01\x12\x1d\n\x15pen_up_distance_after\x18\x05 \x01(\x01\x12\x16\n\x0estrokes_merged\x18\x06 \x01(\r\x12\x18\n\x10vertices_removed\x18\x07 \x01(\x04\x12\x18\n\x10\x63ommands_removed\x18\x08 \x01(\x04\x12\x13\n\x0blines_fused\x18\t \x01(\x04\"[\n\x13\x45stimatePlotRequest\x12\x0f\n\x07options\x18\x01 \x03(\t\x12\x13\n\x0b\x64\x65\x66initions\x18\x02 \x03(\t\x12\x10\n\x08\x63ommands\x18\x03 \x03(\t\x12\x0c\n\x04path\x18\x04 \x01(\t\"\x91\x01\n\x14\x45stimatePlotResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x19\n\x11pen_down_distance\x18\x03 \x01(\x01\x12\x17\n\x0fpen_up_distance\x18\x04 \x01(\x01\x12\x11\n\tpen_lifts\x18\x05 \x01(\x04\x12\x10\n\x08\x64uration\x18\x06 \x01(\x01\"\x89\x01\n\x14RenderPreviewRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x12\n\nresolution\x18\x02 \x01(\x01\x12\x13\n\x0bshow_pen_up\x18\x03 \x01(\x08\x12\r\n\x05min_x\x18\x04 \x01(\x01\x12\r\n\x05min_y\x18\x05 \x01(\x01\x12\r\n\x05max_x\x18\x06 \x01(\x01\x12\r\n\x05max_y\x18\x07 \x01(\x01\"\x93\x01\n\x15RenderPreviewResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0b\n\x03png\x18\x03 \x01(\x0c\x12\r\n\x05width\x18\x04 \x01(\r\x12\x0e\n\x06height\x18\x05 \x01(\r\x12\x16\n\x0etiles_rendered\x18\x06 \x01(\r\x12\x14\n\x0ctiles_cached\x18\x07 \x01(\r\"\xae\x01\n\x0fUploadPlotChunk\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x17\n\x0freorder_strokes\x18\x02 \x01(\x08\x12\x17\n\x0fmerge_tolerance\x18\x03 \x01(\x01\x12\x1a\n\x12simplify_tolerance\x18\x04 \x01(\x01\x12\x11\n\tdevice_id\x18\x05 \x01(\t\x12\x18\n\x10remove_redundant\x18\x06 \x01(\x08\x12\x12\n\nfuse_lines\x18\x07 \x01(\x08\"M\n\x12UploadPlotResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x15\n\rcommand_count\x18\x03 \x01(\x04\"6\n\x13LoadPlotFileRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x11\n\tdevice_id\x18\x02 \x01(\t\"$\n\x0fStartJobRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"$\n\x0fPauseJobRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\";\n\x10ResumeJobRequest\x12\x14\n\x0c\x66rom_journal\x18\x01 \x01(\x08\x12\x11\n\tdevice_id\x18\x02 \x01(\t\"%\n\x10\x43\x61ncelJobRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"%\n\x10JobStatusRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"\x8c\x01\n\x11JobStatusResponse\x12\x1d\n\x05state\x18\x01 \x01(\x0e\x32\x0e.plot.JobState\x12\x15\n\rcommand_index\x18\x02 \x01(\x04\x12\x15\n\rcommand_total\x18\x03 \x01(\x04\x12\x0f\n\x07message\x18\x04 \x01(\t\x12\x19\n\x11recoverable_index\x18\x05 \x01(\x04\"\"\n\rLayersRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"\xee\x01\n\x05Layer\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x15\n\rfirst_command\x18\x02 \x01(\x04\x12\x15\n\rcommand_count\x18\x03 \x01(\x04\x12\x14\n\x0cstroke_count\x18\x04 \x01(\x04\x12\r\n\x05min_x\x18\x05 \x01(\x01\x12\r\n\x05min_y\x18\x06 \x01(\x01\x12\r\n\x05max_x\x18\x07 \x01(\x01\x12\r\n\x05max_y\x18\x08 \x01(\x01\x12\x19\n\x11pen_down_distance\x18\t \x01(\x01\x12\x17\n\x0fpen_up_distance\x18\n \x01(\x01\x12\x11\n\tpen_lifts\x18\x0b \x01(\x04\x12\x10\n\x08\x64uration\x18\x0c \x01(\x01\"T\n\x0eLayersResponse\x12\x1b\n\x06layers\x18\x01 \x03(\x0b\x32\x0b.plot.Layer\x12\x13\n\x0blayer_count\x18\x02 \x01(\r\x12\x10\n\x08\x63omplete\x18\x03 \x01(\x08\")\n\x14WatchProgressRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"\xac\x01\n\rProgressEvent\x12\x1d\n\x05state\x18\x01 \x01(\x0e\x32\x0e.plot.JobState\x12\x15\n\rcommand_index\x18\x02 \x01(\x04\x12\x15\n\rcommand_total\x18\x03 \x01(\x04\x12\r\n\x05layer\x18\x04 \x01(\t\x12\x19\n\x11pen_down_distance\x18\x05 \x01(\x01\x12\x13\n\x0b\x65ta_seconds\x18\x06 \x01(\x01\x12\x0f\n\x07message\x18\x07 \x01(\t\"\x10\n\x0eMetricsRequest\"\xc4\x01\n\x0fHistogramMetric\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x31\n\x06labels\x18\x02 \x03(\x0b\x32!.plot.HistogramMetric.LabelsEntry\x12\r\n\x05\x63ount\x18\x03 \x01(\x04\x12\x0b\n\x03sum\x18\x04 \x01(\x01\x12\x0e\n\x06\x62ounds\x18\x05 \x03(\x01\x12\x15\n\rbucket_counts\x18\x06 \x03(\x04\x1a-\n\x0bLabelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\x88\x01\n\x0bGaugeMetric\x12\x0c\n\x04name\x18\x01 \x01(\t\x12-\n\x06labels\x18\x02 \x03(\x0b\x32\x1d.plot.GaugeMetric.LabelsEntry\x12\r\n\x05value\x18\x03 \x01(\x01\x1a-\n\x0bLabelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"_\n\x0fMetricsResponse\x12)\n\nhistograms\x18\x01 \x03(\x0b\x32\x15.plot.HistogramMetric\x12!\n\x06gauges\x18\x02 \x03(\x0b\x32\x11.plot.GaugeMetric\"7\n\x13PowerHistoryRequest\x12\r\n\x05since\x18\x01 \x01(\x01\x12\x11\n\tdevice_id\x18\x02 \x01(\t\"[\n\x0bPowerSample\x12\x11\n\ttimestamp\x18\x01 \x01(\x01\x12\x0f\n\x07reading\x18\x02 \x01(\r\x12\x11\n\thas_power\x18\x03 \x01(\x08\x12\x15\n\rcommand_index\x18\x04 \x01(\x04\":\n\x14PowerHistoryResponse\x12\"\n\x07samples\x18\x01 \x03(\x0b\x32\x11.plot.PowerSample\"\x14\n\x12ListDevicesRequest\"\x83\x01\n\x0c\x44\x65viceStatus\x12\x11\n\tdevice_id\x18\x01 \x01(\t\x12\x13\n\x0binitialized\x18\x02 \x01(\x08\x12\x1d\n\x05state\x18\x03 \x01(\x0e\x32\x0e.plot.JobState\x12\x15\n\rcommand_index\x18\x04 \x01(\x04\x12\x15\n\rcommand_total\x18\x05 \x01(\x04\":\n\x13ListDevicesResponse\x12#\n\x07\x64\x65vices\x18\x01 \x03(\x0b\x32\x12.plot.DeviceStatus\"K\n\x13\x45nrollDeviceRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\x12\r\n\x05model\x18\x02 \x01(\r\x12\x12\n\npen_colour\x18\x03 \x01(\t\"*\n\x15WithdrawDeviceRequest\x12\x11\n\tdevice_id\x18\x01 \x01(\t\"c\n\x10SubmitJobRequest\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x10\n\x08priority\x18\x02 \x01(\x05\x12\r\n\x05model\x18\x03 \x01(\r\x12\x12\n\npen_colour\x18\x04 \x01(\t\x12\x0c\n\x04name\x18\x05 \x01(\t\"E\n\x11SubmitJobResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0e\n\x06job_id\x18\x03 \x01(\x04\"+\n\x19\x43\x61ncelScheduledJobRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\x04\"\x11\n\x0fScheduleRequest\"\xc2\x02\n\x0cScheduledJob\x12\x0e\n\x06job_id\x18\x01 \x01(\x04\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0c\n\x04path\x18\x03 \x01(\t\x12\x10\n\x08priority\x18\x04 \x01(\x05\x12\r\n\x05model\x18\x05 \x01(\r\x12\x12\n\npen_colour\x18\x06 \x01(\t\x12&\n\x05state\x18\x07 \x01(\x0e\x32\x17.plot.ScheduledJobState\x12\x11\n\tdevice_id\x18\x08 \x01(\t\x12\x0f\n\x07message\x18\t \x01(\t\x12\x11\n\tsubmitted\x18\n \x01(\x01\x12\x0f\n\x07started\x18\x0b \x01(\x01\x12\x10\n\x08\x66inished\x18\x0c \x01(\x01\x12!\n\tjob_state\x18\r \x01(\x0e\x32\x0e.plot.JobState\x12\x15\n\rcommand_index\x18\x0e \x01(\x04\x12\x15\n\rcommand_total\x18\x0f \x01(\x04\"\xc0\x02\n\x10\x46\x61rmDeviceStatus\x12\x11\n\tdevice_id\x18\x01 \x01(\t\x12\r\n\x05model\x18\x02 \x01(\r\x12\x12\n\npen_colour\x18\x03 \x01(\t\x12\x0e\n\x06job_id\x18\x04 \x01(\x04\x12\x11\n\tsuspended\x18\x05 \x01(\t\x12\x15\n\rjobs_finished\x18\x06 \x01(\x04\x12\x13\n\x0bjobs_failed\x18\x07 \x01(\x04\x12\x16\n\x0ejobs_cancelled\x18\x08 \x01(\x04\x12\x18\n\x10\x63ommands_plotted\x18\t \x01(\x04\x12\x14\n\x0c\x62usy_seconds\x18\n \x01(\x01\x12\x18\n\x10plotting_seconds\x18\x0b \x01(\x01\x12\x13\n\x0butilisation\x18\x0c \x01(\x01\x12\x15\n\rjobs_per_hour\x18\r \x01(\x01\x12\x19\n\x11\x63ommands_per_hour\x18\x0e \x01(\x01\"]\n\x10ScheduleResponse\x12 \n\x04jobs\x18\x01 \x03(\x0b\x32\x12.plot.ScheduledJob\x12\'\n\x07\x64\x65vices\x18\x02 \x03(\x0b\x32\x16.plot.FarmDeviceStatus*|\n\x08JobState\x12\n\n\x06NO_JOB\x10\x00\x12\r\n\tJOB_READY\x10\x01\x12\x10\n\x0cJOB_PLOTTING\x10\x02\x12\x0e\n\nJOB_PAUSED\x10\x03\x12\x10\n\x0cJOB_FINISHED\x10\x04\x12\x11\n\rJOB_CANCELLED\x10\x05\x12\x0e\n\nJOB_FAILED\x10\x06*\x87\x01\n\x11ScheduledJobState\x12\x14\n\x10SCHEDULED_QUEUED\x10\x00\x12\x15\n\x11SCHEDULED_RUNNING\x10\x01\x12\x16\n\x12SCHEDULED_FINISHED\x10\x02\x12\x17\n\x13SCHEDULED_CANCELLED\x10\x03\x12\x14\n\x10SCHEDULED_FAILED\x10\x04\x32\xad\x10\n\x0bPlotService\x12\x46\n\x0eInitializePlot\x12\x1b.plot.InitializePlotRequest\x1a\x15.plot.CommandResponse\"\x00\x12?\n\x0eProcessCommand\x12\x14.plot.CommandRequest\x1a\x15.plot.CommandResponse\"\x00\x12\x44\n\x0eStreamCommands\x12\x1a.plot.StreamCommandRequest\x1a\x10.plot.CommandAck\"\x00(\x01\x30\x01\x12>\n\nDisconnect\x12\x17.plot.DisconnectRequest\x1a\x15.plot.CommandResponse\"\x00\x12;\n\x08HasPower\x12\x15.plot.HasPowerRequest\x1a\x16.plot.HasPowerResponse\"\x00\x12J\n\x10PlotAlignmentSVG\x12\x1d.plot.PlotAlignmentSVGRequest\x1a\x15.plot.CommandResponse\"\x00\x12:\n\x08WalkHome\x12\x15.plot.WalkHomeRequest\x1a\x15.plot.CommandResponse\"\x00\x12L\n\x11ResetHomePosition\x12\x1e.plot.ResetHomePositionRequest\x1a\x15.plot.CommandResponse\"\x00\x12\\\n\x19RestoreInteractiveContext\x12&.plot.RestoreInteractiveContextRequest\x1a\x15.plot.CommandResponse\"\x00\x12T\n\x15\x45ndInteractiveContext\x12\".plot.EndInteractiveContextRequest\x1a\x15.plot.CommandResponse\"\x00\x12G\n\x0cOptimizePlot\x12\x19.plot.OptimizePlotRequest\x1a\x1a.plot.OptimizePlotResponse\"\x00\x12G\n\x0c\x45stimatePlot\x12\x19.plot.EstimatePlotRequest\x1a\x1a.plot.EstimatePlotResponse\"\x00\x12J\n\rRenderPreview\x12\x1a.plot.RenderPreviewRequest\x1a\x1b.plot.RenderPreviewResponse\"\x00\x12\x41\n\nUploadPlot\x12\x15.plot.UploadPlotChunk\x1a\x18.plot.UploadPlotResponse\"\x00(\x01\x12\x45\n\x0cLoadPlotFile\x12\x19.plot.LoadPlotFileRequest\x1a\x18.plot.UploadPlotResponse\"\x00\x12:\n\x08StartJob\x12\x15.plot.StartJobRequest\x1a\x15.plot.CommandResponse\"\x00\x12:\n\x08PauseJob\x12\x15.plot.PauseJobRequest\x1a\x15.plot.CommandResponse\"\x00\x12<\n\tResumeJob\x12\x16.plot.ResumeJobRequest\x1a\x15.plot.CommandResponse\"\x00\x12<\n\tCancelJob\x12\x16.plot.CancelJobRequest\x1a\x15.plot.CommandResponse\"\x00\x12\x41\n\x0cGetJobStatus\x12\x16.plot.JobStatusRequest\x1a\x17.plot.JobStatusResponse\"\x00\x12\x38\n\tGetLayers\x12\x13.plot.LayersRequest\x1a\x14.plot.LayersResponse\"\x00\x12\x44\n\rWatchProgress\x12\x1a.plot.WatchProgressRequest\x1a\x13.plot.ProgressEvent\"\x00\x30\x01\x12J\n\x0fGetPowerHistory\x12\x19.plot.PowerHistoryRequest\x1a\x1a.plot.PowerHistoryResponse\"\x00\x12\x44\n\x0bListDevices\x12\x18.plot.ListDevicesRequest\x1a\x19.plot.ListDevicesResponse\"\x00\x12\x42\n\x0c\x45nrollDevice\x12\x19.plot.EnrollDeviceRequest\x1a\x15.plot.CommandResponse\"\x00\x12\x46\n\x0eWithdrawDevice\x12\x1b.plot.WithdrawDeviceRequest\x1a\x15.plot.CommandResponse\"\x00\x12>\n\tSubmitJob\x12\x16.plot.SubmitJobRequest\x1a\x17.plot.SubmitJobResponse\"\x00\x12N\n\x12\x43\x61ncelScheduledJob\x12\x1f.plot.CancelScheduledJobRequest\x1a\x15.plot.CommandResponse\"\x00\x12>\n\x0bGetSchedule\x12\x15.plot.ScheduleRequest\x1a\x16.plot.ScheduleResponse\"\x00\x12;\n\nGetMetrics\x12\x14.plot.MetricsRequest\x1a\x15.plot.MetricsResponse\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'plot_service_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_HISTOGRAMMETRIC_LABELSENTRY']._loaded_options = None
+  _globals['_HISTOGRAMMETRIC_LABELSENTRY']._serialized_options = b'8\001'
+  _globals['_GAUGEMETRIC_LABELSENTRY']._loaded_options = None
+  _globals['_GAUGEMETRIC_LABELSENTRY']._serialized_options = b'8\001'
+  _globals['_JOBSTATE']._serialized_start=4932
+  _globals['_JOBSTATE']._serialized_end=5056
+  _globals['_SCHEDULEDJOBSTATE']._serialized_start=5059
+  _globals['_SCHEDULEDJOBSTATE']._serialized_end=5194
   _globals['_DISCONNECTREQUEST']._serialized_start=28
-  _globals['_DISCONNECTREQUEST']._serialized_end=47
-  _globals['_HASPOWERREQUEST']._serialized_start=49
-  _globals['_HASPOWERREQUEST']._serialized_end=66
-  _globals['_HASPOWERRESPONSE']._serialized_start=68
-  _globals['_HASPOWERRESPONSE']._serialized_end=105
-  _globals['_COMMANDREQUEST']._serialized_start=107
-  _globals['_COMMANDREQUEST']._serialized_end=140
-  _globals['_COMMANDRESPONSE']._serialized_start=142
-  _globals['_COMMANDRESPONSE']._serialized_end=193
-  _globals['_INITIALIZEPLOTREQUEST']._serialized_start=195
-  _globals['_INITIALIZEPLOTREQUEST']._serialized_end=256
-  _globals['_PLOTALIGNMENTSVGREQUEST']._serialized_start=258
-  _globals['_PLOTALIGNMENTSVGREQUEST']._serialized_end=283
-  _globals['_WALKHOMEREQUEST']._serialized_start=285
-  _globals['_WALKHOMEREQUEST']._serialized_end=334
-  _globals['_RESETHOMEPOSITIONREQUEST']._serialized_start=336
-  _globals['_RESETHOMEPOSITIONREQUEST']._serialized_end=362
-  _globals['_RESTOREINTERACTIVECONTEXTREQUEST']._serialized_start=364
-  _globals['_RESTOREINTERACTIVECONTEXTREQUEST']._serialized_end=398
-  _globals['_ENDINTERACTIVECONTEXTREQUEST']._serialized_start=400
-  _globals['_ENDINTERACTIVECONTEXTREQUEST']._serialized_end=430
-  _globals['_PLOTSERVICE']._serialized_start=433
-  _globals['_PLOTSERVICE']._serialized_end=1102
+  _globals['_DISCONNECTREQUEST']._serialized_end=66
+  _globals['_HASPOWERREQUEST']._serialized_start=68
+  _globals['_HASPOWERREQUEST']._serialized_end=104
+  _globals['_HASPOWERRESPONSE']._serialized_start=106
+  _globals['_HASPOWERRESPONSE']._serialized_end=143
+  _globals['_COMMANDREQUEST']._serialized_start=145
+  _globals['_COMMANDREQUEST']._serialized_end=197
+  _globals['_COMMANDRESPONSE']._serialized_start=199
+  _globals['_COMMANDRESPONSE']._serialized_end=250
+  _globals['_STREAMCOMMANDREQUEST']._serialized_start=252
+  _globals['_STREAMCOMMANDREQUEST']._serialized_end=328
+  _globals['_COMMANDACK']._serialized_start=330
+  _globals['_COMMANDACK']._serialized_end=394
+  _globals['_INITIALIZEPLOTREQUEST']._serialized_start=396
+  _globals['_INITIALIZEPLOTREQUEST']._serialized_end=476
+  _globals['_PLOTALIGNMENTSVGREQUEST']._serialized_start=478
+  _globals['_PLOTALIGNMENTSVGREQUEST']._serialized_end=522
+  _globals['_WALKHOMEREQUEST']._serialized_start=524
+  _globals['_WALKHOMEREQUEST']._serialized_end=592
+  _globals['_RESETHOMEPOSITIONREQUEST']._serialized_start=594
+  _globals['_RESETHOMEPOSITIONREQUEST']._serialized_end=639
+  _globals['_RESTOREINTERACTIVECONTEXTREQUEST']._serialized_start=641
+  _globals['_RESTOREINTERACTIVECONTEXTREQUEST']._serialized_end=694
+  _globals['_ENDINTERACTIVECONTEXTREQUEST']._serialized_start=696
+  _globals['_ENDINTERACTIVECONTEXTREQUEST']._serialized_end=745
+  _globals['_OPTIMIZEPLOTREQUEST']._serialized_start=748
+  _globals['_OPTIMIZEPLOTREQUEST']._serialized_end=932
+  _globals['_OPTIMIZEPLOTRESPONSE']._serialized_start=935
+  _globals['_OPTIMIZEPLOTRESPONSE']._serialized_end=1169
+  _globals['_ESTIMATEPLOTREQUEST']._serialized_start=1171
+  _globals['_ESTIMATEPLOTREQUEST']._serialized_end=1262
+  _globals['_ESTIMATEPLOTRESPONSE']._serialized_start=1265
+  _globals['_ESTIMATEPLOTRESPONSE']._serialized_end=1410
+  _globals['_RENDERPREVIEWREQUEST']._serialized_start=1413
+  _globals['_RENDERPREVIEWREQUEST']._serialized_end=1550
+  _globals['_RENDERPREVIEWRESPONSE']._serialized_start=1553
+  _globals['_RENDERPREVIEWRESPONSE']._serialized_end=1700
+  _globals['_UPLOADPLOTCHUNK']._serialized_start=1703
+  _globals['_UPLOADPLOTCHUNK']._serialized_end=1877
+  _globals['_UPLOADPLOTRESPONSE']._serialized_start=1879
+  _globals['_UPLOADPLOTRESPONSE']._serialized_end=1956
+  _globals['_LOADPLOTFILEREQUEST']._serialized_start=1958
+  _globals['_LOADPLOTFILEREQUEST']._serialized_end=2012
+  _globals['_STARTJOBREQUEST']._serialized_start=2014
+  _globals['_STARTJOBREQUEST']._serialized_end=2050
+  _globals['_PAUSEJOBREQUEST']._serialized_start=2052
+  _globals['_PAUSEJOBREQUEST']._serialized_end=2088
+  _globals['_RESUMEJOBREQUEST']._serialized_start=2090
+  _globals['_RESUMEJOBREQUEST']._serialized_end=2149
+  _globals['_CANCELJOBREQUEST']._serialized_start=2151
+  _globals['_CANCELJOBREQUEST']._serialized_end=2188
+  _globals['_JOBSTATUSREQUEST']._serialized_start=2190
+  _globals['_JOBSTATUSREQUEST']._serialized_end=2227
+  _globals['_JOBSTATUSRESPONSE']._serialized_start=2230
+  _globals['_JOBSTATUSRESPONSE']._serialized_end=2370
+  _globals['_LAYERSREQUEST']._serialized_start=2372
+  _globals['_LAYERSREQUEST']._serialized_end=2406
+  _globals['_LAYER']._serialized_start=2409
+  _globals['_LAYER']._serialized_end=2647
+  _globals['_LAYERSRESPONSE']._serialized_start=2649
+  _globals['_LAYERSRESPONSE']._serialized_end=2733
+  _globals['_WATCHPROGRESSREQUEST']._serialized_start=2735
+  _globals['_WATCHPROGRESSREQUEST']._serialized_end=2776
+  _globals['_PROGRESSEVENT']._serialized_start=2779
+  _globals['_PROGRESSEVENT']._serialized_end=2951
+  _globals['_METRICSREQUEST']._serialized_start=2953
+  _globals['_METRICSREQUEST']._serialized_end=2969
+  _globals['_HISTOGRAMMETRIC']._serialized_start=2972
+  _globals['_HISTOGRAMMETRIC']._serialized_end=3168
+  _globals['_HISTOGRAMMETRIC_LABELSENTRY']._serialized_start=3123
+  _globals['_HISTOGRAMMETRIC_LABELSENTRY']._serialized_end=3168
+  _globals['_GAUGEMETRIC']._serialized_start=3171
+  _globals['_GAUGEMETRIC']._serialized_end=3307
+  _globals['_GAUGEMETRIC_LABELSENTRY']._serialized_start=3123
+  _globals['_GAUGEMETRIC_LABELSENTRY']._serialized_end=3168
+  _globals['_METRICSRESPONSE']._serialized_start=3309
+  _globals['_METRICSRESPONSE']._serialized_end=3404
+  _globals['_POWERHISTORYREQUEST']._serialized_start=3406
+  _globals['_POWERHISTORYREQUEST']._serialized_end=3461
+  _globals['_POWERSAMPLE']._serialized_start=3463
+  _globals['_POWERSAMPLE']._serialized_end=3554
+  _globals['_POWERHISTORYRESPONSE']._serialized_start=3556
+  _globals['_POWERHISTORYRESPONSE']._serialized_end=3614
+  _globals['_LISTDEVICESREQUEST']._serialized_start=3616
+  _globals['_LISTDEVICESREQUEST']._serialized_end=3636
+  _globals['_DEVICESTATUS']._serialized_start=3639
+  _globals['_DEVICESTATUS']._serialized_end=3770
+  _globals['_LISTDEVICESRESPONSE']._serialized_start=3772
+  _globals['_LISTDEVICESRESPONSE']._serialized_end=3830
+  _globals['_ENROLLDEVICEREQUEST']._serialized_start=3832
+  _globals['_ENROLLDEVICEREQUEST']._serialized_end=3907
+  _globals['_WITHDRAWDEVICEREQUEST']._serialized_start=3909
+  _globals['_WITHDRAWDEVICEREQUEST']._serialized_end=3951
+  _globals['_SUBMITJOBREQUEST']._serialized_start=3953
+  _globals['_SUBMITJOBREQUEST']._serialized_end=4052
+  _globals['_SUBMITJOBRESPONSE']._serialized_start=4054
+  _globals['_SUBMITJOBRESPONSE']._serialized_end=4123
+  _globals['_CANCELSCHEDULEDJOBREQUEST']._serialized_start=4125
+  _globals['_CANCELSCHEDULEDJOBREQUEST']._serialized_end=4168
+  _globals['_SCHEDULEREQUEST']._serialized_start=4170
+  _globals['_SCHEDULEREQUEST']._serialized_end=4187
+  _globals['_SCHEDULEDJOB']._serialized_start=4190
+  _globals['_SCHEDULEDJOB']._serialized_end=4512
+  _globals['_FARMDEVICESTATUS']._serialized_start=4515
+  _globals['_FARMDEVICESTATUS']._serialized_end=4835
+  _globals['_SCHEDULERESPONSE']._serialized_start=4837
+  _globals['_SCHEDULERESPONSE']._serialized_end=4930
+  _globals['_PLOTSERVICE']._serialized_start=5197
+  _globals['_PLOTSERVICE']._serialized_end=7290
 # @@protoc_insertion_point(module_scope)
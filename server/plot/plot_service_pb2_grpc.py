@@ -27,6 +27,11 @@ if _version_not_supported:
 
 class PlotServiceStub(object):
     """The plotting service definition
+
+    The server can drive several NextDraws. Requests for a plotter carry a device_id,
+    the NextDraw port option selecting it by USB port or nickname. An empty device_id
+    is the default device, the first NextDraw found, or for a plot the device named by
+    the plot's port option.
     """
 
     def __init__(self, channel):
@@ -45,6 +50,11 @@ class PlotServiceStub(object):
                 request_serializer=plot__service__pb2.CommandRequest.SerializeToString,
                 response_deserializer=plot__service__pb2.CommandResponse.FromString,
                 _registered_method=True)
+        self.StreamCommands = channel.stream_stream(
+                '/plot.PlotService/StreamCommands',
+                request_serializer=plot__service__pb2.StreamCommandRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.CommandAck.FromString,
+                _registered_method=True)
         self.Disconnect = channel.unary_unary(
                 '/plot.PlotService/Disconnect',
                 request_serializer=plot__service__pb2.DisconnectRequest.SerializeToString,
@@ -80,10 +90,115 @@ class PlotServiceStub(object):
                 request_serializer=plot__service__pb2.EndInteractiveContextRequest.SerializeToString,
                 response_deserializer=plot__service__pb2.CommandResponse.FromString,
                 _registered_method=True)
+        self.OptimizePlot = channel.unary_unary(
+                '/plot.PlotService/OptimizePlot',
+                request_serializer=plot__service__pb2.OptimizePlotRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.OptimizePlotResponse.FromString,
+                _registered_method=True)
+        self.EstimatePlot = channel.unary_unary(
+                '/plot.PlotService/EstimatePlot',
+                request_serializer=plot__service__pb2.EstimatePlotRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.EstimatePlotResponse.FromString,
+                _registered_method=True)
+        self.RenderPreview = channel.unary_unary(
+                '/plot.PlotService/RenderPreview',
+                request_serializer=plot__service__pb2.RenderPreviewRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.RenderPreviewResponse.FromString,
+                _registered_method=True)
+        self.UploadPlot = channel.stream_unary(
+                '/plot.PlotService/UploadPlot',
+                request_serializer=plot__service__pb2.UploadPlotChunk.SerializeToString,
+                response_deserializer=plot__service__pb2.UploadPlotResponse.FromString,
+                _registered_method=True)
+        self.LoadPlotFile = channel.unary_unary(
+                '/plot.PlotService/LoadPlotFile',
+                request_serializer=plot__service__pb2.LoadPlotFileRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.UploadPlotResponse.FromString,
+                _registered_method=True)
+        self.StartJob = channel.unary_unary(
+                '/plot.PlotService/StartJob',
+                request_serializer=plot__service__pb2.StartJobRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.CommandResponse.FromString,
+                _registered_method=True)
+        self.PauseJob = channel.unary_unary(
+                '/plot.PlotService/PauseJob',
+                request_serializer=plot__service__pb2.PauseJobRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.CommandResponse.FromString,
+                _registered_method=True)
+        self.ResumeJob = channel.unary_unary(
+                '/plot.PlotService/ResumeJob',
+                request_serializer=plot__service__pb2.ResumeJobRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.CommandResponse.FromString,
+                _registered_method=True)
+        self.CancelJob = channel.unary_unary(
+                '/plot.PlotService/CancelJob',
+                request_serializer=plot__service__pb2.CancelJobRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.CommandResponse.FromString,
+                _registered_method=True)
+        self.GetJobStatus = channel.unary_unary(
+                '/plot.PlotService/GetJobStatus',
+                request_serializer=plot__service__pb2.JobStatusRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.JobStatusResponse.FromString,
+                _registered_method=True)
+        self.GetLayers = channel.unary_unary(
+                '/plot.PlotService/GetLayers',
+                request_serializer=plot__service__pb2.LayersRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.LayersResponse.FromString,
+                _registered_method=True)
+        self.WatchProgress = channel.unary_stream(
+                '/plot.PlotService/WatchProgress',
+                request_serializer=plot__service__pb2.WatchProgressRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.ProgressEvent.FromString,
+                _registered_method=True)
+        self.GetPowerHistory = channel.unary_unary(
+                '/plot.PlotService/GetPowerHistory',
+                request_serializer=plot__service__pb2.PowerHistoryRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.PowerHistoryResponse.FromString,
+                _registered_method=True)
+        self.ListDevices = channel.unary_unary(
+                '/plot.PlotService/ListDevices',
+                request_serializer=plot__service__pb2.ListDevicesRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.ListDevicesResponse.FromString,
+                _registered_method=True)
+        self.EnrollDevice = channel.unary_unary(
+                '/plot.PlotService/EnrollDevice',
+                request_serializer=plot__service__pb2.EnrollDeviceRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.CommandResponse.FromString,
+                _registered_method=True)
+        self.WithdrawDevice = channel.unary_unary(
+                '/plot.PlotService/WithdrawDevice',
+                request_serializer=plot__service__pb2.WithdrawDeviceRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.CommandResponse.FromString,
+                _registered_method=True)
+        self.SubmitJob = channel.unary_unary(
+                '/plot.PlotService/SubmitJob',
+                request_serializer=plot__service__pb2.SubmitJobRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.SubmitJobResponse.FromString,
+                _registered_method=True)
+        self.CancelScheduledJob = channel.unary_unary(
+                '/plot.PlotService/CancelScheduledJob',
+                request_serializer=plot__service__pb2.CancelScheduledJobRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.CommandResponse.FromString,
+                _registered_method=True)
+        self.GetSchedule = channel.unary_unary(
+                '/plot.PlotService/GetSchedule',
+                request_serializer=plot__service__pb2.ScheduleRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.ScheduleResponse.FromString,
+                _registered_method=True)
+        self.GetMetrics = channel.unary_unary(
+                '/plot.PlotService/GetMetrics',
+                request_serializer=plot__service__pb2.MetricsRequest.SerializeToString,
+                response_deserializer=plot__service__pb2.MetricsResponse.FromString,
+                _registered_method=True)
 
 
 class PlotServiceServicer(object):
     """The plotting service definition
+
+    The server can drive several NextDraws. Requests for a plotter carry a device_id,
+    the NextDraw port option selecting it by USB port or nickname. An empty device_id
+    is the default device, the first NextDraw found, or for a plot the device named by
+    the plot's port option.
     """
 
     def InitializePlot(self, request, context):
@@ -100,6 +215,13 @@ class PlotServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamCommands(self, request_iterator, context):
+        """Process a stream of commands, acknowledging each one by sequence number
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def Disconnect(self, request, context):
         """Disconnect from NextDraw
         """
@@ -149,6 +271,147 @@ class PlotServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def OptimizePlot(self, request, context):
+        """Preprocess plot commands to reduce plotting time
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def EstimatePlot(self, request, context):
+        """Estimate the distances and duration of a plot
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RenderPreview(self, request, context):
+        """Render a plot file on the server as a PNG of its pen-down strokes and optionally its pen-up travel
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UploadPlot(self, request_iterator, context):
+        """Upload a plot file in chunks, initialize NextDraw from it and prepare a job to plot it
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def LoadPlotFile(self, request, context):
+        """Load a text or binary plot file from the server's file system and prepare a job to plot it
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StartJob(self, request, context):
+        """Start plotting the uploaded plot
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def PauseJob(self, request, context):
+        """Pause the plot job after the current command
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ResumeJob(self, request, context):
+        """Resume a paused plot job, or continue a plot interrupted by a crash or power loss
+        from the last command its journal records as completed
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CancelJob(self, request, context):
+        """Cancel the plot job after the current command
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetJobStatus(self, request, context):
+        """Report the state and progress of the plot job
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetLayers(self, request, context):
+        """Report the layers of the plot job's plot, marked by "# Layer:" comments, as far as they have been prepared
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchProgress(self, request, context):
+        """Stream the plot job's progress and state changes, any number of clients may watch
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetPowerHistory(self, request, context):
+        """Report the supply voltage readings taken in the background
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListDevices(self, request, context):
+        """List the plotters the server has been asked to drive with the state of their plot jobs
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def EnrollDevice(self, request, context):
+        """Add a plotter to the farm that SubmitJob dispatches jobs to, or change its model and pen colour
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WithdrawDevice(self, request, context):
+        """Stop dispatching jobs to a plotter, a job it is plotting carries on
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubmitJob(self, request, context):
+        """Queue a plot file on the server for the next free plotter in the farm that can plot it
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CancelScheduledJob(self, request, context):
+        """Remove a job from the queue, or cancel it if it is plotting
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetSchedule(self, request, context):
+        """Report the queued, plotting and recent jobs and the throughput and utilisation of each plotter
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetMetrics(self, request, context):
+        """Report latency histograms of RPCs and commands and the state of the hardware queue
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_PlotServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -162,6 +425,11 @@ def add_PlotServiceServicer_to_server(servicer, server):
                     request_deserializer=plot__service__pb2.CommandRequest.FromString,
                     response_serializer=plot__service__pb2.CommandResponse.SerializeToString,
             ),
+            'StreamCommands': grpc.stream_stream_rpc_method_handler(
+                    servicer.StreamCommands,
+                    request_deserializer=plot__service__pb2.StreamCommandRequest.FromString,
+                    response_serializer=plot__service__pb2.CommandAck.SerializeToString,
+            ),
             'Disconnect': grpc.unary_unary_rpc_method_handler(
                     servicer.Disconnect,
                     request_deserializer=plot__service__pb2.DisconnectRequest.FromString,
@@ -197,6 +465,106 @@ def add_PlotServiceServicer_to_server(servicer, server):
                     request_deserializer=plot__service__pb2.EndInteractiveContextRequest.FromString,
                     response_serializer=plot__service__pb2.CommandResponse.SerializeToString,
             ),
+            'OptimizePlot': grpc.unary_unary_rpc_method_handler(
+                    servicer.OptimizePlot,
+                    request_deserializer=plot__service__pb2.OptimizePlotRequest.FromString,
+                    response_serializer=plot__service__pb2.OptimizePlotResponse.SerializeToString,
+            ),
+            'EstimatePlot': grpc.unary_unary_rpc_method_handler(
+                    servicer.EstimatePlot,
+                    request_deserializer=plot__service__pb2.EstimatePlotRequest.FromString,
+                    response_serializer=plot__service__pb2.EstimatePlotResponse.SerializeToString,
+            ),
+            'RenderPreview': grpc.unary_unary_rpc_method_handler(
+                    servicer.RenderPreview,
+                    request_deserializer=plot__service__pb2.RenderPreviewRequest.FromString,
+                    response_serializer=plot__service__pb2.RenderPreviewResponse.SerializeToString,
+            ),
+            'UploadPlot': grpc.stream_unary_rpc_method_handler(
+                    servicer.UploadPlot,
+                    request_deserializer=plot__service__pb2.UploadPlotChunk.FromString,
+                    response_serializer=plot__service__pb2.UploadPlotResponse.SerializeToString,
+            ),
+            'LoadPlotFile': grpc.unary_unary_rpc_method_handler(
+                    servicer.LoadPlotFile,
+                    request_deserializer=plot__service__pb2.LoadPlotFileRequest.FromString,
+                    response_serializer=plot__service__pb2.UploadPlotResponse.SerializeToString,
+            ),
+            'StartJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.StartJob,
+                    request_deserializer=plot__service__pb2.StartJobRequest.FromString,
+                    response_serializer=plot__service__pb2.CommandResponse.SerializeToString,
+            ),
+            'PauseJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.PauseJob,
+                    request_deserializer=plot__service__pb2.PauseJobRequest.FromString,
+                    response_serializer=plot__service__pb2.CommandResponse.SerializeToString,
+            ),
+            'ResumeJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.ResumeJob,
+                    request_deserializer=plot__service__pb2.ResumeJobRequest.FromString,
+                    response_serializer=plot__service__pb2.CommandResponse.SerializeToString,
+            ),
+            'CancelJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.CancelJob,
+                    request_deserializer=plot__service__pb2.CancelJobRequest.FromString,
+                    response_serializer=plot__service__pb2.CommandResponse.SerializeToString,
+            ),
+            'GetJobStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetJobStatus,
+                    request_deserializer=plot__service__pb2.JobStatusRequest.FromString,
+                    response_serializer=plot__service__pb2.JobStatusResponse.SerializeToString,
+            ),
+            'GetLayers': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetLayers,
+                    request_deserializer=plot__service__pb2.LayersRequest.FromString,
+                    response_serializer=plot__service__pb2.LayersResponse.SerializeToString,
+            ),
+            'WatchProgress': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchProgress,
+                    request_deserializer=plot__service__pb2.WatchProgressRequest.FromString,
+                    response_serializer=plot__service__pb2.ProgressEvent.SerializeToString,
+            ),
+            'GetPowerHistory': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetPowerHistory,
+                    request_deserializer=plot__service__pb2.PowerHistoryRequest.FromString,
+                    response_serializer=plot__service__pb2.PowerHistoryResponse.SerializeToString,
+            ),
+            'ListDevices': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListDevices,
+                    request_deserializer=plot__service__pb2.ListDevicesRequest.FromString,
+                    response_serializer=plot__service__pb2.ListDevicesResponse.SerializeToString,
+            ),
+            'EnrollDevice': grpc.unary_unary_rpc_method_handler(
+                    servicer.EnrollDevice,
+                    request_deserializer=plot__service__pb2.EnrollDeviceRequest.FromString,
+                    response_serializer=plot__service__pb2.CommandResponse.SerializeToString,
+            ),
+            'WithdrawDevice': grpc.unary_unary_rpc_method_handler(
+                    servicer.WithdrawDevice,
+                    request_deserializer=plot__service__pb2.WithdrawDeviceRequest.FromString,
+                    response_serializer=plot__service__pb2.CommandResponse.SerializeToString,
+            ),
+            'SubmitJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitJob,
+                    request_deserializer=plot__service__pb2.SubmitJobRequest.FromString,
+                    response_serializer=plot__service__pb2.SubmitJobResponse.SerializeToString,
+            ),
+            'CancelScheduledJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.CancelScheduledJob,
+                    request_deserializer=plot__service__pb2.CancelScheduledJobRequest.FromString,
+                    response_serializer=plot__service__pb2.CommandResponse.SerializeToString,
+            ),
+            'GetSchedule': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetSchedule,
+                    request_deserializer=plot__service__pb2.ScheduleRequest.FromString,
+                    response_serializer=plot__service__pb2.ScheduleResponse.SerializeToString,
+            ),
+            'GetMetrics': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetMetrics,
+                    request_deserializer=plot__service__pb2.MetricsRequest.FromString,
+                    response_serializer=plot__service__pb2.MetricsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'plot.PlotService', rpc_method_handlers)
@@ -207,6 +575,11 @@ def add_PlotServiceServicer_to_server(servicer, server):
  # This class is part of an EXPERIMENTAL API.
 class PlotService(object):
     """The plotting service definition
+
+    The server can drive several NextDraws. Requests for a plotter carry a device_id,
+    the NextDraw port option selecting it by USB port or nickname. An empty device_id
+    is the default device, the first NextDraw found, or for a plot the device named by
+    the plot's port option.
     """
 
     @staticmethod
@@ -263,6 +636,33 @@ class PlotService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def StreamCommands(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/plot.PlotService/StreamCommands',
+            plot__service__pb2.StreamCommandRequest.SerializeToString,
+            plot__service__pb2.CommandAck.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def Disconnect(request,
             target,
@@ -451,3 +851,543 @@ class PlotService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def OptimizePlot(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/OptimizePlot',
+            plot__service__pb2.OptimizePlotRequest.SerializeToString,
+            plot__service__pb2.OptimizePlotResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def EstimatePlot(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/EstimatePlot',
+            plot__service__pb2.EstimatePlotRequest.SerializeToString,
+            plot__service__pb2.EstimatePlotResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RenderPreview(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/RenderPreview',
+            plot__service__pb2.RenderPreviewRequest.SerializeToString,
+            plot__service__pb2.RenderPreviewResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def UploadPlot(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/plot.PlotService/UploadPlot',
+            plot__service__pb2.UploadPlotChunk.SerializeToString,
+            plot__service__pb2.UploadPlotResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def LoadPlotFile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/LoadPlotFile',
+            plot__service__pb2.LoadPlotFileRequest.SerializeToString,
+            plot__service__pb2.UploadPlotResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StartJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/StartJob',
+            plot__service__pb2.StartJobRequest.SerializeToString,
+            plot__service__pb2.CommandResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def PauseJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/PauseJob',
+            plot__service__pb2.PauseJobRequest.SerializeToString,
+            plot__service__pb2.CommandResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ResumeJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/ResumeJob',
+            plot__service__pb2.ResumeJobRequest.SerializeToString,
+            plot__service__pb2.CommandResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CancelJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/CancelJob',
+            plot__service__pb2.CancelJobRequest.SerializeToString,
+            plot__service__pb2.CommandResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetJobStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/GetJobStatus',
+            plot__service__pb2.JobStatusRequest.SerializeToString,
+            plot__service__pb2.JobStatusResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetLayers(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/GetLayers',
+            plot__service__pb2.LayersRequest.SerializeToString,
+            plot__service__pb2.LayersResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WatchProgress(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/plot.PlotService/WatchProgress',
+            plot__service__pb2.WatchProgressRequest.SerializeToString,
+            plot__service__pb2.ProgressEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetPowerHistory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/GetPowerHistory',
+            plot__service__pb2.PowerHistoryRequest.SerializeToString,
+            plot__service__pb2.PowerHistoryResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListDevices(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/ListDevices',
+            plot__service__pb2.ListDevicesRequest.SerializeToString,
+            plot__service__pb2.ListDevicesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def EnrollDevice(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/EnrollDevice',
+            plot__service__pb2.EnrollDeviceRequest.SerializeToString,
+            plot__service__pb2.CommandResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WithdrawDevice(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/WithdrawDevice',
+            plot__service__pb2.WithdrawDeviceRequest.SerializeToString,
+            plot__service__pb2.CommandResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/SubmitJob',
+            plot__service__pb2.SubmitJobRequest.SerializeToString,
+            plot__service__pb2.SubmitJobResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CancelScheduledJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/CancelScheduledJob',
+            plot__service__pb2.CancelScheduledJobRequest.SerializeToString,
+            plot__service__pb2.CommandResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetSchedule(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/GetSchedule',
+            plot__service__pb2.ScheduleRequest.SerializeToString,
+            plot__service__pb2.ScheduleResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetMetrics(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/plot.PlotService/GetMetrics',
+            plot__service__pb2.MetricsRequest.SerializeToString,
+            plot__service__pb2.MetricsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
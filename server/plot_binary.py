@@ -0,0 +1,341 @@
+import argparse
+import logging
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+from path_parser import Path, parse_path
+from plot_commands import (API_OPTION_CASTS, COMMANDS_SECTION, COMMENT_PREFIX, DEFINITIONS_SECTION, OPTIONS_SECTION,
+                           cast_api_params, iter_plot_file, parse_command, split_command)
+
+# Binary plot layout, all values little-endian:
+#   header
+#   options section, UTF-8 text with one option per line
+#   definitions section, UTF-8 text with one definition per line
+#   string table, a u32 length and UTF-8 bytes for each string
+#   operation stream, a u8 opcode followed by the opcode's operands
+#   padding to an 8 byte boundary
+#   coordinates, float64 x, y pairs consumed in order by draw_path and the move opcodes
+MAGIC = b'PDPB'
+VERSION = 1
+# magic, version, reserved, operation count, command count (operations less comments),
+# options, definitions, string table and operation stream lengths in bytes, coordinate count.
+# The command count is informational, a job runs every operation, comments included.
+HEADER = struct.Struct('<4sHHQQQQQQQ')
+
+(OP_TEXT, OP_OPTION, OP_DEFINED, OP_DRAW_PATH, OP_PENUP, OP_PENDOWN, OP_BLOCK, OP_UPDATE,
+ OP_MOVETO, OP_LINETO, OP_GOTO, OP_MOVE, OP_LINE, OP_GO, OP_DELAY) = range(15)
+
+STRING_OPERAND = struct.Struct('<I')  # OP_TEXT command line or OP_DEFINED definition name
+OPTION_OPERAND = struct.Struct('<BI')  # OP_OPTION option number and value string
+COUNT_OPERAND = struct.Struct('<I')  # OP_DRAW_PATH vertex count
+DELAY_OPERAND = struct.Struct('<i')  # OP_DELAY milliseconds
+OPERAND_SIZES = {OP_TEXT: STRING_OPERAND.size, OP_DEFINED: STRING_OPERAND.size,
+                 OP_OPTION: OPTION_OPERAND.size, OP_DELAY: DELAY_OPERAND.size}
+
+NO_OPERAND_OPS = {'penup': OP_PENUP, 'pendown': OP_PENDOWN, 'block': OP_BLOCK, 'update': OP_UPDATE}
+COORDINATE_OPS = {'moveto': OP_MOVETO, 'lineto': OP_LINETO, 'goto': OP_GOTO,
+                  'move': OP_MOVE, 'line': OP_LINE, 'go': OP_GO}
+OP_NAMES = {opcode: name for name, opcode in {**NO_OPERAND_OPS, **COORDINATE_OPS}.items()}
+COORDINATE_OPCODES = set(COORDINATE_OPS.values())
+
+# Option numbers are part of the format, new options must only be appended
+OPTION_NAMES = ('handling', 'speed_pendown', 'speed_penup', 'accel', 'pen_pos_down', 'pen_pos_up',
+                'pen_rate_lower', 'pen_rate_raise', 'model', 'penlift', 'homing', 'port', 'port_config',
+                'units')
+OPTION_NUMBERS = {name: number for number, name in enumerate(OPTION_NAMES)}
+
+
+def is_binary_plot(path):
+    with open(path, 'rb') as plot_file:
+        return plot_file.read(len(MAGIC)) == MAGIC
+
+
+def padding(length):
+    return -length % 8
+
+
+class PlotEncoder:
+    """Encodes plot commands into an operation stream and a coordinate array held in temporary files."""
+
+    def __init__(self, definition_names):
+        self.definition_names = definition_names
+        self.operations = tempfile.TemporaryFile()
+        self.coordinates = tempfile.TemporaryFile()
+        self.strings = {}
+        self.operation_count = 0
+        self.command_count = 0
+        self.coordinate_count = 0
+
+    def string(self, value):
+        return self.strings.setdefault(value, len(self.strings))
+
+    def add_coordinates(self, values):
+        self.coordinates.write(values.tobytes())
+        self.coordinate_count += len(values)
+
+    def add(self, command_line):
+        name, params = split_command(command_line)
+        write = self.operations.write
+        if name in self.definition_names and not params:
+            write(bytes([OP_DEFINED]) + STRING_OPERAND.pack(self.string(name)))
+        elif name == 'draw_path' and len(params) == 1:
+            path = parse_path(params[0])
+            write(bytes([OP_DRAW_PATH]) + COUNT_OPERAND.pack(len(path)))
+            self.add_coordinates(path.coords)
+        elif name in COORDINATE_OPS and len(params) == 2:
+            write(bytes([COORDINATE_OPS[name]]))
+            self.add_coordinates(array('d', map(float, params)))
+        elif name in NO_OPERAND_OPS and not params:
+            write(bytes([NO_OPERAND_OPS[name]]))
+        elif name == 'delay' and len(params) == 1:
+            write(bytes([OP_DELAY]) + DELAY_OPERAND.pack(int(params[0])))
+        elif name in OPTION_NUMBERS:
+            write(bytes([OP_OPTION]) + OPTION_OPERAND.pack(OPTION_NUMBERS[name], self.string(' '.join(params))))
+        else:
+            write(bytes([OP_TEXT]) + STRING_OPERAND.pack(self.string(command_line)))
+        self.operation_count += 1
+        if not name.startswith(COMMENT_PREFIX):
+            self.command_count += 1
+
+    def write(self, binary_file, options, definitions):
+        """Write the complete binary plot to a file opened for binary writing."""
+        options_data = '\n'.join(options).encode('utf-8')
+        definitions_data = '\n'.join(definitions).encode('utf-8')
+        strings_data = b''.join(STRING_OPERAND.pack(len(encoded)) + encoded
+                                for encoded in (value.encode('utf-8') for value in self.strings))
+        operations_length = self.operations.tell()
+        binary_file.write(HEADER.pack(
+            MAGIC, VERSION, 0, self.operation_count, self.command_count, len(options_data),
+            len(definitions_data), len(strings_data), operations_length, self.coordinate_count
+        ))
+        binary_file.write(options_data)
+        binary_file.write(definitions_data)
+        binary_file.write(strings_data)
+        self.operations.seek(0)
+        shutil.copyfileobj(self.operations, binary_file)
+        binary_file.write(bytes(padding(HEADER.size + len(options_data) + len(definitions_data)
+                                        + len(strings_data) + operations_length)))
+        self.coordinates.seek(0)
+        shutil.copyfileobj(self.coordinates, binary_file)
+
+    def close(self):
+        self.operations.close()
+        self.coordinates.close()
+
+
+def convert_plot(text_path, binary_path):
+    """Convert a plot file from the text format to the binary format.
+
+    Commands are encoded as they are read, so only the options, definitions and
+    distinct strings of the plot are held in memory.
+
+    Args:
+        text_path (str): Plot file in the text format
+        binary_path (str): File to write the binary plot to
+
+    Returns:
+        int: Number of commands converted, excluding comments
+
+    Raises:
+        ValueError: If a command's parameters are malformed
+    """
+    sections = ([], [], [])
+    encoder = None
+    try:
+        with open(text_path) as text_file:
+            for section, line in iter_plot_file(text_file):
+                if section != COMMANDS_SECTION:
+                    sections[section].append(line)
+                    continue
+                if encoder is None:
+                    encoder = PlotEncoder({definition.split()[0] for definition in sections[DEFINITIONS_SECTION]})
+                try:
+                    encoder.add(line)
+                except ValueError as e:
+                    raise ValueError(f"command {encoder.operation_count + 1} '{line[:40]}': {str(e)}")
+        if encoder is None:
+            encoder = PlotEncoder(set())
+        with open(binary_path, 'wb') as binary_file:
+            encoder.write(binary_file, sections[OPTIONS_SECTION], sections[DEFINITIONS_SECTION])
+        return encoder.command_count
+    finally:
+        if encoder is not None:
+            encoder.close()
+
+
+def write_binary_plot(binary_file, options, definitions, commands):
+    """Write a plot in the binary format, encoding its commands as they are produced.
+
+    Only the options, definitions and distinct strings of the plot are held in memory,
+    so commands can come from a generator converting a file of any size.
+
+    Args:
+        binary_file (file): File opened for binary writing
+        options (list[str]): Option lines of the plot
+        definitions (list[str]): Definition lines of the plot
+        commands (iterable): Command lines of the plot
+
+    Returns:
+        int: Number of operations written, one for each command line including comments
+
+    Raises:
+        ValueError: If a command's parameters are malformed
+    """
+    encoder = PlotEncoder({definition.split()[0] for definition in definitions})
+    try:
+        for line in commands:
+            try:
+                encoder.add(line)
+            except ValueError as e:
+                raise ValueError(f"command {encoder.operation_count + 1} '{line[:40]}': {str(e)}")
+        encoder.write(binary_file, options, definitions)
+        return encoder.operation_count
+    finally:
+        encoder.close()
+
+
+class BinaryPlot:
+    """A plot in the binary format, memory-mapped rather than read into memory.
+
+    Iterating yields the (name, params) statements parse_command would return,
+    decoding each operation only when it is reached. draw_path vertices are
+    Paths over the mapped coordinates, so they are never copied.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str or file): Binary plot file, or a binary plot already open for reading
+        """
+        if sys.byteorder != 'little':
+            raise ValueError("Binary plots can only be mapped on little-endian machines")
+        if hasattr(path, 'fileno'):
+            self.map = mmap.mmap(path.fileno(), 0, access=mmap.ACCESS_READ)
+            path = getattr(path, 'name', 'binary plot')
+        else:
+            with open(path, 'rb') as binary_file:
+                self.map = mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, _, self.operation_count, self.command_count, options_length, definitions_length,
+             strings_length, operations_length, coordinate_count) = HEADER.unpack_from(self.map)
+        except struct.error:
+            raise ValueError(f"{path} is not a binary plot")
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary plot")
+        if version != VERSION:
+            raise ValueError(f"{path} is binary plot version {version}, expected version {VERSION}")
+
+        offset = HEADER.size
+        operations_offset = offset + options_length + definitions_length + strings_length
+        coordinates_offset = operations_offset + operations_length + padding(operations_offset + operations_length)
+        # checked before any section is read, so a truncated file never reads past the end of the map
+        if coordinates_offset + coordinate_count * 8 > len(self.map):
+            raise ValueError(f"{path} is truncated")
+        self.options = self.text(offset, options_length)
+        offset += options_length
+        self.definitions = self.text(offset, definitions_length)
+        offset += definitions_length
+        self.strings = self.string_table(offset, strings_length)
+        offset += strings_length
+        view = memoryview(self.map)
+        self.operations = view[offset:offset + operations_length]
+        self.coordinates = view[coordinates_offset:coordinates_offset + coordinate_count * 8].cast('d')
+        view.release()
+
+    def text(self, offset, length):
+        data = self.map[offset:offset + length].decode('utf-8')
+        return data.split('\n') if data else []
+
+    def string_table(self, offset, length):
+        strings, end = [], offset + length
+        while offset < end:
+            (string_length,) = STRING_OPERAND.unpack_from(self.map, offset)
+            offset += STRING_OPERAND.size
+            strings.append(self.map[offset:offset + string_length].decode('utf-8'))
+            offset += string_length
+        return strings
+
+    def __len__(self):
+        return self.operation_count
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def iter_from(self, start):
+        """Iterate the statements from index start, stepping over the earlier operations without decoding them."""
+        operations, coordinates, strings = self.operations, self.coordinates, self.strings
+        position = coordinate = 0
+        for _ in range(start):
+            if position >= len(operations):
+                return
+            opcode = operations[position]
+            position += 1
+            if opcode == OP_DRAW_PATH:
+                (count,) = COUNT_OPERAND.unpack_from(operations, position)
+                position += COUNT_OPERAND.size
+                coordinate += 2 * count
+            elif opcode in COORDINATE_OPCODES:
+                coordinate += 2
+            else:
+                position += OPERAND_SIZES.get(opcode, 0)
+
+        while position < len(operations):
+            opcode = operations[position]
+            position += 1
+            if opcode == OP_DRAW_PATH:
+                (count,) = COUNT_OPERAND.unpack_from(operations, position)
+                position += COUNT_OPERAND.size
+                yield 'draw_path', [Path(coordinates[coordinate:coordinate + 2 * count])]
+                coordinate += 2 * count
+            elif opcode in COORDINATE_OPCODES:
+                yield OP_NAMES[opcode], [coordinates[coordinate], coordinates[coordinate + 1]]
+                coordinate += 2
+            elif opcode in OP_NAMES:
+                yield OP_NAMES[opcode], []
+            elif opcode == OP_DELAY:
+                (delay,) = DELAY_OPERAND.unpack_from(operations, position)
+                position += DELAY_OPERAND.size
+                yield 'delay', [delay]
+            elif opcode == OP_OPTION:
+                number, value = OPTION_OPERAND.unpack_from(operations, position)
+                position += OPTION_OPERAND.size
+                name = OPTION_NAMES[number]
+                yield name, cast_api_params(API_OPTION_CASTS, name, strings[value].split())
+            elif opcode == OP_DEFINED:
+                (name,) = STRING_OPERAND.unpack_from(operations, position)
+                position += STRING_OPERAND.size
+                yield strings[name], []
+            elif opcode == OP_TEXT:
+                (line,) = STRING_OPERAND.unpack_from(operations, position)
+                position += STRING_OPERAND.size
+                yield parse_command(strings[line])
+            else:
+                raise ValueError(f"Unknown opcode {opcode} at offset {position - 1}")
+
+    def close(self):
+        """Unmap the plot, deferred to garbage collection while Paths into it are still referenced."""
+        self.operations.release()
+        self.coordinates.release()
+        try:
+            self.map.close()
+        except BufferError:
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a text plot file to the binary plot format")
+    parser.add_argument('input', help="plot file in the text format")
+    parser.add_argument('output', help="file to write the binary plot to")
+    args = parser.parse_args()
+
+    command_count = convert_plot(args.input, args.output)
+    logging.info(f"Converted {command_count} commands to {args.output}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
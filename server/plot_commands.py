@@ -0,0 +1,232 @@
+import logging
+import re
+
+from path_parser import parse_path
+
+API_OPTION_CASTS = {
+    'handling': [int],
+    'speed_pendown': [int],
+    'speed_penup': [int],
+    'accel': [int],
+    'pen_pos_down': [int],
+    'pen_pos_up': [int],
+    'pen_rate_lower': [int],
+    'pen_rate_raise': [int],
+    'model': [int],
+    'penlift': [int],
+    'homing': [bool],
+    'port': [lambda x: x],
+    'port_config': [int],
+    'units': [int],
+}
+
+API_FUNC_CASTS = {
+    'load_config': [lambda x: x],
+    'update': [],
+    'goto': [float, float],
+    'moveto': [float, float],
+    'lineto': [float, float],
+    'go': [float, float],
+    'move': [float, float],
+    'line': [float, float],
+    'penup': [],
+    'pendown': [],
+    'draw_path': [parse_path],
+    'delay': [int],
+    'block': [],
+    'usb_command': [lambda x: x],
+    'usb_query': [lambda x: x],
+}
+
+STATEMENT_SEPARATOR = "|"
+COMMENT_PREFIX = "#"
+
+OPTIONS_SECTION, DEFINITIONS_SECTION, COMMANDS_SECTION = range(3)
+
+SECTION_MARKERS = {
+    "::END_OPTIONS::": DEFINITIONS_SECTION,
+    "::END_DEFINITIONS::": COMMANDS_SECTION,
+}
+
+
+def cast_api_params(conversions, func_name, params):
+    casts = conversions.get(func_name)
+    if casts:
+        return [cast(param) for cast, param in zip(casts, params)]
+    return params
+
+
+def statement_casts(name):
+    """Return the casts table for a statement, options and API functions are cast differently."""
+    return API_OPTION_CASTS if name in API_OPTION_CASTS else API_FUNC_CASTS
+
+
+def breakdown_into_statements(body):
+    """Break down a sequence of tokens into named statements with parameters.
+
+    Args:
+        body (list): List of tokens to process
+
+    Returns:
+        list: List of tuples (name, params) representing statements
+    """
+    statements = []
+    name, params = None, []
+
+    for statement in body:
+        if name is None:
+            name = statement
+        elif statement == STATEMENT_SEPARATOR:
+            statements.append((name, cast_api_params(statement_casts(name), name, params)))
+            name, params = None, []
+        else:
+            params.append(statement)
+    if name is not None:
+        statements.append((name, cast_api_params(statement_casts(name), name, params)))
+    return statements
+
+
+def extract_options(raw_options):
+    """Extract raw string options into a name/params dictionary, forcing millimeter units.
+
+    Args:
+        raw_options (list): List of options as strings
+
+    Returns:
+        dict: Dictionary mapping option names to their cast parameters
+    """
+    options = {}
+    for line in raw_options:
+        name, params = split_command(line)
+        if name in API_OPTION_CASTS:
+            options[name] = cast_api_params(API_OPTION_CASTS, name, params)
+        else:
+            logging.warning('Attempt to set invalid option %s with value(s) %s' % (name, params))
+    # force millimeter units
+    options['units'] = [2]
+    return options
+
+
+def extract_definitions(raw_definitions):
+    """Extract raw string definitions into name/body dictionary.
+
+    Args:
+        raw_definitions (list): List of definitions as strings
+
+    Returns:
+        dict: Dictionary mapping definition names to their command sequences
+    """
+    definitions = {}
+    split_definitions = [re.split(r'\s+', line.strip()) for line in raw_definitions]
+    for definition in split_definitions:
+        name = definition[0]
+        body = definition[1:]
+        definitions[name] = breakdown_into_statements(body)
+    return definitions
+
+
+def split_command(command_line):
+    """Split a command line into its name and parameter tokens.
+
+    Args:
+        command_line (str): Command line as it appears in a plot file
+
+    Returns:
+        tuple: (name, params) where params is a list of strings
+    """
+    parts = re.split(r'\s+', command_line.strip())
+    if parts[0] == 'draw_path' and len(parts) > 2:
+        # vertex lists may contain whitespace
+        return parts[0], [command_line.strip()[len(parts[0]):].strip()]
+    return parts[0], parts[1:]
+
+
+def iter_plot_file(lines):
+    """Yield the non-blank lines of a plot file with the section each belongs to.
+
+    Sections are terminated by ::END_OPTIONS:: and ::END_DEFINITIONS:: markers in the
+    same way the Plot Director Client reads plot files.
+
+    Args:
+        lines (iterable): Lines of the plot file
+
+    Yields:
+        tuple: (section, line) where section is one of the *_SECTION constants and line is stripped
+    """
+    section = OPTIONS_SECTION
+    for line in lines:
+        trimmed = line.strip()
+        if not trimmed:
+            continue
+        if trimmed.startswith("::END_"):
+            section = SECTION_MARKERS.get(trimmed, section)
+        else:
+            yield section, trimmed
+
+
+def parse_plot_file(lines):
+    """Split the lines of a plot file into its options, definitions and commands sections.
+
+    Args:
+        lines (iterable): Lines of the plot file
+
+    Returns:
+        tuple: (options, definitions, commands) lists of stripped lines
+    """
+    sections = ([], [], [])
+    for section, line in iter_plot_file(lines):
+        sections[section].append(line)
+    return sections
+
+
+def write_plot_file(plot_file, options, definitions, commands):
+    """Write options, definitions and commands to a file in the plot file format.
+
+    Args:
+        plot_file: Writable text file
+        options (list[str]): Option lines
+        definitions (list[str]): Definition lines
+        commands (iterable): Command lines
+    """
+    for line in options:
+        plot_file.write(f"{line}\n")
+    plot_file.write("::END_OPTIONS::\n")
+    for line in definitions:
+        plot_file.write(f"{line}\n")
+    plot_file.write("::END_DEFINITIONS::\n")
+    for line in commands:
+        plot_file.write(f"{line}\n")
+
+
+def parse_command(command_line):
+    """Parse a command line into its name and parameters cast for the option or API function it names.
+
+    Args:
+        command_line (str): Command line as it appears in a plot file
+
+    Returns:
+        tuple: (name, params) with params cast, or left as strings for other commands
+    """
+    name, params = split_command(command_line)
+    return name, cast_api_params(statement_casts(name), name, params)
+
+
+def parse_commands(commands):
+    """Parse command lines with parse_command, naming the failing command in any error.
+
+    Args:
+        commands (iterable): Command lines
+
+    Returns:
+        list: (name, params) statements
+
+    Raises:
+        ValueError: If a command's parameters cannot be cast
+    """
+    statements = []
+    for number, command_line in enumerate(commands, start=1):
+        try:
+            statements.append(parse_command(command_line))
+        except ValueError as e:
+            raise ValueError(f"command {number} '{command_line[:40]}': {str(e)}")
+    return statements
@@ -0,0 +1,583 @@
+import argparse
+import logging
+import math
+import re
+import tempfile
+import xml.etree.ElementTree as ElementTree
+from collections import deque
+
+import numpy as np
+
+from job import LAYER_PREFIX
+from optimize import format_coordinates
+from plot_binary import BinaryPlot, write_binary_plot
+from plot_commands import write_plot_file
+
+SVG_SUFFIX = '.svg'
+# Maximum distance in mm of flattened curves from the curves they replace
+DEFAULT_TOLERANCE = 0.05
+# Millimetres per SVG length unit, user units and unitless lengths being CSS pixels
+UNIT_MM = {'': 25.4 / 96, 'px': 25.4 / 96, 'mm': 1.0, 'cm': 10.0, 'in': 25.4, 'pt': 25.4 / 72, 'pc': 25.4 / 6,
+           'q': 0.25}
+# Decimal places of the mm coordinates written to draw_path commands
+COORDINATE_DECIMALS = 4
+# Vertices and curve control points collected before a batch of shapes is converted
+BATCH_POINTS = 65536
+
+# Elements whose content is not drawn where it appears
+HIDDEN_ELEMENTS = {'defs', 'clipPath', 'mask', 'symbol', 'marker', 'pattern', 'metadata', 'title', 'desc', 'style',
+                   'script', 'linearGradient', 'radialGradient', 'filter'}
+# Elements drawn by the plotter as the outlines of their shapes
+SHAPE_ELEMENTS = {'path', 'line', 'polyline', 'polygon', 'rect', 'circle', 'ellipse'}
+# Elements the converter cannot draw, reported once per file
+UNSUPPORTED_ELEMENTS = {'text', 'use', 'image', 'foreignObject'}
+INKSCAPE_LABEL = '{http://www.inkscape.org/namespaces/inkscape}label'
+INKSCAPE_GROUPMODE = '{http://www.inkscape.org/namespaces/inkscape}groupmode'
+
+NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+NUMBER_PATTERN = re.compile(NUMBER)
+LENGTH_PATTERN = re.compile(rf'\s*({NUMBER})\s*([a-zA-Z%]*)\s*$')
+PATH_TOKEN_PATTERN = re.compile(rf'[MmZzLlHhVvCcSsQqTtAa]|{NUMBER}')
+TRANSFORM_PATTERN = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+DISPLAY_NONE_PATTERN = re.compile(r'(?:^|;)\s*display\s*:\s*none')
+
+
+def is_svg_plot(path):
+    return path.lower().endswith(SVG_SUFFIX)
+
+
+def local_name(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_numbers(text):
+    return [float(value) for value in NUMBER_PATTERN.findall(text or '')]
+
+
+def parse_length(text, default=0.0):
+    """Return an SVG length in user units, or default if it is missing or a percentage."""
+    match = LENGTH_PATTERN.match(text or '')
+    if match is None or match.group(2) == '%' or match.group(2).lower() not in UNIT_MM:
+        return default
+    return float(match.group(1)) * UNIT_MM[match.group(2).lower()] / UNIT_MM['px']
+
+
+def affine(a, b, c, d, e, f):
+    return np.array([[a, c, e], [b, d, f], [0.0, 0.0, 1.0]])
+
+
+def parse_transform(text):
+    """Return the 3x3 affine matrix of an SVG transform attribute."""
+    matrix = np.identity(3)
+    for name, arguments in TRANSFORM_PATTERN.findall(text or ''):
+        values = parse_numbers(arguments)
+        if name == 'matrix' and len(values) == 6:
+            step = affine(*values)
+        elif name == 'translate' and values:
+            step = affine(1, 0, 0, 1, values[0], values[1] if len(values) > 1 else 0.0)
+        elif name == 'scale' and values:
+            step = affine(values[0], 0, 0, values[1] if len(values) > 1 else values[0], 0, 0)
+        elif name == 'rotate' and values:
+            angle = math.radians(values[0])
+            cos, sin = math.cos(angle), math.sin(angle)
+            cx, cy = (values[1], values[2]) if len(values) == 3 else (0.0, 0.0)
+            step = affine(cos, sin, -sin, cos, cx - cos * cx + sin * cy, cy - sin * cx - cos * cy)
+        elif name == 'skewX' and values:
+            step = affine(1, 0, math.tan(math.radians(values[0])), 1, 0, 0)
+        elif name == 'skewY' and values:
+            step = affine(1, math.tan(math.radians(values[0])), 0, 1, 0, 0)
+        else:
+            continue
+        matrix = matrix @ step
+    return matrix
+
+
+def root_transform(attrib):
+    """Return the matrix taking the user units of the root svg element to mm on the page."""
+    view_box = parse_numbers(attrib.get('viewBox'))
+    width = parse_length(attrib.get('width'), None)
+    height = parse_length(attrib.get('height'), None)
+    px = UNIT_MM['px']
+    if len(view_box) != 4 or view_box[2] <= 0 or view_box[3] <= 0:
+        return affine(px, 0, 0, px, 0, 0)
+    x, y, view_width, view_height = view_box
+    width = width if width is not None else (height * view_width / view_height if height is not None else view_width)
+    height = height if height is not None else width * view_height / view_width
+    # preserveAspectRatio xMidYMid meet, the default
+    scale = min(width / view_width, height / view_height)
+    offset_x = (width - view_width * scale) / 2 - x * scale
+    offset_y = (height - view_height * scale) / 2 - y * scale
+    return affine(px, 0, 0, px, 0, 0) @ affine(scale, 0, 0, scale, offset_x, offset_y)
+
+
+def flatten_cubics(curves, tolerance):
+    """Flatten cubic Bézier curves into polylines within a chord tolerance, evaluating every curve at once.
+
+    Each curve is split into enough equal parameter steps that a chord is never
+    further than tolerance from the curve, from the bound 3/4 * max|P0 - 2P1 + P2|
+    / n^2 on the distance over the curve's second differences.
+
+    Args:
+        curves (np.ndarray): Control points of the curves, shape (curves, 4, 2)
+        tolerance (float): Maximum distance of a chord from its curve
+
+    Returns:
+        tuple: (points, ends) the points of every curve after its start point, shape (n, 2), and the
+        index in points after the last point of each curve
+    """
+    p0, p1, p2, p3 = curves[:, 0], curves[:, 1], curves[:, 2], curves[:, 3]
+    bend = np.maximum(np.hypot(*(p0 - 2 * p1 + p2).T), np.hypot(*(p1 - 2 * p2 + p3).T))
+    steps = np.maximum(1, np.ceil(np.sqrt(0.75 * bend / tolerance))).astype(np.int64)
+    curve = np.repeat(np.arange(len(curves)), steps)
+    ends = np.cumsum(steps)
+    step = np.arange(ends[-1]) - np.repeat(ends - steps, steps) + 1
+    t = (step / steps[curve])[:, None]
+    mt = 1 - t
+    points = (mt ** 3 * p0[curve] + 3 * mt * mt * t * p1[curve] + 3 * mt * t * t * p2[curve]
+              + t ** 3 * p3[curve])
+    return points, ends
+
+
+def flatten_arc(start, rx, ry, rotation, large_arc, sweep, end, tolerance):
+    """Flatten an SVG elliptical arc into points after its start point within a chord tolerance.
+
+    The arc is converted from endpoint to centre parameterization as in the SVG
+    specification, then split into equal angle steps of at most sqrt(8 tolerance / r)
+    for the larger radius r.
+
+    Returns:
+        list: (x, y) points of the arc after its start point
+    """
+    (x1, y1), (x2, y2) = start, end
+    if x1 == x2 and y1 == y2:
+        return []
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0:
+        return [end]
+    phi = math.radians(rotation)
+    cos, sin = math.cos(phi), math.sin(phi)
+    dx, dy = (x1 - x2) / 2, (y1 - y2) / 2
+    x1p, y1p = cos * dx + sin * dy, -sin * dx + cos * dy
+    # radii too small to reach the end point are scaled up
+    excess = (x1p / rx) ** 2 + (y1p / ry) ** 2
+    if excess > 1:
+        rx, ry = rx * math.sqrt(excess), ry * math.sqrt(excess)
+    numerator = (rx * ry) ** 2 - (rx * y1p) ** 2 - (ry * x1p) ** 2
+    denominator = (rx * y1p) ** 2 + (ry * x1p) ** 2
+    coefficient = math.sqrt(max(0.0, numerator / denominator))
+    if large_arc == sweep:
+        coefficient = -coefficient
+    cxp, cyp = coefficient * rx * y1p / ry, -coefficient * ry * x1p / rx
+    cx, cy = cos * cxp - sin * cyp + (x1 + x2) / 2, sin * cxp + cos * cyp + (y1 + y2) / 2
+    theta = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    delta = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx) - theta
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+    steps = max(1, math.ceil(abs(delta) / math.sqrt(8 * tolerance / max(rx, ry))))
+    points = []
+    for step in range(1, steps):
+        angle = theta + delta * step / steps
+        ex, ey = rx * math.cos(angle), ry * math.sin(angle)
+        points.append((cx + ex * cos - ey * sin, cy + ex * sin + ey * cos))
+    points.append(end)
+    return points
+
+
+def transform_scale(transform):
+    """Return the largest factor by which a 2x3 affine transform stretches lengths, its largest singular value."""
+    a, c, _, b, d, _ = transform
+    sum_squares = a * a + b * b + c * c + d * d
+    determinant = a * d - b * c
+    return math.sqrt((sum_squares + math.sqrt(max(0.0, sum_squares ** 2 - 4 * determinant ** 2))) / 2)
+
+
+class PathTokens:
+    """Tokens of SVG path data, read as commands, numbers and arc flags."""
+
+    def __init__(self, data):
+        self.tokens = deque(PATH_TOKEN_PATTERN.findall(data))
+
+    def __bool__(self):
+        return bool(self.tokens)
+
+    def command(self):
+        """Return the next token if it is a command letter, otherwise None leaving it unread."""
+        if self.tokens and self.tokens[0].isalpha():
+            return self.tokens.popleft()
+        return None
+
+    def has_number(self):
+        return bool(self.tokens) and not self.tokens[0].isalpha()
+
+    def numbers(self, count):
+        return [float(self.tokens.popleft()) for _ in range(count)]
+
+    def flag(self):
+        """Read an arc flag, which may run into the following number without a separator."""
+        token = self.tokens.popleft()
+        if len(token) > 1:
+            self.tokens.appendleft(token[1:])
+        return token[0] == '1'
+
+
+class StrokeBatch:
+    """Shapes collected to be transformed to mm and flattened together.
+
+    Vertices and curves are gathered in the shapes' own coordinates with the
+    transform of each shape, then every vertex and curve control point of the batch
+    is transformed in one step and every curve flattened in one step, so the numpy
+    work per shape does not grow with the number of shapes.
+    """
+
+    def __init__(self, tolerance):
+        """
+        Args:
+            tolerance (float): Maximum distance in mm of flattened curves from the curves they replace
+        """
+        self.tolerance = tolerance
+        self.transforms = []
+        # x, y of the vertices of lines and flattened arcs, and the shape of each
+        self.points = []
+        self.point_shapes = []
+        # P0 to P3 of each cubic curve, and the shape of each
+        self.curves = []
+        self.curve_shapes = []
+        # pieces of each stroke, a vertex index or the bitwise inverse of a curve index
+        self.strokes = []
+        # layer comments and the index of each stroke, in plot order
+        self.items = []
+
+    def __len__(self):
+        return len(self.point_shapes) + 4 * len(self.curve_shapes)
+
+    def add_layer(self, comment):
+        self.items.append(comment)
+
+    def add_shape(self, data, transform):
+        """Add the subpaths of SVG path data drawn through a 2x3 affine transform to mm.
+
+        Raises:
+            ValueError: If the path data is malformed
+        """
+        scale = transform_scale(transform)
+        if scale == 0:
+            return
+        shape = len(self.transforms)
+        self.transforms.append(transform)
+        # arcs are flattened as they are read, in the shape's own units
+        tolerance = self.tolerance / scale
+        tokens = PathTokens(data)
+        stroke = None
+        x = y = start_x = start_y = 0.0
+        control = None  # reflected control point for S and T, with the command that set it
+        command = None
+
+        def vertex(px, py):
+            stroke.append(len(self.point_shapes))
+            self.points.extend((px, py))
+            self.point_shapes.append(shape)
+
+        def curve(*coordinates):
+            stroke.append(~len(self.curve_shapes))
+            self.curves.extend(coordinates)
+            self.curve_shapes.append(shape)
+
+        while tokens:
+            command = tokens.command() or command
+            if command is None:
+                raise ValueError(f"Path data does not start with a command: {data[:40]}")
+            relative = command.islower()
+            name = command.upper()
+            if name == 'Z':
+                if stroke is not None and (x, y) != (start_x, start_y):
+                    vertex(start_x, start_y)
+                x, y = start_x, start_y
+                control = None
+                command = None
+                continue
+            if not tokens.has_number():
+                raise ValueError(f"Path command {command} is missing its parameters")
+            dx, dy = (x, y) if relative else (0.0, 0.0)
+            if name == 'M':
+                x, y = tokens.numbers(2)
+                x, y = x + dx, y + dy
+                start_x, start_y = x, y
+                stroke = self.start_stroke()
+                vertex(x, y)
+                # coordinates following a moveto are linetos
+                command = 'l' if relative else 'L'
+                control = None
+                continue
+            if stroke is None:
+                stroke = self.start_stroke()
+                vertex(x, y)
+            if name == 'L':
+                x, y = tokens.numbers(2)
+                x, y = x + dx, y + dy
+                vertex(x, y)
+                control = None
+            elif name == 'H':
+                x = tokens.numbers(1)[0] + dx
+                vertex(x, y)
+                control = None
+            elif name == 'V':
+                y = tokens.numbers(1)[0] + dy
+                vertex(x, y)
+                control = None
+            elif name == 'C' or name == 'S':
+                if name == 'C':
+                    x1, y1, x2, y2, ex, ey = tokens.numbers(6)
+                    x1, y1 = x1 + dx, y1 + dy
+                else:
+                    x2, y2, ex, ey = tokens.numbers(4)
+                    x1, y1 = (2 * x - control[0], 2 * y - control[1]) if control and control[2] in 'CS' else (x, y)
+                x2, y2, ex, ey = x2 + dx, y2 + dy, ex + dx, ey + dy
+                curve(x, y, x1, y1, x2, y2, ex, ey)
+                control = (x2, y2, name)
+                x, y = ex, ey
+            elif name == 'Q' or name == 'T':
+                if name == 'Q':
+                    qx, qy, ex, ey = tokens.numbers(4)
+                    qx, qy = qx + dx, qy + dy
+                else:
+                    ex, ey = tokens.numbers(2)
+                    qx, qy = (2 * x - control[0], 2 * y - control[1]) if control and control[2] in 'QT' else (x, y)
+                ex, ey = ex + dx, ey + dy
+                # a quadratic curve is the cubic with control points 2/3 of the way to its control point
+                curve(x, y, x + 2 / 3 * (qx - x), y + 2 / 3 * (qy - y), ex + 2 / 3 * (qx - ex),
+                      ey + 2 / 3 * (qy - ey), ex, ey)
+                control = (qx, qy, name)
+                x, y = ex, ey
+            elif name == 'A':
+                rx, ry, rotation = tokens.numbers(3)
+                large_arc, sweep = tokens.flag(), tokens.flag()
+                ex, ey = tokens.numbers(2)
+                ex, ey = ex + dx, ey + dy
+                for px, py in flatten_arc((x, y), rx, ry, rotation, large_arc, sweep, (ex, ey), tolerance):
+                    vertex(px, py)
+                control = None
+                x, y = ex, ey
+            else:
+                raise ValueError(f"Unknown path command {command}")
+
+    def start_stroke(self):
+        stroke = []
+        self.items.append(len(self.strokes))
+        self.strokes.append(stroke)
+        return stroke
+
+    def commands(self):
+        """Transform and flatten the batch, returning its layer comments and draw_path commands in order."""
+        transforms = np.array(self.transforms, dtype=float).reshape(-1, 2, 3)
+        points = np.array(self.points, dtype=float).reshape(-1, 2)
+        point_transforms = transforms[np.array(self.point_shapes, dtype=np.int64)]
+        vertices = [np.einsum('nij,nj->ni', point_transforms[:, :, :2], points) + point_transforms[:, :, 2]]
+        curve_starts = curve_ends = None
+        if self.curves:
+            curves = np.array(self.curves, dtype=float).reshape(-1, 4, 2)
+            curve_transforms = transforms[np.array(self.curve_shapes, dtype=np.int64)]
+            curves = (np.einsum('nij,nkj->nki', curve_transforms[:, :, :2], curves)
+                      + curve_transforms[:, None, :, 2])
+            flattened, ends = flatten_cubics(curves, self.tolerance)
+            vertices.append(flattened)
+            # curve points follow the vertices in the combined array
+            curve_ends = (ends + len(points)).tolist()
+            curve_starts = [len(points)] + curve_ends[:-1]
+        vertices = np.round(np.concatenate(vertices), COORDINATE_DECIMALS)
+
+        order, lengths = [], []
+        for stroke in self.strokes:
+            before = len(order)
+            for piece in stroke:
+                if piece >= 0:
+                    order.append(piece)
+                else:
+                    order.extend(range(curve_starts[~piece], curve_ends[~piece]))
+            lengths.append(len(order) - before)
+        coordinates = vertices[np.array(order, dtype=np.int64)].ravel().tolist() if order else []
+
+        offsets = [0]
+        for length in lengths:
+            offsets.append(offsets[-1] + 2 * length)
+        commands = []
+        for item in self.items:
+            if isinstance(item, str):
+                commands.append(item)
+            elif lengths[item] >= 2:
+                commands.append(format_coordinates(coordinates[offsets[item]:offsets[item + 1]]))
+        return commands
+
+
+def shape_path_data(name, attrib):
+    """Return path data drawing a basic shape element, or None if it draws nothing."""
+    if name == 'path':
+        return attrib.get('d')
+    if name == 'line':
+        x1, y1, x2, y2 = (parse_length(attrib.get(key)) for key in ('x1', 'y1', 'x2', 'y2'))
+        return f"M {x1} {y1} L {x2} {y2}"
+    if name in ('polyline', 'polygon'):
+        values = parse_numbers(attrib.get('points'))
+        if len(values) < 4:
+            return None
+        points = ' '.join(f"{values[i]} {values[i + 1]}" for i in range(0, len(values) - 1, 2))
+        return f"M {points}" + (" Z" if name == 'polygon' else "")
+    if name == 'rect':
+        x, y, width, height = (parse_length(attrib.get(key)) for key in ('x', 'y', 'width', 'height'))
+        if width <= 0 or height <= 0:
+            return None
+        rx, ry = parse_length(attrib.get('rx'), None), parse_length(attrib.get('ry'), None)
+        rx = min(rx if rx is not None else (ry or 0.0), width / 2)
+        ry = min(ry if ry is not None else rx, height / 2)
+        if rx <= 0 or ry <= 0:
+            return f"M {x} {y} H {x + width} V {y + height} H {x} Z"
+        return (f"M {x + rx} {y} H {x + width - rx} A {rx} {ry} 0 0 1 {x + width} {y + ry} "
+                f"V {y + height - ry} A {rx} {ry} 0 0 1 {x + width - rx} {y + height} "
+                f"H {x + rx} A {rx} {ry} 0 0 1 {x} {y + height - ry} V {y + ry} A {rx} {ry} 0 0 1 {x + rx} {y} Z")
+    if name in ('circle', 'ellipse'):
+        cx, cy = parse_length(attrib.get('cx')), parse_length(attrib.get('cy'))
+        if name == 'circle':
+            rx = ry = parse_length(attrib.get('r'))
+        else:
+            rx, ry = parse_length(attrib.get('rx')), parse_length(attrib.get('ry'))
+        if rx <= 0 or ry <= 0:
+            return None
+        return (f"M {cx + rx} {cy} A {rx} {ry} 0 0 1 {cx} {cy + ry} A {rx} {ry} 0 0 1 {cx - rx} {cy} "
+                f"A {rx} {ry} 0 0 1 {cx} {cy - ry} A {rx} {ry} 0 0 1 {cx + rx} {cy} Z")
+    return None
+
+
+def is_hidden(attrib):
+    return attrib.get('display') == 'none' or DISPLAY_NONE_PATTERN.search(attrib.get('style', '')) is not None
+
+
+def iter_svg_commands(source, tolerance=DEFAULT_TOLERANCE):
+    """Yield the plot command lines drawing an SVG file, a draw_path for each subpath of each shape.
+
+    The file is parsed incrementally and each element is discarded once it has
+    been converted, so memory use does not grow with the size of the file. Groups
+    that are Inkscape layers, or that are children of the root svg element, start a
+    layer named by their label or id. Coordinates are in mm.
+
+    Args:
+        source (str or file): SVG file
+        tolerance (float): Maximum distance in mm of flattened curves from the curves they replace
+
+    Yields:
+        str: Layer comments and draw_path commands
+
+    Raises:
+        ValueError: If a shape's path data is malformed
+        xml.etree.ElementTree.ParseError: If the file is not well-formed XML
+    """
+    # (element, 2x3 transform to mm, whether hidden) of each open element
+    stack = []
+    unsupported = set()
+    layers = 0
+    batch = StrokeBatch(tolerance)
+    for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+        name = local_name(element.tag)
+        if event == 'end':
+            stack.pop()
+            element.clear()
+            if stack:
+                stack[-1][0].remove(element)
+            continue
+
+        attrib = element.attrib
+        if not stack:
+            transform, hidden = root_transform(attrib) @ parse_transform(attrib.get('transform')), False
+        else:
+            transform, hidden = stack[-1][1], stack[-1][2]
+            if 'transform' in attrib:
+                transform = transform @ parse_transform(attrib['transform'])
+            hidden = hidden or name in HIDDEN_ELEMENTS or is_hidden(attrib)
+        stack.append((element, transform, hidden))
+        if hidden:
+            continue
+
+        if name == 'g' and (attrib.get(INKSCAPE_GROUPMODE) == 'layer' or len(stack) == 2):
+            layers += 1
+            batch.add_layer(f"{LAYER_PREFIX} {attrib.get(INKSCAPE_LABEL) or attrib.get('id') or layers}")
+        elif name in SHAPE_ELEMENTS:
+            data = shape_path_data(name, attrib)
+            if not data:
+                continue
+            try:
+                batch.add_shape(data, transform[:2].ravel().tolist())
+            except (ValueError, IndexError) as e:
+                raise ValueError(f"{name} {attrib.get('id', '')}: {str(e)}")
+            if len(batch) >= BATCH_POINTS:
+                yield from batch.commands()
+                batch = StrokeBatch(tolerance)
+        elif name in UNSUPPORTED_ELEMENTS and name not in unsupported:
+            unsupported.add(name)
+            logging.warning(f"SVG {name} elements are not converted")
+    yield from batch.commands()
+
+
+def load_svg_plot(svg_path, tolerance=DEFAULT_TOLERANCE):
+    """Convert an SVG file to a binary plot in an anonymous temporary file and map it.
+
+    The commands are encoded as they are converted, so neither they nor the plot are
+    ever held in memory. The temporary file is removed once the plot is closed.
+
+    Args:
+        svg_path (str): SVG file to convert
+        tolerance (float): Maximum distance in mm of flattened curves from the curves they replace
+
+    Returns:
+        BinaryPlot: Layer comments and draw_path commands of the SVG, with no options or definitions
+    """
+    with tempfile.TemporaryFile() as binary_file:
+        write_binary_plot(binary_file, [], [], iter_svg_commands(svg_path, tolerance))
+        binary_file.flush()
+        # the map outlives the file object, and with it the file's contents
+        return BinaryPlot(binary_file)
+
+
+def convert_svg(svg_path, plot_path, tolerance=DEFAULT_TOLERANCE, options=()):
+    """Convert an SVG file to a plot file in the text format, writing commands as they are converted.
+
+    Args:
+        svg_path (str): SVG file to convert
+        plot_path (str): File to write the plot to
+        tolerance (float): Maximum distance in mm of flattened curves from the curves they replace
+        options (iterable): Option lines to write to the plot's options section
+
+    Returns:
+        int: Number of draw_path commands written
+    """
+    strokes = 0
+
+    def counted(commands):
+        nonlocal strokes
+        for command_line in commands:
+            if not command_line.startswith(LAYER_PREFIX):
+                strokes += 1
+            yield command_line
+
+    with open(plot_path, 'w') as plot_file:
+        write_plot_file(plot_file, list(options), [], counted(iter_svg_commands(svg_path, tolerance)))
+    return strokes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert an SVG file to a plot file of draw_path commands")
+    parser.add_argument('input', help="SVG file to convert")
+    parser.add_argument('output', help="file to write the plot to")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"maximum distance in mm of flattened curves from the SVG's curves "
+                             f"(default {DEFAULT_TOLERANCE})")
+    parser.add_argument('--option', action='append', default=[], metavar='OPTION',
+                        help="option line to write to the plot, such as 'model 2', may be repeated")
+    args = parser.parse_args()
+
+    strokes = convert_svg(args.input, args.output, args.tolerance, args.option)
+    logging.info(f"Converted {strokes} strokes to {args.output}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,375 @@
+import functools
+import logging
+import os
+import re
+
+from hardware import HardwareWorker
+from job import PlotJob
+from journal import JOURNAL_SUFFIX, JobJournal
+from peephole import Peephole
+from plot_commands import API_FUNC_CASTS, API_OPTION_CASTS, extract_definitions, extract_options
+from power import DEFAULT_POWER_INTERVAL, PowerMonitor
+from progress import ProgressBroadcaster
+
+# Device id of the plotter used when none is given, the first NextDraw found on USB
+DEFAULT_DEVICE = ""
+# Response to requests for a device that has not been initialized
+NOT_INITIALIZED = "NextDraw is not initialized. Call InitializePlot first."
+# Defined command used to move the pen out of the way while a plot job is paused
+PAUSE_POSITION_COMMAND = "go_home"
+# Shadow option value of an option whose value on the NextDraw is not known
+UNKNOWN_OPTION = object()
+# Metric label of commands that are not options, API functions or definitions, so names sent
+# by clients cannot add time series without bound
+OTHER_COMMAND = "other"
+
+ALIGNMENT_SVG = '<svg width="74mm" height="105mm" viewBox="0 0 74 105" xmlns="http://www.w3.org/2000/svg"><circle style="fill:none;stroke:#000;stroke-width:.2;stroke-dasharray:none" cx="37" cy="40.975" r="24.57"/><path style="fill:none;stroke:#000;stroke-width:.264583px;stroke-linecap:butt;stroke-linejoin:miter;stroke-opacity:1" d="M7.577 40.975h58.846M37 11.551v58.847"/></svg>'
+
+
+def compile_definitions(definitions, plotter):
+    """Compile definitions into flat lists of operations bound to a plotter's NextDraw instance.
+
+    Definitions referencing other definitions are expanded inline so executing a
+    definition is a single pass over callables with no name or option lookups.
+
+    Args:
+        definitions (dict): Definition names mapped to their statements, as returned by extract_definitions
+        plotter (Plotter): Plotter whose connected NextDraw the operations are bound to
+
+    Returns:
+        dict: Dictionary mapping definition names to lists of argument-less callables
+
+    Raises:
+        ValueError: If a definition references itself directly or through other definitions
+    """
+    nd = plotter.nd
+    compiled = {}
+
+    def expand(name, path):
+        if name in compiled:
+            return compiled[name]
+        if name in path:
+            raise ValueError(f"Recursive definition {' -> '.join(path + [name])}")
+        operations = []
+        for cmd_name, cmd_params in definitions[name]:
+            if cmd_name in definitions:
+                operations.extend(expand(cmd_name, path + [name]))
+            elif cmd_name in API_OPTION_CASTS and hasattr(nd.options, cmd_name):
+                operations.append(functools.partial(plotter.set_option, cmd_name, cmd_params))
+            elif hasattr(nd, cmd_name):
+                operations.append(functools.partial(plotter.call, getattr(nd, cmd_name), *cmd_params))
+            else:
+                logging.warning(f"Unknown command {cmd_name} in definition {name} ignored")
+        compiled[name] = operations
+        return operations
+
+    for definition in definitions:
+        expand(definition, [])
+    return compiled
+
+
+def device_for(device_id, options):
+    """Return the device a request is for, its device id or failing that the port option of its plot.
+
+    Args:
+        device_id (str): Device id given in the request, empty if none
+        options (dict): Options of the plot as returned by extract_options
+    """
+    if device_id:
+        return device_id
+    return str(options.get('port', [DEFAULT_DEVICE])[0])
+
+
+def device_directory(device_id):
+    """Return a directory name for a device's files, its id with anything but letters, digits, - and . replaced."""
+    return re.sub(r'[^A-Za-z0-9.-]', '_', device_id)
+
+
+class Plotter:
+    """One NextDraw and its session: connection, options, definitions, plot job and hardware thread.
+
+    A plotter is identified by its device id, the NextDraw `port` option that selects
+    it by USB port or nickname. The default device, with an empty id, is the first
+    NextDraw found. Every NextDraw call for the plotter is made on its own hardware
+    thread, so plotters run in parallel.
+
+    Option changes are not applied as they are made. The plotter keeps a shadow copy
+    of the options set on the NextDraw, drops changes that set an option to the value
+    it already has, and applies a run of changes with a single update() just before
+    the next NextDraw call, saving a round trip to the device for each change.
+    With remove_redundant it also follows the pen state and position to skip
+    commands that would not change them.
+    """
+
+    def __init__(self, device_id, nextdraw_factory, journal_dir, metrics, power_interval=DEFAULT_POWER_INTERVAL,
+                 remove_redundant=False):
+        """
+        Args:
+            device_id (str): NextDraw port option selecting the plotter, empty for the first one found
+            nextdraw_factory (callable): Creates the NextDraw instance, NextDraw or a simulated stand-in
+            journal_dir (str): Directory of the server's plot job journals, empty to disable journaling
+            metrics (Metrics): Registry recording command and hardware latencies
+            power_interval (float): Seconds between background supply voltage readings, 0 to disable
+            remove_redundant (bool): Skip commands that would not change the pen state or position
+        """
+        self.device_id = device_id
+        self.nextdraw_factory = nextdraw_factory
+        self.nd = None
+        self.metrics = metrics
+        labels = {'device': device_id}
+        thread_name = f"nextdraw-{device_id}" if device_id else "nextdraw"
+        # every NextDraw call is made on this worker's thread
+        self.hardware = HardwareWorker(metrics=metrics, name=thread_name, labels=labels)
+        # journals of different plotters are kept apart so each can plot the same plot
+        self.journal_dir = journal_dir
+        if journal_dir and device_id:
+            self.journal_dir = os.path.join(journal_dir, device_directory(device_id))
+        self.base_options = {}
+        self.definitions = {}
+        self.compiled_definitions = {}
+        # option values as last set on the NextDraw, and whether any are waiting for update()
+        self.option_state = {}
+        self.options_pending = False
+        self.remove_redundant = remove_redundant
+        self.peephole = None
+        self.commands_removed = 0
+        self.job = None
+        self.progress = ProgressBroadcaster()
+        self.power = PowerMonitor(
+            self.read_supply, self.hardware.submit, interval=power_interval, metrics=metrics, labels=labels,
+            name=f"power-{thread_name}", command_index=lambda: self.job.index if self.job is not None else 0
+        )
+
+    def initialize_plot(self, options=None, definitions=None, replace=False):
+        """Initialize NextDraw instance with optional configuration parameters and command definitions.
+
+        Args:
+            options (list[str], optional): List of options to set on NextDraw before connecting.
+            definitions (list[str], optional): List of command definitions to process.
+            replace (bool): Replace the options and definitions of an earlier plot even when none are
+                given, as for a plot file, which is drawn with its own options and definitions alone.
+        """
+        if options or replace:
+            self.base_options = extract_options(options or [])
+        if self.device_id:
+            # the plotter always connects to its own device whatever port the plot names
+            self.base_options['port'] = [self.device_id]
+
+        if definitions or replace:
+            # Process command definitions
+            self.definitions = extract_definitions(definitions or [])
+
+        if self.nd is not None:
+            # release the port of the NextDraw being replaced before the new one opens it
+            try:
+                if self.nd.connected: self.nd.disconnect()
+            except Exception as e:
+                logging.warning(f"Failed to disconnect the previous NextDraw: {str(e)}")
+        self.nd = self.nextdraw_factory()
+        self.compiled_definitions = compile_definitions(self.definitions, self)
+        if self.remove_redundant:
+            self.peephole = Peephole(self.definitions)
+        return self.setup_interactive_context()
+
+    def setup_interactive_context(self):
+        self.nd.interactive()
+        for name, value in self.base_options.items():
+            if hasattr(self.nd.options, name):
+                setattr(self.nd.options, name, *value)
+            else:
+                logging.warning(f"Option {name} not found in NextDraw options")
+        # connecting applies the options as they now are
+        self.option_state = {name: getattr(self.nd.options, name)
+                             for name in API_OPTION_CASTS if hasattr(self.nd.options, name)}
+        self.options_pending = False
+        if self.nd.connect():
+            self.nd.penup()
+            self.nd.moveto(0, 0)
+            self.nd.block()
+            if self.peephole is not None:
+                self.peephole.home()
+            return True
+        else:
+            return False
+
+    def read_supply(self):
+        """Read the QC supply voltage reading, None when not connected. Runs on the hardware thread."""
+        if self.nd is None or not self.nd.connected:
+            return None
+        return int(self.nd.usb_query("QC\r").split(",")[1])
+
+    def load_job(self, statements, identity):
+        """Replace the plot job with one for the statements of an initialized plot.
+
+        The job's journal is named after the plot's identity, so reloading a plot that
+        was interrupted finds its progress.
+        """
+        if self.job is not None and self.job.journal is not None:
+            self.job.journal.close()
+        if self.job is not None and hasattr(self.job.statements, 'close'):
+            # unmap a binary plot or stop preparing the layers of a text plot
+            self.job.statements.close()
+        journal = None
+        if self.journal_dir:
+            journal = JobJournal(os.path.join(self.journal_dir, identity + JOURNAL_SUFFIX))
+        self.job = PlotJob(statements, self.execute_statement, self.move_to_pause_position, self.hardware.submit,
+                           journal=journal, definitions=self.definitions, progress=self.progress)
+        return self.job
+
+    # The methods below drive the NextDraw and run on the hardware thread
+
+    def disconnect(self):
+        if self.nd.connected: self.nd.disconnect()
+        self.nd = None
+
+    def forget_state(self):
+        """Forget the shadow option state and the pen state once the NextDraw is driven outside them."""
+        self.option_state = {}
+        self.options_pending = False
+        if self.peephole is not None:
+            self.peephole.forget()
+
+    def plot_alignment_svg(self):
+        self.forget_state()
+        # Configure and plot the alignment SVG
+        self.nd.plot_setup(ALIGNMENT_SVG)
+
+        for option in self.base_options:
+            if option not in ["units"]:
+                setattr(self.nd.options, option, *self.base_options[option])
+        self.nd.plot_run()
+
+    def walk_home(self, axis, distance):
+        # Prepare utility command based on axis
+        utility_cmd = f"walk_mm{axis}"
+        self.forget_state()
+
+        # Set up and execute the walk command
+        self.nd.options.mode = "utility"
+        self.nd.options.utility_cmd = utility_cmd
+        self.nd.options.dist = distance
+        self.nd.plot_run()
+
+    def reset_home_position(self):
+        self.forget_state()
+        self.nd.options.mode = "plot"
+        self.nd.plot_setup()
+        if 'model' in self.base_options:
+            self.nd.options.model = self.base_options['model'][0]
+        if 'port' in self.base_options:
+            self.nd.options.port = self.base_options['port'][0]
+        self.nd.plot_run()
+
+    def end_interactive_context(self):
+        self.apply_options()
+        self.forget_state()
+        self.nd.penup()
+        self.nd.moveto(0, 0)
+        self.nd.block()
+        self.nd.disconnect()
+        # begin plot context
+        self.nd.plot_setup()
+
+    def submit(self, command, params, block=True):
+        """Queue execution of a parsed command on the hardware thread.
+
+        Args:
+            block (bool): Wait for room in a full hardware queue, otherwise raise queue.Full
+
+        Returns:
+            Future: Resolves to (success, message) describing the outcome of the command
+        """
+        return self.hardware.submit(self.execute_statement, command, params, block=block)
+
+    def execute_statement(self, command, params):
+        """Execute a parsed command against the NextDraw, recording how long it took by command name."""
+        if self.peephole is not None and self.peephole.redundant(command, params):
+            self.commands_removed += 1
+            self.metrics.set_gauge('commands_removed', self.commands_removed, device=self.device_id)
+            # the skipped command would have applied any pending option changes
+            self.apply_options()
+            return True, f"Command {command} skipped, it would have no effect"
+        label, kind = self.command_labels(command)
+        with self.metrics.timer('command_seconds', command=label, kind=kind, device=self.device_id):
+            return self.dispatch_statement(command, params)
+
+    def command_labels(self, command):
+        """Return the (command, kind) metric labels of a command name, collapsing unknown names into OTHER_COMMAND."""
+        if command in self.compiled_definitions:
+            return command, 'definition'
+        if command in API_OPTION_CASTS:
+            return command, 'option'
+        if command in API_FUNC_CASTS:
+            return command, 'function'
+        return OTHER_COMMAND, OTHER_COMMAND
+
+    def dispatch_statement(self, command, params):
+        """Execute a parsed command against the NextDraw.
+
+        Args:
+            command (str): Option, API function or defined command name
+            params (list): Parameters already cast by parse_command
+
+        Returns:
+            tuple: (success, message) describing the outcome of the command
+        """
+        # Check if this is a defined command
+        operations = self.compiled_definitions.get(command)
+        if operations is not None:
+            # Execute all commands in the definition
+            for operation in operations:
+                operation()
+            return True, f"Defined command {command} executed successfully"
+
+        # Process command based on its type
+        if command in API_OPTION_CASTS and hasattr(self.nd.options, command):
+            # Handle option setting, applied before the next function call
+            if self.set_option(command, params):
+                return True, f"Option {command} set successfully"
+            return True, f"Option {command} already set"
+        elif hasattr(self.nd, command):
+            # Handle function calls
+            if command in API_FUNC_CASTS:
+                self.call(getattr(self.nd, command), *params)
+                return True, f"Command {command} executed successfully"
+            else:
+                return False, f"Unknown command type: {command}"
+        else:
+            return False, f"Unknown command: {command}"
+
+    def set_option(self, name, params):
+        """Set a NextDraw option, leaving it to be applied by the next function call.
+
+        Returns:
+            bool: False if the option already had the value and nothing was set
+        """
+        value = params[0]
+        if self.option_state.get(name, UNKNOWN_OPTION) == value:
+            return False
+        setattr(self.nd.options, name, value)
+        self.option_state[name] = value
+        self.options_pending = True
+        return True
+
+    def apply_options(self):
+        """Apply the options set since the last update() with a single update()."""
+        if self.options_pending:
+            self.nd.update()
+            self.options_pending = False
+
+    def call(self, function, *params):
+        """Call a NextDraw function once pending option changes have been applied."""
+        if self.options_pending:
+            self.apply_options()
+        return function(*params)
+
+    def move_to_pause_position(self):
+        """Move the pen home while a plot is paused, using the plot's go_home definition if it has one."""
+        if PAUSE_POSITION_COMMAND in self.compiled_definitions:
+            self.execute_statement(PAUSE_POSITION_COMMAND, [])
+        else:
+            self.apply_options()
+            self.nd.penup()
+            self.nd.moveto(0, 0)
+            if self.peephole is not None:
+                self.peephole.home()
@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+
+# QC supply readings above this mean the NextDraw's motor supply is on
+POWER_THRESHOLD = 276
+# Seconds between supply readings
+DEFAULT_POWER_INTERVAL = 5.0
+# Supply readings kept for GetPowerHistory, a day at the default interval
+POWER_HISTORY = 17280
+
+# A supply reading, with the plot job command index it was taken at to match brown-outs to strokes
+PowerSample = namedtuple('PowerSample', ['timestamp', 'reading', 'has_power', 'command_index'])
+
+
+class PowerMonitor:
+    """Samples the NextDraw's supply voltage in the background and keeps a history of the readings.
+
+    Readings are queued on the hardware thread like any other NextDraw call, so
+    while plotting they are taken between queued commands rather than competing
+    with them on the USB link. A reading is only queued once the previous one
+    has been taken.
+    """
+
+    def __init__(self, read_supply, submit, interval=DEFAULT_POWER_INTERVAL, history=POWER_HISTORY,
+                 command_index=None, metrics=None, labels=None, name="power-monitor"):
+        """
+        Args:
+            read_supply (callable): Returns the QC supply reading, or None when not connected.
+                Called on the hardware thread.
+            submit (callable): Queues a call on the hardware thread, returning a Future of its result
+            interval (float): Seconds between readings, 0 to only read when asked
+            history (int): Readings kept
+            command_index (callable, optional): Returns the command index of the plot job
+            metrics (Metrics, optional): Registry to record the latest reading in
+            labels (dict, optional): Labels of the recorded reading, such as the device it is for
+            name (str): Name of the sampling thread
+        """
+        self.read_supply = read_supply
+        self.submit = submit
+        self.interval = interval
+        self.command_index = command_index or (lambda: 0)
+        self.metrics = metrics
+        self.labels = labels or {}
+        self.samples = deque(maxlen=history)
+        self.lock = threading.Lock()
+        self.pending = None
+        self.thread = None
+        if interval > 0:
+            self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            if self.pending is not None and not self.pending.done():
+                continue
+            self.pending = self.submit(self.sample)
+            self.pending.add_done_callback(self.log_failure)
+
+    def log_failure(self, future):
+        if not future.cancelled() and future.exception() is not None:
+            logging.warning(f"Failed to read supply voltage: {str(future.exception())}")
+
+    def sample(self):
+        """Take a reading, must be called on the hardware thread.
+
+        Returns:
+            PowerSample: The reading, or None when the NextDraw is not connected
+        """
+        reading = self.read_supply()
+        if reading is None:
+            return None
+        sample = PowerSample(time.time(), reading, reading > POWER_THRESHOLD, self.command_index())
+        with self.lock:
+            self.samples.append(sample)
+        if self.metrics is not None:
+            self.metrics.set_gauge('supply_reading', reading, **self.labels)
+        return sample
+
+    def latest(self, max_age):
+        """Return the latest reading if it is no more than max_age seconds old, otherwise None."""
+        with self.lock:
+            if not self.samples:
+                return None
+            sample = self.samples[-1]
+        return sample if time.time() - sample.timestamp <= max_age else None
+
+    def history(self, since=0.0):
+        """Return the readings taken after the since timestamp, oldest first."""
+        with self.lock:
+            return [sample for sample in self.samples if sample.timestamp > since]
@@ -0,0 +1,294 @@
+import argparse
+import logging
+import math
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from estimate import trace_plot_file
+from journal import file_identity
+
+# Pixels along each side of a cached tile
+TILE_SIZE = 256
+# Tiles kept in the cache, 64 KiB each
+DEFAULT_CACHE_TILES = 2048
+# Plots whose traced segments are kept in the cache
+DEFAULT_CACHE_PLOTS = 4
+# Largest preview image rendered, in pixels
+MAX_PREVIEW_PIXELS = 64 * 1024 * 1024
+# Line samples rasterised in one vectorized step, bounding the memory a render needs
+SAMPLE_BATCH = 4 * 1024 * 1024
+DEFAULT_RESOLUTION = 4.0  # pixels per mm
+
+# Pixel values of the rendered tiles, indexes into the palette of the PNG
+BACKGROUND = 0
+PEN_UP = 1
+PEN_DOWN = 2
+BACKGROUND_COLOUR = (255, 255, 255)
+PEN_UP_COLOUR = (230, 80, 60)
+PEN_DOWN_COLOUR = (0, 0, 0)
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Bits per pixel of the PNG, enough for the three palette indexes
+PNG_BIT_DEPTH = 2
+# zlib level of the PNG, line art compresses well even at the fastest level
+PNG_COMPRESSION = 1
+
+Preview = namedtuple('Preview', ['png', 'width', 'height', 'tiles_rendered', 'tiles_cached'])
+
+
+class PlotSegments:
+    """Line segments of a plot in mm, as rows of (x0, y0, x1, y1)."""
+
+    def __init__(self, estimator):
+        """
+        Args:
+            estimator (PlotEstimator): Estimator holding the moves of the plot, as returned by trace_plot
+        """
+        self.pen_down = polyline_segments(estimator.polylines)
+        self.pen_up = np.array(estimator.travel, dtype=float).reshape(-1, 4)
+
+    def bounds(self, pen_up):
+        """Return (min_x, min_y, max_x, max_y) of the segments drawn, with the pen-up travel if pen_up, or None."""
+        segments = np.concatenate((self.pen_down, self.pen_up)) if pen_up else self.pen_down
+        if not len(segments):
+            return None
+        points = segments.reshape(-1, 2)
+        (min_x, min_y), (max_x, max_y) = points.min(axis=0), points.max(axis=0)
+        return float(min_x), float(min_y), float(max_x), float(max_y)
+
+
+def polyline_segments(polylines):
+    """Return the segments joining consecutive vertices of each polyline, shape (segments, 4)."""
+    polylines = [polyline for polyline in polylines if len(polyline) >= 2]
+    if not polylines:
+        return np.empty((0, 4))
+    vertices = np.concatenate(polylines)
+    segments = np.hstack((vertices[:-1], vertices[1:]))
+    # the segments from the last vertex of each polyline to the first of the next join nothing
+    joins = np.cumsum([len(polyline) for polyline in polylines])[:-1] - 1
+    return np.delete(segments, joins, axis=0)
+
+
+def clip_segments(segments, width, height):
+    """Clip segments in pixels to the rectangle from (0, 0) to (width, height), dropping those outside it."""
+    x0, y0, x1, y1 = segments.T
+    dx, dy = x1 - x0, y1 - y0
+    start, end = np.zeros(len(segments)), np.ones(len(segments))
+    inside = np.ones(len(segments), dtype=bool)
+    # Liang-Barsky, each edge limits the parameter range of the segment inside it
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for direction, distance in ((-dx, x0), (dx, width - x0), (-dy, y0), (dy, height - y0)):
+            limit = distance / direction
+            start = np.where(direction < 0, np.maximum(start, limit), start)
+            end = np.where(direction > 0, np.minimum(end, limit), end)
+            inside &= (direction != 0) | (distance >= 0)
+    inside &= start <= end
+    start, end = start[inside], end[inside]
+    x0, y0, dx, dy = x0[inside], y0[inside], dx[inside], dy[inside]
+    return np.column_stack((x0 + start * dx, y0 + start * dy, x0 + end * dx, y0 + end * dy))
+
+
+def rasterize(canvas, segments, value):
+    """Set the pixels of a canvas that segments in pixels pass through to value.
+
+    Each segment is sampled once per pixel along its longer axis, and the samples
+    of many segments are computed and written in one step.
+
+    Args:
+        canvas (np.ndarray): Pixels, shape (height, width)
+        segments (np.ndarray): Segments in the canvas's pixel coordinates, shape (segments, 4)
+        value (int): Pixel value to draw
+    """
+    height, width = canvas.shape
+    segments = clip_segments(segments, width, height)
+    if not len(segments):
+        return
+    steps = np.ceil(np.abs(segments[:, 2:] - segments[:, :2]).max(axis=1)).astype(np.int64)
+    samples = steps + 1
+    ends = np.cumsum(samples)
+    x0, y0 = segments[:, 0], segments[:, 1]
+    dx = (segments[:, 2] - x0) / np.maximum(steps, 1)
+    dy = (segments[:, 3] - y0) / np.maximum(steps, 1)
+    pixels = canvas.reshape(-1)
+    first = 0
+    while first < len(segments):
+        # take segments until the batch holds SAMPLE_BATCH samples, at least one segment
+        offset = ends[first - 1] if first else 0
+        last = max(first + 1, int(np.searchsorted(ends, offset + SAMPLE_BATCH, side='right')))
+        batch_samples = samples[first:last]
+        segment = np.repeat(np.arange(first, last), batch_samples)
+        step = np.arange(len(segment)) - np.repeat(np.cumsum(batch_samples) - batch_samples, batch_samples)
+        xs = np.floor(x0[segment] + dx[segment] * step).astype(np.int64)
+        ys = np.floor(y0[segment] + dy[segment] * step).astype(np.int64)
+        # a sample on the edge of the canvas may round to the pixel beyond it
+        keep = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        pixels[ys[keep] * width + xs[keep]] = value
+        first = last
+
+
+def png_chunk(tag, data):
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+
+def encode_png(pixels, palette):
+    """Encode palette indexes as a PNG of PNG_BIT_DEPTH bits per pixel.
+
+    Args:
+        pixels (np.ndarray): Palette index of each pixel, shape (height, width)
+        palette (list): (red, green, blue) colour of each palette index
+
+    Returns:
+        bytes: PNG file
+    """
+    height, width = pixels.shape
+    per_byte = 8 // PNG_BIT_DEPTH
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = pixels
+    # each row starts with its filter type, 0 for none, followed by its pixels packed leftmost first
+    rows = np.zeros((height, padded.shape[1] // per_byte + 1), dtype=np.uint8)
+    for index in range(per_byte):
+        rows[:, 1:] |= padded[:, index::per_byte] << (8 - PNG_BIT_DEPTH * (index + 1))
+    header = struct.pack('>IIBBBBB', width, height, PNG_BIT_DEPTH, 3, 0, 0, 0)
+    return (PNG_SIGNATURE + png_chunk(b'IHDR', header)
+            + png_chunk(b'PLTE', bytes(channel for colour in palette for channel in colour))
+            + png_chunk(b'IDAT', zlib.compress(rows.tobytes(), PNG_COMPRESSION))
+            + png_chunk(b'IEND', b''))
+
+
+class PreviewRenderer:
+    """Renders previews of plot files as PNGs, caching rendered tiles by plot file hash and resolution.
+
+    Tiles are aligned to a grid from the origin at each resolution, so previews of
+    different regions of a plot at the same resolution share tiles. A tile holds the
+    pen-down strokes drawn over the pen-up travel, and previews without travel draw
+    travel in the background colour, so both share tiles too. Previews are rendered
+    one at a time.
+    """
+
+    def __init__(self, max_tiles=DEFAULT_CACHE_TILES, max_plots=DEFAULT_CACHE_PLOTS):
+        """
+        Args:
+            max_tiles (int): Tiles to keep, least recently used tiles are dropped first
+            max_plots (int): Plots whose traced segments are kept
+        """
+        self.max_tiles = max_tiles
+        self.max_plots = max_plots
+        self.lock = threading.Lock()
+        # path to (modification time, size, SHA-256), so an unchanged file is not hashed again
+        self.identities = {}
+        self.plots = OrderedDict()
+        self.tiles = OrderedDict()
+
+    def identify(self, path):
+        stat = os.stat(path)
+        known = self.identities.get(path)
+        if known is None or known[:2] != (stat.st_mtime_ns, stat.st_size):
+            known = (stat.st_mtime_ns, stat.st_size, file_identity(path))
+            self.identities[path] = known
+        return known[2]
+
+    def segments(self, identity, path):
+        plot = self.plots.get(identity)
+        if plot is None:
+            plot = PlotSegments(trace_plot_file(path))
+            self.plots[identity] = plot
+            if len(self.plots) > self.max_plots:
+                self.plots.popitem(last=False)
+        self.plots.move_to_end(identity)
+        return plot
+
+    def render(self, path, resolution=DEFAULT_RESOLUTION, pen_up=False, region=None):
+        """Render a preview of a text, binary or SVG plot file.
+
+        Args:
+            path (str): Plot file
+            resolution (float): Pixels per mm
+            pen_up (bool): Draw the pen-up travel as well as the pen-down strokes
+            region (tuple, optional): (min_x, min_y, max_x, max_y) in mm to preview, by default
+                everything drawn
+
+        Returns:
+            Preview: PNG of the region and the number of its tiles rendered and found in the cache
+
+        Raises:
+            ValueError: If the resolution is not positive, the plot draws nothing or the image would be too large
+        """
+        if not resolution > 0:
+            raise ValueError(f"Resolution must be positive, not {resolution}")
+        with self.lock:
+            identity = self.identify(path)
+            plot = self.segments(identity, path)
+            if region is None:
+                region = plot.bounds(pen_up)
+                if region is None:
+                    raise ValueError("Plot draws nothing to preview")
+            min_x, min_y, max_x, max_y = region
+            left, top = math.floor(min_x * resolution), math.floor(min_y * resolution)
+            right, bottom = math.floor(max_x * resolution) + 1, math.floor(max_y * resolution) + 1
+            width, height = right - left, bottom - top
+            if width <= 0 or height <= 0:
+                raise ValueError(f"Preview region {region} is empty")
+            if width * height > MAX_PREVIEW_PIXELS:
+                raise ValueError(f"Preview of {width}x{height} pixels is larger than {MAX_PREVIEW_PIXELS} pixels")
+
+            columns = range(left // TILE_SIZE, (right - 1) // TILE_SIZE + 1)
+            rows = range(top // TILE_SIZE, (bottom - 1) // TILE_SIZE + 1)
+            keys = [(identity, resolution, column, row) for row in rows for column in columns]
+            missing = [key for key in keys if key not in self.tiles]
+            if missing:
+                self.render_tiles(plot, resolution, missing)
+
+            image = np.zeros((height, width), dtype=np.uint8)
+            for key in keys:
+                self.tiles.move_to_end(key)
+                _, _, column, row = key
+                x, y = column * TILE_SIZE - left, row * TILE_SIZE - top
+                tile = self.tiles[key][max(0, -y):height - y, max(0, -x):width - x]
+                image[max(0, y):max(0, y) + tile.shape[0], max(0, x):max(0, x) + tile.shape[1]] = tile
+            while len(self.tiles) > self.max_tiles:
+                self.tiles.popitem(last=False)
+
+        palette = [BACKGROUND_COLOUR, PEN_UP_COLOUR if pen_up else BACKGROUND_COLOUR, PEN_DOWN_COLOUR]
+        return Preview(encode_png(image, palette), width, height, len(missing), len(keys) - len(missing))
+
+    def render_tiles(self, plot, resolution, keys):
+        """Rasterise the tiles of a plot at a resolution into the cache, drawing the span of the tiles at once."""
+        columns = [column for _, _, column, _ in keys]
+        rows = [row for _, _, _, row in keys]
+        left, top = min(columns) * TILE_SIZE, min(rows) * TILE_SIZE
+        canvas = np.zeros(((max(rows) + 1) * TILE_SIZE - top, (max(columns) + 1) * TILE_SIZE - left),
+                          dtype=np.uint8)
+        offset = np.array([left, top, left, top])
+        # pen-down strokes are drawn last so they show over the travel
+        rasterize(canvas, plot.pen_up * resolution - offset, PEN_UP)
+        rasterize(canvas, plot.pen_down * resolution - offset, PEN_DOWN)
+        for key in keys:
+            _, _, column, row = key
+            x, y = column * TILE_SIZE - left, row * TILE_SIZE - top
+            self.tiles[key] = canvas[y:y + TILE_SIZE, x:x + TILE_SIZE].copy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a preview of a plot file as a PNG")
+    parser.add_argument('input', help="text, binary or SVG plot file")
+    parser.add_argument('output', help="PNG file to write")
+    parser.add_argument('--resolution', type=float, default=DEFAULT_RESOLUTION,
+                        help=f"pixels per mm (default {DEFAULT_RESOLUTION})")
+    parser.add_argument('--pen-up', action='store_true', help="draw the pen-up travel as well as the strokes")
+    parser.add_argument('--region', type=float, nargs=4, metavar=('MIN_X', 'MIN_Y', 'MAX_X', 'MAX_Y'),
+                        help="region in mm to preview (default everything drawn)")
+    args = parser.parse_args()
+
+    preview = PreviewRenderer().render(args.input, args.resolution, args.pen_up, args.region)
+    with open(args.output, 'wb') as png_file:
+        png_file.write(preview.png)
+    logging.info(f"Rendered a {preview.width}x{preview.height} preview to {args.output}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
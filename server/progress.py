@@ -0,0 +1,84 @@
+import threading
+from collections import deque, namedtuple
+
+# State changes kept for a subscriber that has not caught up, older ones are dropped
+STATE_CHANGE_BACKLOG = 16
+
+# Progress of the plot job, state is one of the job state names or NO_JOB
+ProgressEvent = namedtuple('ProgressEvent', [
+    'state', 'command_index', 'command_total', 'layer', 'pen_down_distance', 'eta_seconds', 'message'
+])
+NO_JOB_EVENT = ProgressEvent('NO_JOB', 0, 0, "", 0.0, 0.0, "")
+
+
+class Subscription:
+    """Events waiting for one subscriber.
+
+    Progress updates are coalesced so a slow subscriber only sees the latest one.
+    State changes queue up to STATE_CHANGE_BACKLOG so pauses and the end of a job
+    are not missed.
+    """
+
+    def __init__(self, wake=None):
+        """
+        Args:
+            wake (callable, optional): Called after each event is offered, for subscribers
+                that wait for events other than by blocking in get
+        """
+        self.condition = threading.Condition()
+        self.state_changes = deque(maxlen=STATE_CHANGE_BACKLOG)
+        self.latest = None
+        self.wake = wake
+
+    def offer(self, event, state_change):
+        with self.condition:
+            if state_change:
+                self.state_changes.append(event)
+                self.latest = None
+            else:
+                self.latest = event
+            self.condition.notify()
+        if self.wake is not None:
+            self.wake()
+
+    def get(self, timeout=None):
+        """Return the next event, or None if there was none within timeout seconds."""
+        with self.condition:
+            if not self.state_changes and self.latest is None:
+                self.condition.wait(timeout)
+            if self.state_changes:
+                return self.state_changes.popleft()
+            event, self.latest = self.latest, None
+            return event
+
+
+class ProgressBroadcaster:
+    """Fans progress events out to any number of subscribers without waiting on any of them."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+        self.latest = NO_JOB_EVENT
+
+    def subscribe(self, wake=None):
+        """Subscribe to events, starting with the latest one.
+
+        Args:
+            wake (callable, optional): Called whenever an event is offered to the subscription
+        """
+        subscription = Subscription(wake)
+        with self.lock:
+            self.subscriptions.add(subscription)
+            subscription.offer(self.latest, state_change=True)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, event, state_change=False):
+        # offering only takes each subscription's lock briefly, it never waits for the subscriber
+        with self.lock:
+            self.latest = event
+            for subscription in self.subscriptions:
+                subscription.offer(event, state_change)
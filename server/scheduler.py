@@ -0,0 +1,271 @@
+import logging
+import os
+import threading
+import time
+from bisect import insort
+from collections import deque
+
+from job import JOB_CANCELLED, JOB_FAILED, JOB_FINISHED
+from plot_binary import BinaryPlot, is_binary_plot
+from plot_commands import OPTIONS_SECTION, extract_options, iter_plot_file
+from plot_svg import is_svg_plot
+
+SCHEDULED_QUEUED = 'SCHEDULED_QUEUED'
+SCHEDULED_RUNNING = 'SCHEDULED_RUNNING'
+SCHEDULED_FINISHED = 'SCHEDULED_FINISHED'
+SCHEDULED_CANCELLED = 'SCHEDULED_CANCELLED'
+SCHEDULED_FAILED = 'SCHEDULED_FAILED'
+
+# Scheduled job state of a plot job that has ended in each state
+OUTCOMES = {JOB_FINISHED: SCHEDULED_FINISHED, JOB_CANCELLED: SCHEDULED_CANCELLED, JOB_FAILED: SCHEDULED_FAILED}
+# Ended jobs kept for reporting
+SCHEDULE_HISTORY = 256
+
+
+def read_plot_options(path):
+    """Read the options section of a text or binary plot file without reading the rest of the plot."""
+    if is_svg_plot(path):
+        return []
+    if is_binary_plot(path):
+        plot = BinaryPlot(path)
+        try:
+            return plot.options
+        finally:
+            plot.close()
+    options = []
+    with open(path) as plot_file:
+        for section, line in iter_plot_file(plot_file):
+            if section != OPTIONS_SECTION:
+                break
+            options.append(line)
+    return options
+
+
+class ScheduledJob:
+    """A plot file submitted to the farm's queue, and what became of it."""
+
+    def __init__(self, job_id, path, priority, model, pen_colour, name):
+        self.job_id = job_id
+        self.path = path
+        self.priority = priority
+        self.model = model
+        self.pen_colour = pen_colour
+        self.name = name
+        self.state = SCHEDULED_QUEUED
+        self.message = ""
+        self.device_id = None
+        self.plot_job = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+
+class FarmDevice:
+    """A plotter enrolled in the farm, with its throughput since enrollment."""
+
+    def __init__(self, device_id, model, pen_colour):
+        self.device_id = device_id
+        self.model = model
+        self.pen_colour = pen_colour
+        self.enrolled = time.time()
+        self.job = None
+        self.suspended = ""
+        self.jobs_finished = 0
+        self.jobs_failed = 0
+        self.jobs_cancelled = 0
+        self.commands_plotted = 0
+        self.busy_seconds = 0.0
+        self.plotting_seconds = 0.0
+
+    def accepts(self, job):
+        """Whether the job's model and pen colour constraints allow it to be plotted on this device."""
+        if job.model and job.model != self.model:
+            return False
+        return not job.pen_colour or not self.pen_colour or job.pen_colour == self.pen_colour
+
+    def utilisation(self, now):
+        """Return (busy seconds, plotting seconds, enrolled seconds) counting the job being plotted."""
+        busy, plotting = self.busy_seconds, self.plotting_seconds
+        if self.job is not None and self.job.started is not None:
+            busy += now - self.job.started
+            if self.job.plot_job is not None:
+                plotting += self.job.plot_job.elapsed()
+        return busy, plotting, max(now - self.enrolled, 1e-9)
+
+
+class JobScheduler:
+    """Queues plot files and dispatches each to the next free plotter in the farm that can plot it.
+
+    Jobs are taken highest priority first, in submission order within a priority.
+    A job with a model constraint only goes to devices enrolled with that model. A
+    job with a pen colour only goes to devices holding that pen, or with no pen
+    colour yet, which then keep the job's colour so a device never needs a pen swap.
+    Devices already holding the colour are preferred. Re-enroll a device to change
+    its pen.
+
+    A device is free when it is enrolled, initialized and has no active plot job.
+    Each dispatched job is loaded and plotted through the PlotService like a plot
+    loaded by LoadPlotFile, so it can be paused, resumed and watched as usual.
+    A device whose plot fails to load is suspended until it is enrolled again.
+    """
+
+    def __init__(self, service, metrics=None, history=SCHEDULE_HISTORY):
+        """
+        Args:
+            service (PlotService): Service whose plotters jobs are plotted on
+            metrics (Metrics, optional): Registry to record the queue length in
+            history (int): Ended jobs kept for reporting
+        """
+        self.service = service
+        self.metrics = metrics
+        self.condition = threading.Condition()
+        self.devices = {}
+        # (-priority, job_id, job) so the highest priority, earliest submitted job sorts first
+        self.queue = []
+        self.running = {}
+        self.ended = deque(maxlen=history)
+        self.next_id = 1
+        self.thread = threading.Thread(target=self.run, name="scheduler", daemon=True)
+        self.thread.start()
+
+    def enroll(self, device_id, model, pen_colour):
+        """Enroll a device in the farm, or update its model and pen colour and lift any suspension."""
+        with self.condition:
+            device = self.devices.get(device_id)
+            if device is None:
+                device = self.devices[device_id] = FarmDevice(device_id, model, pen_colour)
+            device.model, device.pen_colour, device.suspended = model, pen_colour, ""
+            self.condition.notify()
+        return device
+
+    def withdraw(self, device_id):
+        """Stop scheduling jobs on a device, a job it is plotting carries on."""
+        with self.condition:
+            if self.devices.pop(device_id, None) is None:
+                raise ValueError(f"Device {device_id or '(default)'} is not enrolled")
+
+    def submit(self, path, priority=0, model=0, pen_colour="", name=""):
+        """Queue a plot file on the server, taking the model constraint from the plot's options if not given.
+
+        Returns:
+            ScheduledJob: The queued job
+        """
+        options = read_plot_options(path)
+        if not model:
+            model = extract_options(options).get('model', [0])[0]
+        with self.condition:
+            job = ScheduledJob(self.next_id, path, priority, model, pen_colour, name or os.path.basename(path))
+            self.next_id += 1
+            insort(self.queue, (-priority, job.job_id, job))
+            self.record_queue_length()
+            self.condition.notify()
+        return job
+
+    def cancel(self, job_id):
+        """Remove a queued job, or cancel a running one's plot job."""
+        with self.condition:
+            for entry in self.queue:
+                if entry[2].job_id == job_id:
+                    self.queue.remove(entry)
+                    self.record_queue_length()
+                    self.end(entry[2], SCHEDULED_CANCELLED, "Cancelled before it was dispatched")
+                    return
+            job = self.running.get(job_id)
+        if job is None:
+            raise ValueError(f"Job {job_id} is not queued or running")
+        if job.plot_job is None:
+            raise RuntimeError(f"Job {job_id} is being loaded, cancel it once it has started")
+        job.plot_job.cancel()
+
+    def jobs(self):
+        """Return the queued, running and recently ended jobs."""
+        with self.condition:
+            return [entry[2] for entry in self.queue] + list(self.running.values()) + list(self.ended)
+
+    def device_list(self):
+        with self.condition:
+            return sorted(self.devices.values(), key=lambda device: device.device_id)
+
+    def record_queue_length(self):
+        if self.metrics is not None:
+            self.metrics.set_gauge('scheduler_queued_jobs', len(self.queue))
+
+    def end(self, job, state, message):
+        job.state, job.message, job.finished = state, message, time.time()
+        self.ended.append(job)
+
+    def run(self):
+        with self.condition:
+            while True:
+                self.dispatch()
+                # devices also become free outside the scheduler, by jobs loaded directly ending
+                self.condition.wait(timeout=1.0)
+
+    def free_devices(self):
+        free = []
+        for device in self.devices.values():
+            if device.job is not None or device.suspended:
+                continue
+            plotter = self.service.initialized_plotter(device.device_id)
+            if plotter is not None and (plotter.job is None or not plotter.job.active):
+                free.append(device)
+        return free
+
+    def dispatch(self):
+        """Assign queued jobs to free devices, called with the condition held."""
+        free = self.free_devices()
+        for entry in list(self.queue):
+            if not free:
+                break
+            job = entry[2]
+            candidates = [device for device in free if device.accepts(job)]
+            if not candidates:
+                continue
+            device = min(candidates, key=lambda d: (d.pen_colour != job.pen_colour, d.device_id))
+            free.remove(device)
+            self.queue.remove(entry)
+            if job.pen_colour and not device.pen_colour:
+                device.pen_colour = job.pen_colour
+            device.job, job.device_id, job.state, job.started = job, device.device_id, SCHEDULED_RUNNING, time.time()
+            self.running[job.job_id] = job
+            threading.Thread(target=self.plot, args=(device, job), name=f"scheduled-{job.job_id}",
+                             daemon=True).start()
+        self.record_queue_length()
+
+    def plot(self, device, job):
+        """Load and plot a dispatched job on its device, recording the outcome."""
+        logging.info(f"Plotting scheduled job {job.job_id} {job.name} on {device.device_id or '(default)'}")
+        try:
+            response = self.service.load_plot_file(device.device_id, job.path)
+            if not response.success:
+                raise RuntimeError(response.message)
+            plot_job = self.service.find_plotter(device.device_id).job
+            plot_job.start()
+            job.plot_job = plot_job
+        except Exception as e:
+            message = f"Failed to load job {job.job_id}: {str(e)}"
+            logging.error(f"{message}, device {device.device_id or '(default)'} suspended")
+            with self.condition:
+                device.suspended = message
+                self.finish(device, job, SCHEDULED_FAILED, message)
+            return
+
+        plot_job.wait()
+        with self.condition:
+            device.plotting_seconds += plot_job.elapsed()
+            device.commands_plotted += plot_job.index - plot_job.start_index
+            self.finish(device, job, OUTCOMES.get(plot_job.state, SCHEDULED_FAILED), plot_job.message)
+
+    def finish(self, device, job, state, message):
+        """Record the end of a job on its device, called with the condition held."""
+        device.busy_seconds += time.time() - job.started
+        if state == SCHEDULED_FINISHED:
+            device.jobs_finished += 1
+        elif state == SCHEDULED_CANCELLED:
+            device.jobs_cancelled += 1
+        else:
+            device.jobs_failed += 1
+        device.job = None
+        self.running.pop(job.job_id, None)
+        self.end(job, state, message)
+        self.condition.notify()
@@ -1,115 +1,153 @@
-import ast
+import argparse
+import asyncio
+import functools
 import logging
-import re
+import multiprocessing
+import queue
+import threading
+import time
 from concurrent import futures
+from datetime import timedelta
 
 import grpc
-from nextdraw import NextDraw
+
+try:
+    from nextdraw import NextDraw
+except ImportError:
+    # the NextDraw API is only needed to drive a real plotter, see --simulate
+    NextDraw = None
 
 # Import generated gRPC code
 from plot import plot_service_pb2, plot_service_pb2_grpc
 
-API_OPTION_CASTS = {
-    'handling': [int],
-    'speed_pendown': [int],
-    'speed_penup': [int],
-    'accel': [int],
-    'pen_pos_down': [int],
-    'pen_pos_up': [int],
-    'pen_rate_lower': [int],
-    'pen_rate_raise': [int],
-    'model': [int],
-    'penlift': [int],
-    'homing': [bool],
-    'port': [lambda x: x],
-    'port_config': [int],
-    'units': [int],
-}
-
-API_FUNC_CASTS = {
-    'load_config': [lambda x: x],
-    'update': [],
-    'goto': [float, float],
-    'moveto': [float, float],
-    'lineto': [float, float],
-    'go': [float, float],
-    'move': [float, float],
-    'line': [float, float],
-    'penup': [],
-    'pendown': [],
-    'draw_path': [ast.literal_eval],
-    'delay': [int],
-    'block': [],
-    'usb_command': [lambda x: x],
-    'usb_query': [lambda x: x],
-}
-
-STATEMENT_SEPARATOR = "|"
-
-ALIGNMENT_SVG = '<svg width="74mm" height="105mm" viewBox="0 0 74 105" xmlns="http://www.w3.org/2000/svg"><circle style="fill:none;stroke:#000;stroke-width:.2;stroke-dasharray:none" cx="37" cy="40.975" r="24.57"/><path style="fill:none;stroke:#000;stroke-width:.264583px;stroke-linecap:butt;stroke-linejoin:miter;stroke-opacity:1" d="M7.577 40.975h58.846M37 11.551v58.847"/></svg>'
-
-
-def cast_api_params(conversions, func_name, params):
-    casts = conversions.get(func_name)
-    if casts:
-        return [cast(param) for cast, param in zip(casts, params)]
-    return params
-
-
-def breakdown_into_statements(body):
-    """Break down a sequence of tokens into named statements with parameters.
-
-    Args:
-        body (list): List of tokens to process
-
-    Returns:
-        list: List of tuples (name, params) representing statements
-    """
-    statements = []
-    name, params = None, []
-
-    for statement in body:
-        if name is None:
-            name = statement
-        elif statement == STATEMENT_SEPARATOR:
-            statements.append((name, cast_api_params(API_FUNC_CASTS, name, params)))
-            name, params = None, []
-        else:
-            params.append(statement)
-    if name is not None:
-        statements.append((name, cast_api_params(API_FUNC_CASTS, name, params)))
-    return statements
-
-
-def extract_definitions(raw_definitions):
-    """Extract raw string definitions into name/body dictionary.
-
-    Args:
-        raw_definitions (list): List of definitions as strings
-
-    Returns:
-        dict: Dictionary mapping definition names to their command sequences
-    """
-    definitions = {}
-    split_definitions = [re.split(r'\s+', line.strip()) for line in raw_definitions]
-    for definition in split_definitions:
-        name = definition[0]
-        body = definition[1:]
-        definitions[name] = breakdown_into_statements(body)
-    return definitions
+from async_service import AsyncPlotService
+from estimate import estimate_plot, estimate_plot_file
+from job import PlotJob
+from journal import file_identity, plot_identity
+from layers import LayeredPlot
+from metrics import AsyncMetricsInterceptor, DEFAULT_METRICS_INTERVAL, Metrics, MetricsInterceptor, start_metrics_file
+from optimize import optimize_commands
+from plot_binary import BinaryPlot, is_binary_plot
+from plot_commands import extract_definitions, extract_options, parse_command, parse_commands, parse_plot_file
+from plot_svg import is_svg_plot, load_svg_plot
+from plotter import DEFAULT_DEVICE, NOT_INITIALIZED, Plotter, device_for
+from power import DEFAULT_POWER_INTERVAL
+from preview import DEFAULT_RESOLUTION, PreviewRenderer
+from scheduler import JobScheduler
+from simulator import SimulatedClock, SimulatedNextDraw
+
+DEFAULT_PORT = 50051
+# Threads serving RPCs, each command stream and progress watcher holds one while it is open, except with --aio
+# where they only run the RPCs that block
+DEFAULT_MAX_WORKERS = 10
+# Whole plots are sent in a single message by OptimizePlot
+MAX_MESSAGE_LENGTH = 256 * 1024 * 1024
+SERVER_OPTIONS = [
+    ('grpc.max_receive_message_length', MAX_MESSAGE_LENGTH),
+    ('grpc.max_send_message_length', MAX_MESSAGE_LENGTH),
+]
+
+# Number of streamed commands read ahead of the command being executed
+STREAM_WINDOW = 32
+# Seconds between checks for a cancelled stream while the read ahead window is full
+STREAM_POLL_INTERVAL = 0.5
+
+# Directory of the journals recording plot job progress
+DEFAULT_JOURNAL_DIR = "journals"
 
 
 class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
-    def __init__(self):
-        self.nd = None
-        self.base_options = {}
-        self.definitions = {}
+    def __init__(self, stream_window=STREAM_WINDOW, journal_dir=DEFAULT_JOURNAL_DIR, nextdraw_factory=NextDraw,
+                 metrics=None, power_interval=DEFAULT_POWER_INTERVAL, prepare_workers=None, remove_redundant=False):
+        """Serves any number of NextDraws, each selected by a device id in the requests.
+
+        The device id is the NextDraw `port` option, a USB port or nickname. Requests
+        without one are for the default device, the first NextDraw found. Each device
+        gets a Plotter with its own hardware thread, session and plot job the first
+        time it is initialized. Commands are parsed on the request threads whichever
+        device they are for.
+
+        Args:
+            stream_window (int): Commands read ahead on a command stream
+            journal_dir (str): Directory of plot job journals, empty to disable journaling
+            nextdraw_factory (callable): Creates the NextDraw instance, NextDraw or a simulated stand-in
+            metrics (Metrics, optional): Registry recording command and hardware latencies
+            power_interval (float): Seconds between background supply voltage readings, 0 to disable
+            prepare_workers (int, optional): Processes preparing the layers of text plots, one per core if None,
+                0 to prepare plots on the request thread
+            remove_redundant (bool): Skip commands that would not change a plotter's pen or position
+        """
+        if nextdraw_factory is None:
+            raise RuntimeError("The NextDraw API is not installed, install it or run with --simulate")
+        self.nextdraw_factory = nextdraw_factory
+        self.metrics = metrics or Metrics()
+        self.stream_window = max(1, stream_window)
+        self.journal_dir = journal_dir
+        self.power_interval = power_interval
+        self.prepare_workers = prepare_workers
+        self.prepare_pool = None
+        self.remove_redundant = remove_redundant
+        self.plotters = {}
+        self.plotters_lock = threading.Lock()
+        self.scheduler = JobScheduler(self, self.metrics)
+        self.previews = PreviewRenderer()
+
+    def plotter(self, device_id=DEFAULT_DEVICE):
+        """Return the plotter for a device, registering it if it is new."""
+        with self.plotters_lock:
+            plotter = self.plotters.get(device_id)
+            if plotter is None:
+                plotter = self.plotters[device_id] = Plotter(
+                    device_id, self.nextdraw_factory, self.journal_dir, self.metrics, self.power_interval,
+                    remove_redundant=self.remove_redundant
+                )
+                logging.info(f"Registered device {device_id or '(default)'}")
+            return plotter
+
+    def layer_executor(self):
+        """Return the process pool preparing plot layers, started on first use, or None if there is none."""
+        if self.prepare_workers == 0:
+            return None
+        with self.plotters_lock:
+            if self.prepare_pool is None:
+                # spawned rather than forked, forking a process running gRPC threads is unsafe
+                self.prepare_pool = futures.ProcessPoolExecutor(
+                    max_workers=self.prepare_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self.prepare_pool
+
+    def find_plotter(self, device_id=DEFAULT_DEVICE):
+        """Return the plotter for a device, None if it has never been initialized."""
+        return self.plotters.get(device_id)
+
+    def initialized_plotter(self, device_id=DEFAULT_DEVICE):
+        """Return the plotter for a device if it has a NextDraw connection, otherwise None."""
+        plotter = self.plotters.get(device_id)
+        if plotter is None or plotter.nd is None:
+            return None
+        return plotter
+
+    def ListDevices(self, request, context):
+        """RPC method to list the registered devices with the state of their plot jobs."""
+        devices = []
+        for device_id, plotter in sorted(self.plotters.items()):
+            job = plotter.job
+            devices.append(plot_service_pb2.DeviceStatus(
+                device_id=device_id,
+                initialized=plotter.nd is not None,
+                state=plot_service_pb2.JobState.Value(job.state) if job is not None else plot_service_pb2.NO_JOB,
+                command_index=job.index if job is not None else 0,
+                command_total=len(job.statements) if job is not None else 0
+            ))
+        return plot_service_pb2.ListDevicesResponse(devices=devices)
 
     def InitializePlot(self, request, context):
         """RPC method to initialize NextDraw with configuration options and command definitions."""
         try:
-            if self.initialize_plot(request.options, request.definitions):
-                logging.info("NextDraw initialized and connected")
+            device_id = device_for(request.device_id, extract_options(request.options))
+            plotter = self.plotter(device_id)
+            if plotter.hardware.call(plotter.initialize_plot, request.options, request.definitions):
+                logging.info(f"NextDraw {device_id or '(default)'} initialized and connected")
                 return plot_service_pb2.CommandResponse(
                     success=True,
                     message="NextDraw initialized successfully"
@@ -122,62 +160,20 @@ class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
                 message=f"Failed to initialize NextDraw: {str(e)}"
             )
 
-    def extract_options(self, raw_options):
-        options = {}
-        parts = [re.split(r'\s+', line.strip()) for line in raw_options]
-
-        for option in parts:
-            name = option[0]
-            if name in API_OPTION_CASTS:
-                options[name] = cast_api_params(API_OPTION_CASTS, name, option[1:])
-            else:
-                logging.warning('Attempt to set invalid option %s with value(s) %s' % (name, option[1:]))
-        # force millimeter units
-        options['units'] = [2]
-        return options
-
-    def initialize_plot(self, options=None, definitions=None):
-        """Initialize NextDraw instance with optional configuration parameters and command definitions.
-
-        Args:
-            options (list[str], optional): List of options to set on NextDraw before connecting.
-            definitions (list[str], optional): List of command definitions to process.
-        """
-        if options:
-            self.base_options = self.extract_options(options)
-
-        if definitions:
-            # Process command definitions
-            self.definitions = extract_definitions(definitions)
-
-        self.nd = NextDraw()
-        return self.setup_interactive_context()
-
-    def setup_interactive_context(self):
-        self.nd.interactive()
-        for name, value in self.base_options.items():
-            if hasattr(self.nd.options, name):
-                setattr(self.nd.options, name, *value)
-            else:
-                logging.warning(f"Option {name} not found in NextDraw options")
-        if self.nd.connect():
-            self.nd.penup()
-            self.nd.moveto(0, 0)
-            self.nd.block()
-            return True
-        else:
-            return False
-
     def HasPower(self, request, context):
-        """RPC method to check if NextDraw has power."""
+        """RPC method to check if NextDraw has power, answered from the latest background reading when recent."""
         try:
-            if self.nd is None:
+            plotter = self.initialized_plotter(request.device_id)
+            if plotter is None:
                 return plot_service_pb2.HasPowerResponse(
                     has_power=False
                 )
 
+            sample = plotter.power.latest(max_age=2 * plotter.power.interval)
+            if sample is None:
+                sample = plotter.hardware.call(plotter.power.sample)
             return plot_service_pb2.HasPowerResponse(
-                has_power=int(self.nd.usb_query("QC\r").split(",")[1]) > 276
+                has_power=sample is not None and sample.has_power
             )
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
@@ -186,17 +182,37 @@ class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
                 has_power=False
             )
 
+    def GetPowerHistory(self, request, context):
+        """RPC method to report the supply voltage readings taken since a time."""
+        plotter = self.find_plotter(request.device_id)
+        if plotter is None:
+            return plot_service_pb2.PowerHistoryResponse()
+        return plot_service_pb2.PowerHistoryResponse(
+            samples=[
+                plot_service_pb2.PowerSample(
+                    timestamp=sample.timestamp,
+                    reading=sample.reading,
+                    has_power=sample.has_power,
+                    command_index=sample.command_index
+                )
+                for sample in plotter.power.history(request.since)
+            ]
+        )
+
     def Disconnect(self, request, context):
         """RPC method to disconnect from NextDraw."""
         try:
-            if self.nd is None:
+            plotter = self.initialized_plotter(request.device_id)
+            if plotter is None:
                 return plot_service_pb2.CommandResponse(
                     success=False,
                     message="NextDraw is not initialized, nothing to disconnect."
                 )
 
-            if self.nd.connected: self.nd.disconnect()
-            self.nd = None
+            if plotter.job is not None and plotter.job.active:
+                plotter.job.cancel()
+                plotter.job.wait()
+            plotter.hardware.call(plotter.disconnect)
             return plot_service_pb2.CommandResponse(
                 success=True,
                 message="Successfully disconnected from NextDraw"
@@ -210,19 +226,14 @@ class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
     def PlotAlignmentSVG(self, request, context):
         """RPC method to plot the alignment SVG."""
         try:
-            if self.nd is None:
+            plotter = self.initialized_plotter(request.device_id)
+            if plotter is None:
                 return plot_service_pb2.CommandResponse(
                     success=False,
-                    message="NextDraw is not initialized. Call InitializePlot first."
+                    message=NOT_INITIALIZED
                 )
 
-            # Configure and plot the alignment SVG
-            self.nd.plot_setup(ALIGNMENT_SVG)
-
-            for option in self.base_options:
-                if option not in ["units"]:
-                    setattr(self.nd.options, option, *self.base_options[option])
-            self.nd.plot_run()
+            plotter.hardware.call(plotter.plot_alignment_svg)
 
             return plot_service_pb2.CommandResponse(
                 success=True,
@@ -238,10 +249,11 @@ class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
         """RPC method to walk the home position in x or y axis."""
         MAX_STEP_SIZE = 0.1
         try:
-            if self.nd is None:
+            plotter = self.initialized_plotter(request.device_id)
+            if plotter is None:
                 return plot_service_pb2.CommandResponse(
                     success=False,
-                    message="NextDraw is not initialized. Call InitializePlot first."
+                    message=NOT_INITIALIZED
                 )
 
             # Validate axis parameter
@@ -259,14 +271,7 @@ class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
                     message=f"Invalid distance of {distance}. Must be in range plus or minus {MAX_STEP_SIZE}mm."
                 )
 
-            # Prepare utility command based on axis
-            utility_cmd = f"walk_mm{request.axis}"
-
-            # Set up and execute the walk command
-            self.nd.options.mode = "utility"
-            self.nd.options.utility_cmd = utility_cmd
-            self.nd.options.dist = distance
-            self.nd.plot_run()
+            plotter.hardware.call(plotter.walk_home, request.axis, distance)
 
             return plot_service_pb2.CommandResponse(
                 success=True,
@@ -281,18 +286,14 @@ class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
     def ResetHomePosition(self, request, context):
         """RPC method to reset the home position."""
         try:
-            if self.nd is None:
+            plotter = self.initialized_plotter(request.device_id)
+            if plotter is None:
                 return plot_service_pb2.CommandResponse(
                     success=False,
-                    message="NextDraw is not initialized. Call InitializePlot first."
+                    message=NOT_INITIALIZED
                 )
 
-            # Reset home position
-            self.nd.options.mode = "plot"
-            self.nd.plot_setup()
-            if 'model' in self.base_options:
-                self.nd.options.model = self.base_options['model'][0]
-            self.nd.plot_run()
+            plotter.hardware.call(plotter.reset_home_position)
 
             return plot_service_pb2.CommandResponse(
                 success=True,
@@ -307,14 +308,15 @@ class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
     def RestoreInteractiveContext(self, request, context):
         """RPC method to restore the interactive context."""
         try:
-            if self.nd is None:
+            plotter = self.initialized_plotter(request.device_id)
+            if plotter is None:
                 return plot_service_pb2.CommandResponse(
                     success=False,
-                    message="NextDraw is not initialized. Call InitializePlot first."
+                    message=NOT_INITIALIZED
                 )
 
             # Restore interactive context
-            self.setup_interactive_context()
+            plotter.hardware.call(plotter.setup_interactive_context)
 
             return plot_service_pb2.CommandResponse(
                 success=True,
@@ -329,18 +331,14 @@ class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
     def EndInteractiveContext(self, request, context):
         """RPC method to end the interactive context."""
         try:
-            if self.nd is None:
+            plotter = self.initialized_plotter(request.device_id)
+            if plotter is None:
                 return plot_service_pb2.CommandResponse(
                     success=False,
-                    message="NextDraw is not initialized. Call InitializePlot first."
+                    message=NOT_INITIALIZED
                 )
 
-            self.nd.penup()
-            self.nd.moveto(0, 0)
-            self.nd.block()
-            self.nd.disconnect()
-            # begin plot context
-            self.nd.plot_setup()
+            plotter.hardware.call(plotter.end_interactive_context)
 
             return plot_service_pb2.CommandResponse(
                 success=True,
@@ -352,80 +350,601 @@ class PlotService(plot_service_pb2_grpc.PlotServiceServicer):
                 message=f"Failed to end interactive context: {str(e)}"
             )
 
+    def OptimizePlot(self, request, context):
+        """RPC method to preprocess plot commands before they are sent for plotting."""
+        try:
+            commands, stats = optimize_commands(
+                list(request.commands),
+                reorder=request.reorder_strokes,
+                merge_tolerance=request.merge_tolerance,
+                simplify_tolerance=request.simplify_tolerance,
+                remove_redundant=request.remove_redundant,
+                definitions=extract_definitions(request.definitions),
+                fuse=request.fuse_lines
+            )
+            logging.info(
+                f"Pen-up distance reduced from {stats['pen_up_distance_before']:.1f}mm "
+                f"to {stats['pen_up_distance_after']:.1f}mm"
+            )
+            return plot_service_pb2.OptimizePlotResponse(
+                success=True,
+                message="Plot optimized successfully",
+                commands=commands,
+                **stats
+            )
+        except Exception as e:
+            return plot_service_pb2.OptimizePlotResponse(
+                success=False,
+                message=f"Failed to optimize plot: {str(e)}"
+            )
+
+    def EstimatePlot(self, request, context):
+        """RPC method to estimate the distances and duration of a plot."""
+        try:
+            if request.path:
+                estimate = estimate_plot_file(request.path)
+            else:
+                estimate = estimate_plot(
+                    list(request.options),
+                    list(request.definitions),
+                    parse_commands(request.commands)
+                )
+            return plot_service_pb2.EstimatePlotResponse(
+                success=True,
+                message=f"Plot estimated to take {timedelta(seconds=round(estimate['duration']))}",
+                **estimate
+            )
+        except Exception as e:
+            return plot_service_pb2.EstimatePlotResponse(
+                success=False,
+                message=f"Failed to estimate plot: {str(e)}"
+            )
+
+    def RenderPreview(self, request, context):
+        """RPC method to render a plot file on the server as a PNG, reusing tiles rendered by earlier previews."""
+        try:
+            region = None
+            if request.min_x or request.min_y or request.max_x or request.max_y:
+                region = (request.min_x, request.min_y, request.max_x, request.max_y)
+            preview = self.previews.render(
+                request.path,
+                request.resolution or DEFAULT_RESOLUTION,
+                request.show_pen_up,
+                region
+            )
+            return plot_service_pb2.RenderPreviewResponse(
+                success=True,
+                message=f"Preview of {preview.width}x{preview.height} pixels rendered, "
+                        f"{preview.tiles_cached} of {preview.tiles_rendered + preview.tiles_cached} tiles cached",
+                png=preview.png,
+                width=preview.width,
+                height=preview.height,
+                tiles_rendered=preview.tiles_rendered,
+                tiles_cached=preview.tiles_cached
+            )
+        except Exception as e:
+            return plot_service_pb2.RenderPreviewResponse(
+                success=False,
+                message=f"Failed to render preview: {str(e)}"
+            )
+
+    def submit_command(self, plotter, command_line, block=True):
+        """Parse a command line on the calling thread and queue its execution on a plotter's hardware thread.
+
+        Args:
+            plotter (Plotter): Plotter to execute the command
+            command_line (str): Option, API function or defined command with its parameters
+            block (bool): Wait for room in a full hardware queue, otherwise raise queue.Full
+
+        Returns:
+            Future: Resolves to (success, message) describing the outcome of the command
+
+        Raises:
+            ValueError: If the command's parameters are malformed
+        """
+        start = time.perf_counter()
+        command, params = parse_command(command_line)
+        self.metrics.observe('command_parse_seconds', time.perf_counter() - start,
+                             command=plotter.command_labels(command)[0])
+        return plotter.submit(command, params, block=block)
+
     def ProcessCommand(self, request, context):
         try:
-            if self.nd is None:
+            plotter = self.initialized_plotter(request.device_id)
+            if plotter is None:
                 return plot_service_pb2.CommandResponse(
                     success=False,
-                    message="NextDraw is not initialized. Call InitializePlot first."
+                    message=NOT_INITIALIZED
                 )
 
-            # Parse command and parameters
-            parts = re.split(r'\s+', request.command.strip())
-            command = parts[0]
-            params = parts[1:] if len(parts) > 1 else []
-
-            # Check if this is a defined command
-            if command in self.definitions:
-                # Execute all commands in the definition
-                for cmd_name, cmd_params in self.definitions[command]:
-                    if cmd_name in API_OPTION_CASTS and hasattr(self.nd.options, cmd_name):
-                        setattr(self.nd.options, cmd_name, *cmd_params)
-                        self.nd.update()
-                    elif hasattr(self.nd, cmd_name):
-                        getattr(self.nd, cmd_name)(*cmd_params)
-                return plot_service_pb2.CommandResponse(
-                    success=True,
-                    message=f"Defined command {command} executed successfully"
-                )
+            success, message = self.submit_command(plotter, request.command).result()
+            return plot_service_pb2.CommandResponse(success=success, message=message)
+        except Exception as e:
+            return plot_service_pb2.CommandResponse(
+                success=False,
+                message=f"Error processing command: {str(e)}"
+            )
 
-            # Process command based on its type
-            if command in API_OPTION_CASTS and hasattr(self.nd.options, command):
-                # Handle option setting
-                cast_params = cast_api_params(API_OPTION_CASTS, command, params)
-                setattr(self.nd.options, command, *cast_params)
-                self.nd.update()
-                return plot_service_pb2.CommandResponse(
-                    success=True,
-                    message=f"Option {command} set successfully"
-                )
-            elif hasattr(self.nd, command):
-                # Handle function calls
-                if command in API_FUNC_CASTS:
-                    cast_params = cast_api_params(API_FUNC_CASTS, command, params)
-                    getattr(self.nd, command)(*cast_params)
-                    return plot_service_pb2.CommandResponse(
-                        success=True,
-                        message=f"Command {command} executed successfully"
-                    )
-                else:
-                    return plot_service_pb2.CommandResponse(
-                        success=False,
-                        message=f"Unknown command type: {command}"
-                    )
-            else:
+    def StreamCommands(self, request_iterator, context):
+        """RPC method to process a stream of commands, acknowledging each one by sequence number.
+
+        Up to `stream_window` commands are read, parsed and queued on the hardware
+        thread ahead of the one being executed, so the next command is ready when the
+        NextDraw finishes the current one. Once the window is full the stream is no
+        longer read and gRPC flow control holds back the client. Each command goes to
+        the device it names, so one stream can drive several plotters.
+        """
+        pending = queue.Queue()
+        window = threading.Semaphore(self.stream_window)
+
+        def read_ahead():
+            try:
+                for request in request_iterator:
+                    while not window.acquire(timeout=STREAM_POLL_INTERVAL):
+                        if not context.is_active():
+                            return
+                    outcome = futures.Future()
+                    plotter = self.initialized_plotter(request.device_id)
+                    if plotter is None:
+                        outcome.set_result((False, NOT_INITIALIZED))
+                    else:
+                        try:
+                            outcome = self.submit_command(plotter, request.command)
+                        except Exception as e:
+                            outcome.set_exception(e)
+                    pending.put((request.sequence, outcome))
+            except Exception as e:
+                if context.is_active():
+                    logging.error(f"Error reading command stream: {str(e)}")
+            finally:
+                pending.put(None)
+
+        threading.Thread(target=read_ahead, name="stream-read-ahead", daemon=True).start()
+
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            sequence, outcome = item
+            try:
+                success, message = outcome.result()
+            except Exception as e:
+                success, message = False, f"Error processing command: {str(e)}"
+            window.release()
+            yield plot_service_pb2.CommandAck(
+                sequence=sequence,
+                success=success,
+                message=message
+            )
+
+    def prepare_job(self, device_id, options, definitions, statements, command_count, identity):
+        """Initialize a plotter's NextDraw for a plot and replace its plot job with one for the plot's statements.
+
+        The plot goes to the requested device, or failing that the device named by the
+        plot's port option.
+
+        Returns:
+            UploadPlotResponse: Outcome to report to the client
+        """
+        plotter = self.plotter(device_for(device_id, extract_options(options)))
+        response = self.job_in_progress_response(plotter)
+        if response is None and not plotter.hardware.call(plotter.initialize_plot, options, definitions, True):
+            response = plot_service_pb2.UploadPlotResponse(
+                success=False,
+                message="Failed to initialize and connect to NextDraw"
+            )
+        if response is not None:
+            if hasattr(statements, 'close'):
+                statements.close()
+            return response
+        job = plotter.load_job(statements, identity)
+        message = f"Plot loaded with {command_count} commands"
+        if job.recovered is not None:
+            message += (f". An earlier run was interrupted after command {job.recovered.index},"
+                        f" continue it with ResumeJob from_journal")
+        return plot_service_pb2.UploadPlotResponse(
+            success=True,
+            message=message,
+            command_count=command_count
+        )
+
+    def job_in_progress_response(self, plotter):
+        if plotter.job is not None and plotter.job.active:
+            return plot_service_pb2.UploadPlotResponse(
+                success=False,
+                message="A plot job is in progress. Cancel it before loading another plot."
+            )
+        return None
+
+    def UploadPlot(self, request_iterator, context):
+        """RPC method to upload a plot file, initialize NextDraw from it and prepare a job to plot it.
+
+        The plot's layers are optimized and parsed in parallel, the job can be started
+        as soon as the response is sent and waits for each layer as it reaches it.
+        """
+        try:
+            data = bytearray()
+            first_chunk = None
+            for chunk in request_iterator:
+                if first_chunk is None:
+                    first_chunk = chunk
+                data.extend(chunk.data)
+            if first_chunk is None:
+                first_chunk = plot_service_pb2.UploadPlotChunk()
+
+            options, definitions, commands = parse_plot_file(data.decode('utf-8').splitlines())
+            identity = plot_identity([bytes(data), (
+                f"{first_chunk.reorder_strokes} {first_chunk.merge_tolerance} {first_chunk.simplify_tolerance} "
+                f"{first_chunk.remove_redundant} {first_chunk.fuse_lines}"
+            ).encode('utf-8')])
+            plot = LayeredPlot(
+                options, definitions, commands, self.layer_executor(),
+                reorder=first_chunk.reorder_strokes,
+                merge_tolerance=first_chunk.merge_tolerance,
+                simplify_tolerance=first_chunk.simplify_tolerance,
+                remove_redundant=first_chunk.remove_redundant,
+                fuse=first_chunk.fuse_lines
+            )
+            return self.prepare_job(first_chunk.device_id, options, definitions, plot, plot.command_count, identity)
+        except Exception as e:
+            return plot_service_pb2.UploadPlotResponse(
+                success=False,
+                message=f"Failed to upload plot: {str(e)}"
+            )
+
+    def LoadPlotFile(self, request, context):
+        """RPC method to load a text or binary plot file from the server's file system and prepare a job to plot it."""
+        try:
+            return self.load_plot_file(request.device_id, request.path)
+        except Exception as e:
+            return plot_service_pb2.UploadPlotResponse(
+                success=False,
+                message=f"Failed to load plot file: {str(e)}"
+            )
+
+    def load_plot_file(self, device_id, path):
+        """Load a text, binary or SVG plot file on the server and prepare a job on a device to plot it.
+
+        Returns:
+            UploadPlotResponse: Outcome to report to the client
+        """
+        identity = file_identity(path)
+        if is_binary_plot(path):
+            plot = BinaryPlot(path)
+            return self.prepare_job(device_id, plot.options, plot.definitions, plot, len(plot), identity)
+
+        if is_svg_plot(path):
+            # converted to a binary plot as it is read, so however large the SVG it is never held in memory
+            plot = load_svg_plot(path)
+            return self.prepare_job(device_id, plot.options, plot.definitions, plot, len(plot), identity)
+
+        with open(path) as plot_file:
+            options, definitions, commands = parse_plot_file(plot_file)
+        plot = LayeredPlot(options, definitions, commands, self.layer_executor())
+        return self.prepare_job(device_id, options, definitions, plot, plot.command_count, identity)
+
+    def control_job(self, device_id, action, verb, outcome):
+        """Apply a PlotJob control method to a device's job, returning a CommandResponse describing the outcome."""
+        try:
+            plotter = self.find_plotter(device_id)
+            if plotter is None or plotter.job is None:
                 return plot_service_pb2.CommandResponse(
                     success=False,
-                    message=f"Unknown command: {command}"
+                    message="No plot job. Call UploadPlot first."
                 )
+            action(plotter.job)
+            return plot_service_pb2.CommandResponse(
+                success=True,
+                message=f"Plot job {outcome}"
+            )
         except Exception as e:
             return plot_service_pb2.CommandResponse(
                 success=False,
-                message=f"Error processing command: {str(e)}"
+                message=f"Failed to {verb} plot job: {str(e)}"
             )
 
+    def StartJob(self, request, context):
+        """RPC method to start plotting the uploaded plot."""
+        return self.control_job(request.device_id, PlotJob.start, "start", "started")
+
+    def PauseJob(self, request, context):
+        """RPC method to pause the plot job after the current command."""
+        return self.control_job(request.device_id, PlotJob.pause, "pause", "pausing")
+
+    def ResumeJob(self, request, context):
+        """RPC method to resume a paused plot job or continue an interrupted one from its journal."""
+        if request.from_journal:
+            return self.control_job(request.device_id, PlotJob.recover, "resume", "resumed from journal")
+        return self.control_job(request.device_id, PlotJob.resume, "resume", "resumed")
+
+    def CancelJob(self, request, context):
+        """RPC method to cancel the plot job after the current command."""
+        return self.control_job(request.device_id, PlotJob.cancel, "cancel", "cancelling")
+
+    def GetJobStatus(self, request, context):
+        """RPC method to report the state and progress of the plot job."""
+        plotter = self.find_plotter(request.device_id)
+        if plotter is None or plotter.job is None:
+            return plot_service_pb2.JobStatusResponse(state=plot_service_pb2.NO_JOB)
+        job = plotter.job
+        return plot_service_pb2.JobStatusResponse(
+            state=plot_service_pb2.JobState.Value(job.state),
+            command_index=job.index,
+            command_total=len(job.statements),
+            message=job.message,
+            recoverable_index=job.recovered.index if job.recovered is not None else 0
+        )
+
+    def GetLayers(self, request, context):
+        """RPC method to report the layer index of the plot job's plot, as far as its layers have been prepared."""
+        plotter = self.find_plotter(request.device_id)
+        if plotter is None or plotter.job is None or not isinstance(plotter.job.statements, LayeredPlot):
+            return plot_service_pb2.LayersResponse()
+        plot = plotter.job.statements
+        layers = []
+        for layer in plot.index():
+            summary = layer.summary
+            min_x, min_y, max_x, max_y = summary.bounds or (0.0, 0.0, 0.0, 0.0)
+            layers.append(plot_service_pb2.Layer(
+                name=layer.name,
+                first_command=layer.first_command,
+                command_count=layer.command_count,
+                stroke_count=summary.stroke_count,
+                min_x=min_x,
+                min_y=min_y,
+                max_x=max_x,
+                max_y=max_y,
+                pen_down_distance=summary.pen_down_distance,
+                pen_up_distance=summary.pen_up_distance,
+                pen_lifts=summary.pen_lifts,
+                duration=summary.duration
+            ))
+        return plot_service_pb2.LayersResponse(
+            layers=layers,
+            layer_count=len(plot.names),
+            complete=plot.complete
+        )
+
+    def WatchProgress(self, request, context):
+        """RPC method to stream the plot job's progress and state changes until the client cancels.
+
+        A subscriber that falls behind receives only the latest progress, state changes are kept.
+        """
+        plotter = self.find_plotter(request.device_id)
+        if plotter is None:
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details(f"Device {request.device_id or '(default)'} is not registered")
+            return
+        progress = plotter.progress
+        subscription = progress.subscribe()
+        try:
+            while context.is_active():
+                event = subscription.get(timeout=STREAM_POLL_INTERVAL)
+                if event is None:
+                    continue
+                yield plot_service_pb2.ProgressEvent(
+                    state=plot_service_pb2.JobState.Value(event.state),
+                    command_index=event.command_index,
+                    command_total=event.command_total,
+                    layer=event.layer,
+                    pen_down_distance=event.pen_down_distance,
+                    eta_seconds=event.eta_seconds,
+                    message=event.message
+                )
+        finally:
+            progress.unsubscribe(subscription)
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    plot_service_pb2_grpc.add_PlotServiceServicer_to_server(
-        PlotService(), server
+    def EnrollDevice(self, request, context):
+        """RPC method to add a device to the farm that scheduled jobs are dispatched to."""
+        try:
+            self.scheduler.enroll(request.device_id, request.model, request.pen_colour)
+            return plot_service_pb2.CommandResponse(
+                success=True,
+                message=f"Device {request.device_id or '(default)'} enrolled"
+            )
+        except Exception as e:
+            return plot_service_pb2.CommandResponse(
+                success=False,
+                message=f"Failed to enroll device: {str(e)}"
+            )
+
+    def WithdrawDevice(self, request, context):
+        """RPC method to stop dispatching scheduled jobs to a device."""
+        try:
+            self.scheduler.withdraw(request.device_id)
+            return plot_service_pb2.CommandResponse(
+                success=True,
+                message=f"Device {request.device_id or '(default)'} withdrawn"
+            )
+        except Exception as e:
+            return plot_service_pb2.CommandResponse(
+                success=False,
+                message=f"Failed to withdraw device: {str(e)}"
+            )
+
+    def SubmitJob(self, request, context):
+        """RPC method to queue a plot file on the server for the next free compatible device."""
+        try:
+            job = self.scheduler.submit(request.path, request.priority, request.model, request.pen_colour,
+                                        request.name)
+            return plot_service_pb2.SubmitJobResponse(
+                success=True,
+                message=f"Job {job.job_id} queued",
+                job_id=job.job_id
+            )
+        except Exception as e:
+            return plot_service_pb2.SubmitJobResponse(
+                success=False,
+                message=f"Failed to submit job: {str(e)}"
+            )
+
+    def CancelScheduledJob(self, request, context):
+        """RPC method to remove a job from the queue or cancel it if it is plotting."""
+        try:
+            self.scheduler.cancel(request.job_id)
+            return plot_service_pb2.CommandResponse(
+                success=True,
+                message=f"Job {request.job_id} cancelling"
+            )
+        except Exception as e:
+            return plot_service_pb2.CommandResponse(
+                success=False,
+                message=f"Failed to cancel job: {str(e)}"
+            )
+
+    def GetSchedule(self, request, context):
+        """RPC method to report the queued, running and recent jobs and the throughput of each device."""
+        now = time.time()
+        jobs = []
+        for job in self.scheduler.jobs():
+            plot_job = job.plot_job
+            jobs.append(plot_service_pb2.ScheduledJob(
+                job_id=job.job_id,
+                name=job.name,
+                path=job.path,
+                priority=job.priority,
+                model=job.model,
+                pen_colour=job.pen_colour,
+                state=plot_service_pb2.ScheduledJobState.Value(job.state),
+                device_id=job.device_id or "",
+                message=job.message,
+                submitted=job.submitted,
+                started=job.started or 0.0,
+                finished=job.finished or 0.0,
+                job_state=plot_service_pb2.JobState.Value(plot_job.state) if plot_job else plot_service_pb2.NO_JOB,
+                command_index=plot_job.index if plot_job else 0,
+                command_total=len(plot_job.statements) if plot_job else 0
+            ))
+        devices = []
+        for device in self.scheduler.device_list():
+            busy, plotting, enrolled = device.utilisation(now)
+            hours = enrolled / 3600
+            devices.append(plot_service_pb2.FarmDeviceStatus(
+                device_id=device.device_id,
+                model=device.model,
+                pen_colour=device.pen_colour,
+                job_id=device.job.job_id if device.job is not None else 0,
+                suspended=device.suspended,
+                jobs_finished=device.jobs_finished,
+                jobs_failed=device.jobs_failed,
+                jobs_cancelled=device.jobs_cancelled,
+                commands_plotted=device.commands_plotted,
+                busy_seconds=busy,
+                plotting_seconds=plotting,
+                utilisation=plotting / enrolled,
+                jobs_per_hour=device.jobs_finished / hours,
+                commands_per_hour=device.commands_plotted / hours
+            ))
+        return plot_service_pb2.ScheduleResponse(jobs=jobs, devices=devices)
+
+    def GetMetrics(self, request, context):
+        """RPC method to report RPC, command and hardware queue latency histograms and gauges."""
+        histograms, gauges = self.metrics.snapshot()
+        return plot_service_pb2.MetricsResponse(
+            histograms=[
+                plot_service_pb2.HistogramMetric(
+                    name=name,
+                    labels=labels,
+                    count=histogram.count,
+                    sum=histogram.sum,
+                    bounds=histogram.bounds,
+                    bucket_counts=histogram.counts
+                )
+                for name, labels, histogram in histograms
+            ],
+            gauges=[
+                plot_service_pb2.GaugeMetric(name=name, labels=labels, value=value)
+                for name, labels, value in gauges
+            ]
+        )
+
+
+def serve(port=DEFAULT_PORT, stream_window=STREAM_WINDOW, journal_dir=DEFAULT_JOURNAL_DIR, simulate=False,
+          time_scale=0.0, metrics_file=None, metrics_interval=DEFAULT_METRICS_INTERVAL,
+          power_interval=DEFAULT_POWER_INTERVAL, max_workers=DEFAULT_MAX_WORKERS, prepare_workers=None,
+          asynchronous=False, remove_redundant=False):
+    metrics = Metrics()
+    if metrics_file:
+        start_metrics_file(metrics, metrics_file, metrics_interval)
+    nextdraw_factory = NextDraw
+    if simulate:
+        # one clock for every simulated connection so simulated time runs on across them
+        nextdraw_factory = functools.partial(SimulatedNextDraw, SimulatedClock(time_scale))
+        logging.info("Plotting on a simulated NextDraw")
+    service = PlotService(stream_window=stream_window, journal_dir=journal_dir, nextdraw_factory=nextdraw_factory,
+                          metrics=metrics, power_interval=power_interval, prepare_workers=prepare_workers,
+                          remove_redundant=remove_redundant)
+    if asynchronous:
+        asyncio.run(serve_async(service, port, metrics, max_workers))
+        return
+
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_workers),
+        interceptors=[MetricsInterceptor(metrics)],
+        options=SERVER_OPTIONS
     )
-    server.add_insecure_port('[::]:50051')
+    plot_service_pb2_grpc.add_PlotServiceServicer_to_server(service, server)
+    server.add_insecure_port(f'[::]:{port}')
     server.start()
-    logging.info("Server started on port 50051")
+    logging.info(f"Server started on port {port}")
     server.wait_for_termination()
 
 
+async def serve_async(service, port, metrics, max_workers):
+    """Serve a PlotService from a grpc.aio server, running RPCs that block on a pool of max_workers threads."""
+    server = grpc.aio.server(
+        interceptors=[AsyncMetricsInterceptor(metrics)],
+        options=SERVER_OPTIONS
+    )
+    executor = futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blocking-rpc")
+    plot_service_pb2_grpc.add_PlotServiceServicer_to_server(AsyncPlotService(service, executor), server)
+    server.add_insecure_port(f'[::]:{port}')
+    await server.start()
+    logging.info(f"Asynchronous server started on port {port}")
+    try:
+        await server.wait_for_termination()
+    finally:
+        executor.shutdown(wait=False)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Plot Director Server")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on (default {DEFAULT_PORT})")
+    parser.add_argument('--stream-window', type=int, default=STREAM_WINDOW,
+                        help=f"commands read ahead on a command stream (default {STREAM_WINDOW})")
+    parser.add_argument('--journal-dir', default=DEFAULT_JOURNAL_DIR,
+                        help=f"directory of plot job journals, empty to disable (default {DEFAULT_JOURNAL_DIR})")
+    parser.add_argument('--simulate', action='store_true',
+                        help="plot on a simulated NextDraw instead of a connected plotter")
+    parser.add_argument('--time-scale', type=float, default=0.0,
+                        help="with --simulate, real seconds per simulated second of motion (default 0, no waiting)")
+    parser.add_argument('--metrics-file',
+                        help="file to write metrics to in the Prometheus text format, not written by default")
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_METRICS_INTERVAL,
+                        help=f"seconds between writes of the metrics file (default {DEFAULT_METRICS_INTERVAL:g})")
+    parser.add_argument('--power-interval', type=float, default=DEFAULT_POWER_INTERVAL,
+                        help=f"seconds between supply voltage readings, 0 to only read when asked "
+                             f"(default {DEFAULT_POWER_INTERVAL:g})")
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help=f"threads serving RPCs, raise it to stream to several plotters at once "
+                             f"(default {DEFAULT_MAX_WORKERS})")
+    parser.add_argument('--prepare-workers', type=int,
+                        help="processes preparing the layers of plots in parallel, 0 to prepare them on the "
+                             "request thread (default one per core)")
+    parser.add_argument('--aio', action='store_true',
+                        help="serve from an asyncio event loop so command streams and progress watchers do not "
+                             "each hold a thread, --max-workers then sizes the pool running RPCs that block")
+    parser.add_argument('--remove-redundant', action='store_true',
+                        help="skip commands that would not change the pen state or position, such as a penup "
+                             "with the pen already up")
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
-    serve()
+    args = parse_args()
+    serve(port=args.port, stream_window=args.stream_window, journal_dir=args.journal_dir, simulate=args.simulate,
+          time_scale=args.time_scale, metrics_file=args.metrics_file, metrics_interval=args.metrics_interval,
+          power_interval=args.power_interval, max_workers=args.max_workers, prepare_workers=args.prepare_workers,
+          asynchronous=args.aio, remove_redundant=args.remove_redundant)
@@ -0,0 +1,240 @@
+import logging
+import math
+import time
+
+import numpy as np
+
+from estimate import DEFAULT_OPTIONS, MAX_ACCEL, MAX_SPEED, pen_move_time, polyline_motion
+from plot_commands import API_OPTION_CASTS
+
+# Millimetres per unit for each value of the units option
+UNIT_SCALES = {0: 25.4, 1: 10.0, 2: 1.0}
+# usb_query("QC") readings, the supply reading is compared against 276 by HasPower
+POWERED_SUPPLY_READING = 300
+UNPOWERED_SUPPLY_READING = 0
+
+
+def rest_to_rest_time(distance, max_speed, accel):
+    """Seconds to travel a distance starting and ending at rest, trapezoid_times for a single move."""
+    ramp = max_speed * max_speed / accel
+    if distance >= ramp:
+        return 2 * max_speed / accel + (distance - ramp) / max_speed
+    return 2 * math.sqrt(distance / accel)
+
+
+class SimulatedClock:
+    """Simulated time that motion advances, optionally paced against the real clock.
+
+    A time_scale of 0 advances instantly, 1 sleeps for as long as the motion would
+    take and values in between run the simulation faster than real time.
+    """
+
+    def __init__(self, time_scale=0.0):
+        self.time_scale = time_scale
+        self.now = 0.0
+
+    def advance(self, seconds):
+        self.now += seconds
+        if self.time_scale > 0 and seconds > 0:
+            time.sleep(seconds * self.time_scale)
+
+
+class SimulatedOptions:
+    """NextDraw options with the NextDraw defaults."""
+
+    def __init__(self):
+        for name in API_OPTION_CASTS:
+            setattr(self, name, None)
+        for name, value in DEFAULT_OPTIONS.items():
+            setattr(self, name, value)
+        self.units = 0
+        self.homing = True
+        self.mode = "plot"
+        self.utility_cmd = None
+        self.dist = 0.0
+
+
+class SimulatedNextDraw:
+    """Stand-in for NextDraw that models motion time instead of driving a plotter.
+
+    Implements the parts of the interactive and plot APIs used by PlotService.
+    Moves take the time the estimate motion model gives them on the clock, and
+    the machine state after each call is kept in `state`.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or SimulatedClock()
+        self.options = SimulatedOptions()
+        self.settings = dict(DEFAULT_OPTIONS)
+        self.connected = False
+        self.powered = True
+        self.svg = None
+        self.home_offset = [0.0, 0.0]
+        self.x = self.y = 0.0
+        self.pen_up = True
+        self.pen_lifts = 0
+        self.pen_down_distance = 0.0
+        self.pen_up_distance = 0.0
+        self.command_count = 0
+
+    @property
+    def state(self):
+        """Machine state the simulation has reached, positions in mm."""
+        return {
+            'x': self.x,
+            'y': self.y,
+            'pen_up': self.pen_up,
+            'home_offset': tuple(self.home_offset),
+            'connected': self.connected,
+            'elapsed': self.clock.now,
+            'pen_down_distance': self.pen_down_distance,
+            'pen_up_distance': self.pen_up_distance,
+            'pen_lifts': self.pen_lifts,
+            'commands': self.command_count,
+            'options': dict(self.settings),
+        }
+
+    @property
+    def unit_scale(self):
+        return UNIT_SCALES.get(self.options.units, 1.0)
+
+    def speeds(self):
+        """Return (pen-down speed, pen-up speed, acceleration) in mm/s and mm/s^2."""
+        settings = self.settings
+        return (settings['speed_pendown'] * MAX_SPEED / 100, settings['speed_penup'] * MAX_SPEED / 100,
+                settings['accel'] * MAX_ACCEL / 100)
+
+    # Interactive API
+
+    def interactive(self):
+        self.options.mode = "interactive"
+
+    def connect(self):
+        self.update()
+        self.connected = True
+        self.x = self.y = 0.0
+        self.pen_up = True
+        return True
+
+    def disconnect(self):
+        self.connected = False
+        logging.info(f"Simulated NextDraw {self.options.port or '(default)'} disconnected: {self.state}")
+
+    def update(self):
+        """Apply changed options, as NextDraw does before the next motion."""
+        for name in self.settings:
+            value = getattr(self.options, name)
+            if value is not None:
+                self.settings[name] = value
+        self.command_count += 1
+
+    def load_config(self, config):
+        self.command_count += 1
+
+    def block(self):
+        self.command_count += 1
+
+    def delay(self, milliseconds):
+        self.clock.advance(milliseconds / 1000)
+        self.command_count += 1
+
+    def usb_command(self, command):
+        self.command_count += 1
+
+    def usb_query(self, query):
+        if query.strip().upper() == "QC":
+            supply = POWERED_SUPPLY_READING if self.powered else UNPOWERED_SUPPLY_READING
+            return f"0000,{supply:04d}"
+        return "OK"
+
+    def current_pos(self):
+        return self.x / self.unit_scale, self.y / self.unit_scale
+
+    def current_pen(self):
+        return self.pen_up
+
+    def set_pen(self, up):
+        if up == self.pen_up:
+            return
+        rate = self.settings['pen_rate_raise' if up else 'pen_rate_lower']
+        self.clock.advance(pen_move_time(self.settings['pen_pos_up'], self.settings['pen_pos_down'], rate))
+        self.pen_up = up
+        if up:
+            self.pen_lifts += 1
+
+    def penup(self):
+        self.set_pen(True)
+        self.command_count += 1
+
+    def pendown(self):
+        self.set_pen(False)
+        self.command_count += 1
+
+    def travel(self, x, y):
+        """Move to a position in mm, starting and ending at rest."""
+        distance = math.hypot(x - self.x, y - self.y)
+        pen_down_speed, pen_up_speed, accel = self.speeds()
+        speed = pen_up_speed if self.pen_up else pen_down_speed
+        self.clock.advance(rest_to_rest_time(distance, speed, accel))
+        if self.pen_up:
+            self.pen_up_distance += distance
+        else:
+            self.pen_down_distance += distance
+        self.x, self.y = x, y
+
+    def move_absolute(self, x, y, pen_up=None):
+        if pen_up is not None:
+            self.set_pen(pen_up)
+        self.travel(x * self.unit_scale, y * self.unit_scale)
+        self.command_count += 1
+
+    def move_relative(self, dx, dy, pen_up=None):
+        if pen_up is not None:
+            self.set_pen(pen_up)
+        self.travel(self.x + dx * self.unit_scale, self.y + dy * self.unit_scale)
+        self.command_count += 1
+
+    def goto(self, x, y):
+        self.move_absolute(x, y)
+
+    def moveto(self, x, y):
+        self.move_absolute(x, y, pen_up=True)
+
+    def lineto(self, x, y):
+        self.move_absolute(x, y, pen_up=False)
+
+    def go(self, dx, dy):
+        self.move_relative(dx, dy)
+
+    def move(self, dx, dy):
+        self.move_relative(dx, dy, pen_up=True)
+
+    def line(self, dx, dy):
+        self.move_relative(dx, dy, pen_up=False)
+
+    def draw_path(self, vertices):
+        self.command_count += 1
+        vertices = np.asarray(vertices, dtype=float) * self.unit_scale
+        if len(vertices) < 2:
+            return
+        self.set_pen(True)
+        self.travel(float(vertices[0][0]), float(vertices[0][1]))
+        self.set_pen(False)
+        pen_down_speed, _, accel = self.speeds()
+        distance, seconds = polyline_motion([vertices], np.array([pen_down_speed]), np.array([accel]))
+        self.clock.advance(seconds)
+        self.pen_down_distance += distance
+        self.x, self.y = float(vertices[-1][0]), float(vertices[-1][1])
+        self.set_pen(True)
+
+    # Plot API
+
+    def plot_setup(self, svg=None):
+        self.svg = svg
+        self.options.mode = "plot"
+
+    def plot_run(self):
+        """Run the plot context. Walks offset the home position, other runs are recorded but not modelled."""
+        if self.options.mode == "utility" and self.options.utility_cmd in ("walk_mmx", "walk_mmy"):
+            self.home_offset[self.options.utility_cmd == "walk_mmy"] += self.options.dist
+        self.command_count += 1
@@ -1,8 +1,50 @@
 import grpc
 import logging
+import threading
+import time
 from plot import plot_service_pb2
 from plot import plot_service_pb2_grpc
 
+# Maximum number of streamed commands awaiting acknowledgement
+STREAM_WINDOW = 8
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def stream_commands(stub, commands, window=STREAM_WINDOW):
+    """Send commands over a command stream keeping at most `window` unacknowledged."""
+    in_flight = threading.Semaphore(window)
+
+    def requests():
+        for sequence, command in enumerate(commands):
+            in_flight.acquire()
+            yield plot_service_pb2.StreamCommandRequest(sequence=sequence, command=command)
+
+    for ack in stub.StreamCommands(requests()):
+        in_flight.release()
+        logging.info(f"Command: {commands[ack.sequence]}")
+        logging.info(f"Response: {ack.message}")
+        logging.info(f"Success: {ack.success}\n")
+
+
+def upload_plot(stub, plot_file_path):
+    """Upload a plot file to the server in chunks."""
+    def chunks():
+        with open(plot_file_path, 'rb') as plot_file:
+            while data := plot_file.read(UPLOAD_CHUNK_SIZE):
+                yield plot_service_pb2.UploadPlotChunk(data=data)
+
+    return stub.UploadPlot(chunks())
+
+
+def wait_for_job(stub, poll_interval=0.5):
+    """Poll the job status until the job is no longer plotting."""
+    while True:
+        status = stub.GetJobStatus(plot_service_pb2.JobStatusRequest())
+        if status.state != plot_service_pb2.JOB_PLOTTING:
+            return status
+        time.sleep(poll_interval)
+
+
 def run():
     with grpc.insecure_channel('localhost:50051') as channel:
         stub = plot_service_pb2_grpc.PlotServiceStub(channel)
@@ -77,6 +119,34 @@ def run():
             except Exception as e:
                 logging.error(f"Error processing command '{command}': {str(e)}")
 
+        # Test streaming the same commands with windowed flow control
+        try:
+            logging.info("Streaming commands")
+            stream_commands(stub, commands)
+        except Exception as e:
+            logging.error(f"Error streaming commands: {str(e)}")
+
+        # Test uploading a plot file and plotting it as a server side job
+        try:
+            response = upload_plot(stub, "command_examples/inline_pause.txt")
+            logging.info("Uploading plot")
+            logging.info(f"Response: {response.message}")
+            logging.info(f"Success: {response.success}\n")
+            if not response.success:
+                return
+
+            response = stub.StartJob(plot_service_pb2.StartJobRequest())
+            logging.info(f"Starting job: {response.message}")
+            status = wait_for_job(stub)
+            while status.state == plot_service_pb2.JOB_PAUSED:
+                logging.info(f"Job paused: {status.message}")
+                stub.ResumeJob(plot_service_pb2.ResumeJobRequest())
+                status = wait_for_job(stub)
+            logging.info(f"Job ended: {status.message}\n")
+        except Exception as e:
+            logging.error(f"Error running plot job: {str(e)}")
+            return
+
         # Test plotting alignment SVG
         try:
             response = stub.PlotAlignmentSVG(plot_service_pb2.PlotAlignmentSVGRequest())
@@ -0,0 +1,74 @@
+import functools
+import glob
+import os
+import random
+
+import pytest
+
+from estimate import estimate_plot
+from job import PAUSE_COMMAND
+from metrics import Metrics
+from plot_commands import COMMENT_PREFIX, parse_commands, parse_plot_file
+from plotter import Plotter
+from simulator import SimulatedClock, SimulatedNextDraw
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), 'command_examples')
+EXAMPLES = sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.txt')))
+OPTIONS = ['model 2', 'units 2', 'speed_pendown 30', 'speed_penup 80', 'accel 60']
+DEFINITIONS = ['go_home penup | moveto 0 0']
+
+
+def example_plot(path):
+    with open(path) as plot_file:
+        return parse_plot_file(plot_file)
+
+
+def random_lines(rng, count, size=100):
+    """A lineto-heavy plot, with pen, speed and delay changes part way through runs of lines."""
+    commands = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.7:
+            commands.append(f'lineto {rng.uniform(0, size):.3f} {rng.uniform(0, size):.3f}')
+        elif roll < 0.8:
+            commands.append(f'line {rng.uniform(-5, 5):.3f} {rng.uniform(-5, 5):.3f}')
+        else:
+            commands.append(rng.choice([
+                'penup', 'pendown', f'moveto {rng.uniform(0, size):.3f} {rng.uniform(0, size):.3f}',
+                f'speed_pendown {rng.randint(10, 100)}', 'delay 20', 'go_home',
+                f'draw_path [[{rng.uniform(0, size):.3f},0],[5,{rng.uniform(0, size):.3f}],[7,7]]',
+            ]))
+    return commands
+
+
+def simulate(options, definitions, commands):
+    """Final state of a simulated NextDraw after the plot, leaving out the comments and pauses the job engine
+    handles, as the time spent paused is not estimated."""
+    plotter = Plotter("", functools.partial(SimulatedNextDraw, SimulatedClock(0)), "", Metrics(), power_interval=0)
+    plotter.initialize_plot(options, definitions)
+    for name, params in parse_commands(commands):
+        if name.startswith(COMMENT_PREFIX) or name == PAUSE_COMMAND:
+            continue
+        success, message = plotter.execute_statement(name, params)
+        assert success, message
+    return plotter.nd.state
+
+
+def assert_estimate_matches_simulation(options, definitions, commands):
+    estimate = estimate_plot(options, definitions, parse_commands(commands))
+    state = simulate(options, definitions, commands)
+    assert estimate['duration'] == pytest.approx(state['elapsed'], rel=1e-9)
+    assert estimate['pen_down_distance'] == pytest.approx(state['pen_down_distance'], rel=1e-9)
+    assert estimate['pen_up_distance'] == pytest.approx(state['pen_up_distance'], rel=1e-9)
+    assert estimate['pen_lifts'] == state['pen_lifts']
+
+
+@pytest.mark.parametrize('path', EXAMPLES)
+def test_estimate_matches_simulation(path):
+    assert_estimate_matches_simulation(*example_plot(path))
+
+
+def test_estimate_of_lines_matches_simulation():
+    rng = random.Random(1)
+    for _ in range(50):
+        assert_estimate_matches_simulation(OPTIONS, DEFINITIONS, random_lines(rng, rng.randint(1, 200)))
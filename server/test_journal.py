@@ -0,0 +1,119 @@
+import functools
+
+from job import JOB_FAILED, JOB_FINISHED
+from journal import JobJournal, read_journal
+from metrics import Metrics
+from optimize import MotionTracker
+from plot_commands import parse_commands
+from plotter import Plotter
+from simulator import SimulatedClock, SimulatedNextDraw
+
+OPTIONS = ['model 2']
+DEFINITIONS = ['go_home penup | moveto 0 0']
+COMMANDS = [
+    'speed_pendown 40',
+    'draw_path [[10,10],[20,10]]',
+    'moveto 30 30',
+    'pendown',
+    'lineto 40 30',
+    'pen_pos_down 20',
+    'lineto 40 40',
+    'penup',
+    'draw_path [[50,50],[60,60],[70,50]]',
+    'go_home',
+]
+# Statement the interrupted run fails at, counting from 1, drawing with the pen down after both options
+INTERRUPTED_AT = 7
+# Machine state a resumed run must end in, as an uninterrupted run does
+COMPARED_STATE = ('x', 'y', 'pen_up', 'options')
+
+
+class PowerLoss(Exception):
+    pass
+
+
+def new_plotter(journal_dir):
+    plotter = Plotter("", functools.partial(SimulatedNextDraw, SimulatedClock(0)), str(journal_dir), Metrics(),
+                      power_interval=0)
+    plotter.initialize_plot(OPTIONS, DEFINITIONS)
+    return plotter
+
+
+def final_state(plotter):
+    return {name: plotter.nd.state[name] for name in COMPARED_STATE}
+
+
+def test_read_journal_ignores_torn_record(tmp_path):
+    path = tmp_path / 'plot.journal'
+    journal = JobJournal(str(path))
+    journal.open(resume=False)
+    tracker = MotionTracker()
+    tracker.x, tracker.y = 12.5, 7.0
+    journal.record(1, [('speed_pendown', [40])], tracker)
+    tracker.pen_up = False
+    journal.record(2, [], tracker)
+    journal.file.close()
+    with open(path, 'a') as journal_file:
+        # the crash tore the record of the third statement part way through
+        journal_file.write('O pen_pos_down 20\nD 3 1 4')
+
+    state = read_journal(str(path))
+    assert state.index == 2
+    assert state.options == {'speed_pendown': [40]}
+    assert (state.pen_up, state.x, state.y) == (False, 12.5, 7.0)
+
+
+def test_read_journal_of_ended_job_has_nothing_to_resume(tmp_path):
+    path = tmp_path / 'plot.journal'
+    path.write_text('D 1 1 0.0 0.0\nE JOB_FINISHED\n')
+    assert read_journal(str(path)) is None
+    assert read_journal(str(tmp_path / 'missing.journal')) is None
+
+
+def test_recover_resumes_interrupted_job(tmp_path):
+    statements = parse_commands(COMMANDS)
+
+    uninterrupted = new_plotter(tmp_path / 'uninterrupted')
+    job = uninterrupted.load_job(statements, 'plot')
+    job.start()
+    assert job.wait(10) and job.state == JOB_FINISHED
+
+    interrupted = new_plotter(tmp_path / 'journals')
+    execute = interrupted.execute_statement
+    executed = []
+
+    def lose_power(name, params):
+        executed.append((name, params))
+        if len(executed) == INTERRUPTED_AT:
+            raise PowerLoss()
+        return execute(name, params)
+
+    interrupted.execute_statement = lose_power
+    job = interrupted.load_job(statements, 'plot')
+    job.start()
+    assert job.wait(10) and job.state == JOB_FAILED
+
+    # the server restarts with a fresh NextDraw and reloads the plot
+    resumed = new_plotter(tmp_path / 'journals')
+    execute = resumed.execute_statement
+    executed = []
+
+    def record(name, params):
+        executed.append((name, params))
+        return execute(name, params)
+
+    resumed.execute_statement = record
+    job = resumed.load_job(statements, 'plot')
+    recovered = job.recovered
+    assert recovered.index == INTERRUPTED_AT - 1
+    assert recovered.options == {'speed_pendown': [40], 'pen_pos_down': [20]}
+    assert (recovered.pen_up, recovered.x, recovered.y) == (False, 40.0, 30.0)
+
+    job.recover()
+    assert job.wait(10) and job.state == JOB_FINISHED
+    # the options and pen are restored, then the plot continues from the interrupted statement
+    assert executed[-len(statements) + recovered.index:] == statements[recovered.index:]
+    assert ('pen_pos_down', [20]) in executed and ('speed_pendown', [40]) in executed
+    assert executed[executed.index(('moveto', [40.0, 30.0])) + 1] == ('pendown', [])
+    assert final_state(resumed) == final_state(uninterrupted)
+    assert read_journal(str(tmp_path / 'journals' / 'plot.journal')) is None
@@ -0,0 +1,227 @@
+import glob
+import math
+import os
+import random
+from collections import Counter
+
+import pytest
+
+from optimize import PlotTracker, optimize_commands
+from plot_commands import extract_definitions, parse_command, parse_plot_file
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), 'command_examples')
+EXAMPLES = sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.txt')))
+DEFINITIONS = ['go_home penup | moveto 0 0']
+
+
+class StrokeTracker(PlotTracker):
+    """PlotTracker recording the polylines drawn with the pen down."""
+
+    def __init__(self, definitions):
+        super().__init__(definitions)
+        self.strokes = []
+        self.stroke = None
+
+    def move(self, x, y):
+        if self.pen_up:
+            self.stroke = None
+        elif (x, y) != (self.x, self.y):
+            if self.stroke is None:
+                self.stroke = [(self.x, self.y)]
+                self.strokes.append(self.stroke)
+            self.stroke.append((x, y))
+        super().move(x, y)
+
+
+def example_plot(path):
+    with open(path) as plot_file:
+        _, definitions, commands = parse_plot_file(plot_file)
+    return commands, extract_definitions(definitions)
+
+
+def trace(commands, definitions):
+    tracker = StrokeTracker(definitions)
+    for command_line in commands:
+        tracker.follow(*parse_command(command_line))
+    return tracker
+
+
+def point_key(point):
+    """Vertex as rewritten strokes are formatted, to 10 significant digits."""
+    return float('%.10g' % point[0]), float('%.10g' % point[1])
+
+
+def drawn_segments(commands, definitions):
+    """Count of the segments drawn, regardless of the direction they are drawn in."""
+    segments = Counter()
+    for stroke in trace(commands, definitions).strokes:
+        for start, end in zip(stroke, stroke[1:]):
+            start, end = point_key(start), point_key(end)
+            if start != end:
+                segments[min(start, end), max(start, end)] += 1
+    return segments
+
+
+def random_strokes(rng, count, size=20):
+    """Draw_path commands with vertices on an integer grid, so endpoints often coincide,
+    split into runs by other commands including ones moving on from where a run ends."""
+    commands = []
+    for _ in range(count):
+        if rng.random() < 0.15:
+            commands.append(rng.choice([
+                'penup', 'go_home', f'moveto {rng.randint(0, size)} {rng.randint(0, size)}', 'move 2 1', 'line 1 3',
+                f'lineto {rng.randint(0, size)} {rng.randint(0, size)}', '# layer',
+            ]))
+        vertices = [[rng.randint(0, size), rng.randint(0, size)] for _ in range(rng.randint(2, 5))]
+        commands.append('draw_path ' + str(vertices).replace(' ', ''))
+    return commands
+
+
+def random_walks(rng, count, steps=30):
+    """Draw_path commands following random walks, with many vertices close to the line through their neighbours."""
+    commands = []
+    for _ in range(count):
+        x, y, heading = rng.uniform(0, 100), rng.uniform(0, 100), rng.uniform(0, 2 * math.pi)
+        vertices = [[x, y]]
+        for _ in range(rng.randint(2, steps)):
+            # now and then double back along the walk
+            heading += rng.gauss(0, 0.6) if rng.random() > 0.1 else math.pi
+            step = rng.uniform(0.05, 3)
+            x, y = x + step * math.cos(heading), y + step * math.sin(heading)
+            vertices.append([round(x, 4), round(y, 4)])
+        commands.append('draw_path ' + str(vertices).replace(' ', ''))
+    return commands
+
+
+@pytest.mark.parametrize('path', EXAMPLES)
+def test_reorder_keeps_drawn_segments(path):
+    commands, definitions = example_plot(path)
+    optimized, _ = optimize_commands(commands, reorder=True, definitions=definitions)
+    assert drawn_segments(optimized, definitions) == drawn_segments(commands, definitions)
+    assert trace(optimized, definitions).pen_up_distance <= trace(commands, definitions).pen_up_distance + 1e-9
+
+
+def test_reorder_random_strokes():
+    rng = random.Random(1)
+    definitions = extract_definitions(DEFINITIONS)
+    for _ in range(300):
+        commands = random_strokes(rng, rng.randint(1, 30))
+        optimized, _ = optimize_commands(commands, reorder=True, definitions=definitions)
+        assert drawn_segments(optimized, definitions) == drawn_segments(commands, definitions), commands
+        assert trace(optimized, definitions).pen_up_distance <= trace(commands, definitions).pen_up_distance + 1e-9, \
+            commands
+
+
+def assert_merged(merged, commands, definitions, tolerance):
+    """Check merging drew every segment again, adding only joins across gaps within tolerance."""
+    before, after = drawn_segments(commands, definitions), drawn_segments(merged, definitions)
+    assert not before - after
+    for start, end in after - before:
+        assert math.dist(start, end) <= tolerance + 1e-6
+
+
+@pytest.mark.parametrize('path', EXAMPLES)
+def test_merge_keeps_drawn_segments(path):
+    commands, definitions = example_plot(path)
+    merged, _ = optimize_commands(commands, merge_tolerance=0.5, definitions=definitions)
+    assert_merged(merged, commands, definitions, 0.5)
+
+
+def test_merge_random_strokes():
+    rng = random.Random(1)
+    definitions = extract_definitions(DEFINITIONS)
+    for _ in range(300):
+        commands = random_strokes(rng, rng.randint(1, 30))
+        # vertices are a grid unit apart, so only coincident endpoints are merged
+        merged, _ = optimize_commands(commands, merge_tolerance=0.5, definitions=definitions)
+        assert drawn_segments(merged, definitions) == drawn_segments(commands, definitions), commands
+        merged, _ = optimize_commands(commands, merge_tolerance=1.5, definitions=definitions)
+        assert_merged(merged, commands, definitions, 1.5)
+
+
+def segment_distance(point, start, end):
+    """Distance from a point to the segment between start and end."""
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    length = dx * dx + dy * dy
+    t = 0.0 if length == 0 else max(0.0, min(1.0, ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / length))
+    return math.dist(point, (start[0] + t * dx, start[1] + t * dy))
+
+
+def assert_simplified(simplified, commands, definitions, tolerance):
+    """Check every stroke kept its ends and a subset of its vertices, each removed vertex
+    within tolerance of the kept segment spanning it."""
+    before, after = trace(commands, definitions).strokes, trace(simplified, definitions).strokes
+    assert len(after) == len(before)
+    for stroke, kept in zip(before, after):
+        kept_keys = [point_key(point) for point in kept]
+        assert point_key(stroke[0]) == kept_keys[0]
+        span = 0
+        for point in stroke[1:]:
+            if span + 1 < len(kept) and point_key(point) == kept_keys[span + 1]:
+                span += 1
+            else:
+                assert segment_distance(point, kept[span], kept[span + 1]) <= tolerance + 1e-6
+        assert span == len(kept) - 1
+
+
+@pytest.mark.parametrize('commands', [
+    ['draw_path [[0,0],[10,0],[-3,0],[1,0]]'],
+    ['draw_path [[0,0],[10,0.2],[1,0]]'],
+    ['draw_path [[0,0],[5,0.4],[0,0]]', 'draw_path [[0,0],[5,0.6],[0,0]]'],
+])
+def test_simplify_keeps_vertices_beyond_chord(commands):
+    simplified, _ = optimize_commands(commands, simplify_tolerance=0.5)
+    assert_simplified(simplified, commands, {}, 0.5)
+
+
+@pytest.mark.parametrize('path', EXAMPLES)
+@pytest.mark.parametrize('tolerance', [0.1, 1.0])
+def test_simplify_keeps_strokes_within_tolerance(path, tolerance):
+    commands, definitions = example_plot(path)
+    simplified, _ = optimize_commands(commands, simplify_tolerance=tolerance, definitions=definitions)
+    assert_simplified(simplified, commands, definitions, tolerance)
+
+
+def test_simplify_random_walks():
+    rng = random.Random(1)
+    definitions = extract_definitions(DEFINITIONS)
+    for _ in range(300):
+        commands = random_walks(rng, rng.randint(1, 10))
+        tolerance = rng.choice([0.05, 0.2, 1.0])
+        simplified, _ = optimize_commands(commands, simplify_tolerance=tolerance, definitions=definitions)
+        assert_simplified(simplified, commands, definitions, tolerance)
+
+
+def random_lines(rng, count, size=20):
+    """Sequences of pen and line commands, with runs of lines for fusing."""
+    def point():
+        return f'{rng.randint(0, size)} {rng.randint(0, size)}'
+
+    choices = [
+        lambda: 'penup', lambda: 'pendown', lambda: f'moveto {point()}', lambda: 'move 1 2',
+        lambda: f'lineto {point()}', lambda: f'lineto {point()}', lambda: 'line 2 -1', lambda: 'line -3 0',
+        lambda: f'goto {point()}', lambda: 'go 1 1', lambda: 'go_home', lambda: 'pen_pos_down 30', lambda: '# layer',
+        lambda: f'draw_path [[{rng.randint(0, size)},{rng.randint(0, size)}],[{rng.randint(0, size)},3]]',
+    ]
+    return [rng.choice(choices)() for _ in range(count)]
+
+
+@pytest.mark.parametrize('path', EXAMPLES)
+def test_fuse_keeps_drawn_segments(path):
+    commands, definitions = example_plot(path)
+    fused, _ = optimize_commands(commands, fuse=True, definitions=definitions)
+    assert drawn_segments(fused, definitions) == drawn_segments(commands, definitions)
+
+
+def test_fuse_random_lines():
+    rng = random.Random(1)
+    definitions = extract_definitions(DEFINITIONS)
+    fused_total = 0
+    for _ in range(2000):
+        commands = random_lines(rng, rng.randint(1, 15))
+        fused, stats = optimize_commands(commands, fuse=True, definitions=definitions)
+        fused_total += stats['lines_fused']
+        before, after = trace(commands, definitions), trace(fused, definitions)
+        assert drawn_segments(fused, definitions) == drawn_segments(commands, definitions), commands
+        assert (after.x, after.y, after.pen_up) == (before.x, before.y, before.pen_up), commands
+    assert fused_total
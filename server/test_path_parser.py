@@ -0,0 +1,60 @@
+import ast
+import glob
+import os
+
+import pytest
+
+from path_parser import describe_error, parse_path
+from plot_commands import parse_plot_file, split_command
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), 'command_examples')
+
+
+def example_paths():
+    paths = []
+    for path in sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.txt'))):
+        with open(path) as plot_file:
+            _, _, commands = parse_plot_file(plot_file)
+        paths.extend(split_command(line)[1][0] for line in commands if line.startswith('draw_path'))
+    return paths
+
+
+@pytest.mark.parametrize('text', example_paths() + [
+    '[]', '[[0,0]]', ' [ [1 , 2] , [3,4] ] ', '[[1e3,-.5],[+2.,3E-2]]', '[[-0,1.25e-3]]',
+])
+def test_parse_path_matches_literal_eval(text):
+    assert list(parse_path(text)) == [(float(x), float(y)) for x, y in ast.literal_eval(text)]
+
+
+@pytest.mark.parametrize('text, message', [
+    # unclosed brackets
+    ('[[1,2],[3,4]', "expected ',' or ']' at column 13, found end of path"),
+    ('[[1,2', "expected ']' at column 6, found end of path"),
+    # a single coordinate
+    ('[[1]]', "expected ',' at column 4, found ']]'"),
+    ('[[1,2],[3]]', "expected ',' at column 10, found ']]'"),
+    # not numbers
+    ('[[nan,1]]', "expected a number at column 3, found 'nan,1]]'"),
+    ('[[1,inf]]', "expected a number at column 5, found 'inf]]'"),
+    ('[[1, -infinity]]', "expected a number at column 6, found '-infinity]]'"),
+    # empty vertices and lists
+    ('[[]]', "expected a number at column 3, found ']]'"),
+    ('[[1,2],  ]', "expected '[' at column 10, found ']'"),
+    ('', "expected '[' at column 1, found end of path"),
+    ('   ', "expected '[' at column 4, found end of path"),
+    # trailing text
+    ('[[1,2]] [[3,4]]', "expected end of path at column 9, found '[[3,4]]'"),
+    # numbers too large for a float
+    ('[[1,2],[-1e999,1]]', "coordinate -1e999 at column 9 is out of range"),
+])
+def test_parse_path_rejects_malformed_paths(text, message):
+    with pytest.raises(ValueError) as error:
+        parse_path(text)
+    assert str(error.value) == f"Invalid path: {message}"
+
+
+def test_describe_error_points_at_offending_token():
+    text = '[[1,2], [3 ,x], [5,6]]'
+    message = describe_error(text)
+    column = int(message.split('at column ')[1].split(',')[0])
+    assert text[column - 1] == 'x'
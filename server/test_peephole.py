@@ -0,0 +1,54 @@
+import functools
+import random
+
+import pytest
+
+from metrics import Metrics
+from optimize import optimize_commands
+from plot_commands import extract_definitions, parse_command
+from plotter import Plotter
+from simulator import SimulatedClock, SimulatedNextDraw
+
+OPTIONS = ['model 2']
+DEFINITIONS = ['go_home penup | moveto 0 0']
+# Commands the random sequences are drawn from, including paths the NextDraw does not move for
+COMMANDS = [
+    'penup', 'pendown', 'moveto 0 0', 'moveto 1 1', 'moveto 5 5', 'move 0 0', 'move 1 0', 'lineto 1 1', 'line 0 0',
+    'goto 1 1', 'go 0 0', 'go_home', 'draw_path [[0,0],[1,1]]', 'draw_path [[2,2],[3,1]]', 'draw_path [[1,1]]',
+    'draw_path [[5,5]]', 'draw_path []', 'pen_pos_up 50', 'delay 1',
+]
+# State that removing commands changes without changing where the machine ends up
+UNCOMPARED_STATE = ('commands', 'elapsed', 'pen_up_distance')
+
+
+@pytest.fixture(scope='module')
+def plotter():
+    return Plotter("", functools.partial(SimulatedNextDraw, SimulatedClock(0)), "", Metrics(), power_interval=0)
+
+
+def final_state(plotter, commands):
+    plotter.initialize_plot(OPTIONS, DEFINITIONS)
+    for command_line in commands:
+        success, message = plotter.execute_statement(*parse_command(command_line))
+        assert success, message
+    return {name: value for name, value in plotter.nd.state.items() if name not in UNCOMPARED_STATE}
+
+
+@pytest.mark.parametrize('commands', [
+    ['moveto 5 5', 'draw_path [[1,1]]'],
+    ['moveto 5 5', 'draw_path []'],
+    ['moveto 5 5', 'draw_path [[1,1]]', 'moveto 2 2', 'draw_path [[2,2],[3,1]]'],
+    ['moveto 0 0', 'moveto 5 5', 'draw_path [[0,0],[1,1]]'],
+])
+def test_remove_redundant_keeps_final_state(plotter, commands):
+    optimized, _ = optimize_commands(commands, remove_redundant=True, definitions=extract_definitions(DEFINITIONS))
+    assert final_state(plotter, optimized) == final_state(plotter, commands)
+
+
+def test_remove_redundant_keeps_final_state_of_random_sequences(plotter):
+    rng = random.Random(1)
+    definitions = extract_definitions(DEFINITIONS)
+    for _ in range(2000):
+        commands = [rng.choice(COMMANDS) for _ in range(rng.randint(1, 12))]
+        optimized, _ = optimize_commands(commands, remove_redundant=True, definitions=definitions)
+        assert final_state(plotter, optimized) == final_state(plotter, commands), commands
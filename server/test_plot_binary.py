@@ -0,0 +1,80 @@
+import glob
+import os
+
+import pytest
+
+from path_parser import Path
+from plot_binary import MAGIC, BinaryPlot, convert_plot, write_binary_plot
+from plot_commands import parse_command, parse_plot_file
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), 'command_examples')
+EXAMPLES = sorted(glob.glob(os.path.join(EXAMPLES_DIR, '*.txt')))
+SIMPLE_PLOT = os.path.join(EXAMPLES_DIR, 'simple_plot.txt')
+
+
+def comparable(statements):
+    """Statements with Paths as lists of vertices, as Paths compare by identity."""
+    return [(name, [list(param) if isinstance(param, Path) else param for param in params])
+            for name, params in statements]
+
+
+def example_commands(path):
+    with open(path) as plot_file:
+        return parse_plot_file(plot_file)
+
+
+@pytest.fixture(params=EXAMPLES)
+def converted(request, tmp_path):
+    binary_path = tmp_path / 'plot.pdp'
+    convert_plot(request.param, binary_path)
+    plot = BinaryPlot(binary_path)
+    yield request.param, plot
+    plot.close()
+
+
+def test_statements_round_trip(converted):
+    text_path, plot = converted
+    options, definitions, commands = example_commands(text_path)
+    assert plot.options == options
+    assert plot.definitions == definitions
+    assert len(plot) == len(commands)
+    assert comparable(plot) == comparable(parse_command(line) for line in commands)
+
+
+def test_iter_from_skips_to_index(converted):
+    text_path, plot = converted
+    statements = comparable(parse_command(line) for line in example_commands(text_path)[2])
+    for start in range(len(statements) + 1):
+        assert comparable(plot.iter_from(start)) == statements[start:]
+
+
+def test_truncated_plot_raises(tmp_path):
+    binary_path = tmp_path / 'plot.pdp'
+    convert_plot(SIMPLE_PLOT, binary_path)
+    data = binary_path.read_bytes()
+    for length in range(0, len(data), max(1, len(data) // 50)):
+        binary_path.write_bytes(data[:length])
+        with pytest.raises(ValueError):
+            BinaryPlot(binary_path)
+
+
+def test_bad_magic_raises(tmp_path):
+    binary_path = tmp_path / 'plot.pdp'
+    convert_plot(SIMPLE_PLOT, binary_path)
+    data = binary_path.read_bytes()
+    binary_path.write_bytes(b'X' * len(MAGIC) + data[len(MAGIC):])
+    with pytest.raises(ValueError, match="not a binary plot"):
+        BinaryPlot(binary_path)
+
+
+def test_write_binary_plot_encodes_generator(converted, tmp_path):
+    text_path, _ = converted
+    options, definitions, commands = example_commands(text_path)
+    with open(tmp_path / 'written.pdp', 'w+b') as binary_file:
+        count = write_binary_plot(binary_file, options, definitions, (line for line in commands))
+        binary_file.flush()
+        plot = BinaryPlot(binary_file)
+    assert count == len(plot) == len(commands)
+    assert (plot.options, plot.definitions) == (options, definitions)
+    assert comparable(plot) == comparable(parse_command(line) for line in commands)
+    plot.close()
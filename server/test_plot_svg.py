@@ -0,0 +1,57 @@
+import random
+import tracemalloc
+
+import plot_svg
+from path_parser import Path
+from plot_commands import parse_command
+from plot_svg import iter_svg_commands, load_svg_plot
+
+SVG_HEADER = '<svg xmlns="http://www.w3.org/2000/svg" width="200mm" height="200mm" viewBox="0 0 200 200">\n'
+
+
+def write_svg(path, shapes):
+    # strokes of 12 or more vertices, as the tuples formatting shorter ones are kept for reuse
+    # by the interpreter and would be counted as memory in use
+    rng = random.Random(1)
+    with open(path, 'w') as svg_file:
+        svg_file.write(SVG_HEADER)
+        for number in range(shapes):
+            if number % 500 == 0:
+                svg_file.write(f'<g id="layer{number // 500}"/>\n')
+            points = ' '.join(f'{rng.uniform(0, 200):.3f},{rng.uniform(0, 200):.3f}'
+                              for _ in range(rng.randint(12, 40)))
+            svg_file.write(f'<polyline points="{points}"/>\n')
+            svg_file.write(f'<circle cx="100" cy="100" r="{rng.uniform(30, 90):.3f}"/>\n')
+        svg_file.write('</svg>\n')
+
+
+def comparable(statements):
+    return [(name, [list(param) if isinstance(param, Path) else param for param in params])
+            for name, params in statements]
+
+
+def load_peak(path):
+    tracemalloc.start()
+    try:
+        plot = load_svg_plot(path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        plot.close()
+
+
+def test_load_svg_plot_matches_converted_commands(tmp_path):
+    path = tmp_path / 'plot.svg'
+    write_svg(path, 1200)
+    plot = load_svg_plot(path)
+    assert (plot.options, plot.definitions) == ([], [])
+    assert comparable(plot) == comparable(parse_command(line) for line in iter_svg_commands(path))
+    plot.close()
+
+
+def test_load_svg_plot_memory_does_not_grow_with_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(plot_svg, 'BATCH_POINTS', 1024)
+    small, large = tmp_path / 'small.svg', tmp_path / 'large.svg'
+    write_svg(small, 100)
+    write_svg(large, 500)
+    assert load_peak(large) < 1.2 * load_peak(small)
@@ -0,0 +1,47 @@
+import functools
+
+from metrics import Metrics
+from plotter import OTHER_COMMAND, Plotter
+from simulator import SimulatedClock, SimulatedNextDraw
+
+OPTIONS = ['model 2']
+
+
+class FaultyNextDraw(SimulatedNextDraw):
+    def disconnect(self):
+        raise OSError("port vanished")
+
+
+def new_plotter(nextdraw_factory):
+    return Plotter("", nextdraw_factory, "", Metrics(), power_interval=0)
+
+
+def test_initialize_plot_disconnects_previous_nextdraw():
+    plotter = new_plotter(functools.partial(SimulatedNextDraw, SimulatedClock(0)))
+    assert plotter.initialize_plot(OPTIONS)
+    first = plotter.nd
+    assert plotter.initialize_plot(OPTIONS)
+    assert plotter.nd is not first
+    assert not first.connected and plotter.nd.connected
+
+
+def test_initialize_plot_survives_failed_disconnect():
+    plotter = new_plotter(functools.partial(FaultyNextDraw, SimulatedClock(0)))
+    assert plotter.initialize_plot(OPTIONS)
+    first = plotter.nd
+    assert plotter.initialize_plot(OPTIONS)
+    assert plotter.nd is not first and plotter.nd.connected
+
+
+def test_unknown_commands_share_one_metric_label():
+    plotter = new_plotter(functools.partial(SimulatedNextDraw, SimulatedClock(0)))
+    plotter.initialize_plot(OPTIONS, ['go_home penup | moveto 0 0'])
+    for name, params in [('go_home', []), ('speed_pendown', [30]), ('lineto', [1.0, 1.0])]:
+        assert plotter.execute_statement(name, params)[0]
+    for number in range(100):
+        assert not plotter.execute_statement(f'no_such_command_{number}', [])[0]
+
+    histograms, _ = plotter.metrics.snapshot()
+    labels = {(labels['command'], labels['kind']) for name, labels, _ in histograms if name == 'command_seconds'}
+    assert labels == {('go_home', 'definition'), ('speed_pendown', 'option'), ('lineto', 'function'),
+                      (OTHER_COMMAND, OTHER_COMMAND)}
@@ -0,0 +1,57 @@
+import functools
+
+import pytest
+
+from job import JOB_FINISHED
+from plotter import DEFAULT_DEVICE
+from server import PlotService
+from simulator import SimulatedClock, SimulatedNextDraw
+
+# A plot file drawn in inches at a slow speed, for the SVG loaded after it not to inherit
+TEXT_PLOT = """units 1
+speed_pendown 10
+::END_OPTIONS::
+go_home penup | moveto 0 0
+::END_DEFINITIONS::
+lineto 1 1
+go_home
+"""
+SVG_PLOT = """<svg xmlns="http://www.w3.org/2000/svg" width="100mm" height="100mm" viewBox="0 0 100 100">
+<path d="M 10 10 L 100 10 L 100 100" fill="none" stroke="black"/>
+</svg>
+"""
+
+
+@pytest.fixture
+def service():
+    return PlotService(journal_dir='', nextdraw_factory=functools.partial(SimulatedNextDraw, SimulatedClock(0)),
+                       power_interval=0, prepare_workers=0)
+
+
+def plot_file(service, path):
+    response = service.load_plot_file(DEFAULT_DEVICE, str(path))
+    assert response.success, response.message
+    job = service.plotters[DEFAULT_DEVICE].job
+    job.start()
+    assert job.wait(10) and job.state == JOB_FINISHED
+    return service.plotters[DEFAULT_DEVICE].nd.state
+
+
+def test_svg_plot_is_drawn_in_millimetres(service, tmp_path):
+    (tmp_path / 'plot.svg').write_text(SVG_PLOT)
+    state = plot_file(service, tmp_path / 'plot.svg')
+    assert (state['x'], state['y']) == pytest.approx((100, 100))
+    assert state['pen_down_distance'] == pytest.approx(180)
+
+
+def test_svg_plot_does_not_inherit_earlier_plot(service, tmp_path):
+    (tmp_path / 'plot.txt').write_text(TEXT_PLOT)
+    (tmp_path / 'plot.svg').write_text(SVG_PLOT)
+    plot_file(service, tmp_path / 'plot.txt')
+    plotter = service.plotters[DEFAULT_DEVICE]
+    assert 'go_home' in plotter.definitions
+
+    state = plot_file(service, tmp_path / 'plot.svg')
+    assert (state['x'], state['y']) == pytest.approx((100, 100))
+    assert 'speed_pendown' not in plotter.base_options
+    assert plotter.definitions == {}